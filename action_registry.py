@@ -0,0 +1,126 @@
+import threading
+from typing import Callable, Dict, List, Optional
+
+# Expected latency classes, from cheapest to most expensive
+LATENCY_INSTANT = "instant"          # key presses, local lookups (< 50 ms)
+LATENCY_FAST = "fast"                # local work or process launches (< 1 s)
+LATENCY_SLOW = "slow"                # network, LLM or long-running calls
+LATENCY_INTERACTIVE = "interactive"  # asks the user follow-up questions
+LATENCY_CLASSES = (LATENCY_INSTANT, LATENCY_FAST, LATENCY_SLOW, LATENCY_INTERACTIVE)
+
+
+class ActionSpec:
+    """A registered action handler and the metadata the scheduler needs"""
+
+    def __init__(self, name: str, handler: Callable, blocking: bool = False,
+                 speaks: bool = True, latency: str = LATENCY_FAST,
+                 concurrent_safe: bool = True, source: str = "core",
+                 phrases: Optional[List[str]] = None, description: str = ""):
+        if latency not in LATENCY_CLASSES:
+            raise ValueError(f"Unknown latency class for {name}: {latency}")
+        self.name = name
+        self.handler = handler
+        # Blocking actions hold the conversation (mic Q&A, shutdown) until they finish
+        self.blocking = blocking
+        self.speaks = speaks
+        self.latency = latency
+        self.concurrent_safe = concurrent_safe
+        self.source = source
+        self.phrases = list(phrases or [])
+        self.description = description
+        # Serialises handlers that must not overlap with themselves
+        self._lock = None if concurrent_safe else threading.Lock()
+
+    @property
+    def runs_inline(self) -> bool:
+        """Whether the voice loop should run this action itself instead of spawning a thread"""
+        return self.blocking or self.latency == LATENCY_INSTANT
+
+    def __call__(self, intent):
+        if self._lock is None:
+            return self.handler(intent)
+        with self._lock:
+            return self.handler(intent)
+
+    def __repr__(self):
+        return (f"ActionSpec({self.name!r}, latency={self.latency!r}, blocking={self.blocking}, "
+                f"speaks={self.speaks}, concurrent_safe={self.concurrent_safe}, source={self.source!r})")
+
+
+class ActionRegistry:
+    """Single table of core and plugin actions with O(1) dispatch by name"""
+
+    def __init__(self):
+        self._actions: Dict[str, ActionSpec] = {}
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[], None]] = []
+
+    def register(self, name: str, handler: Optional[Callable] = None, **metadata):
+        """Register ``handler`` for ``name``; without a handler, acts as a decorator.
+
+        Handlers receive the ``slots.Intent`` for the utterance. Metadata keywords
+        are those of ``ActionSpec`` (blocking, speaks, latency, concurrent_safe,
+        source, phrases, description).
+        """
+        def _register(fn):
+            spec = ActionSpec(name, fn, **metadata)
+            with self._lock:
+                self._actions[name] = spec
+            self._notify()
+            return fn
+
+        if handler is not None:
+            return _register(handler)
+        return _register
+
+    def unregister(self, name: str) -> bool:
+        with self._lock:
+            removed = self._actions.pop(name, None) is not None
+        if removed:
+            self._notify()
+        return removed
+
+    def unregister_source(self, source: str) -> List[str]:
+        """Remove every action registered by ``source`` (e.g. a plugin name)"""
+        with self._lock:
+            names = [name for name, spec in self._actions.items() if spec.source == source]
+            for name in names:
+                del self._actions[name]
+        if names:
+            self._notify()
+        return names
+
+    def get(self, name: Optional[str]) -> Optional[ActionSpec]:
+        return self._actions.get(name) if name else None
+
+    def __contains__(self, name) -> bool:
+        return name in self._actions
+
+    def names(self, source: Optional[str] = None) -> List[str]:
+        return [name for name, spec in self._actions.items() if source is None or spec.source == source]
+
+    def specs(self) -> List[ActionSpec]:
+        return list(self._actions.values())
+
+    def dispatch(self, name: str, intent):
+        """Run the handler for ``name``; raises KeyError for unknown actions"""
+        spec = self._actions.get(name)
+        if spec is None:
+            raise KeyError(name)
+        return spec(intent)
+
+    def add_listener(self, callback: Callable[[], None]):
+        """Call ``callback`` whenever actions are added or removed"""
+        self._listeners.append(callback)
+
+    def _notify(self):
+        for callback in list(self._listeners):
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in action registry listener: {e}")
+
+
+# Shared registry for core actions (actions.py) and plugin actions
+REGISTRY = ActionRegistry()
+register_action = REGISTRY.register
@@ -1,17 +1,18 @@
 import os
+import sys
+import ctypes
 import webbrowser
-import datetime
 import subprocess
 import platform
 from datetime import datetime
-from speech import speak, listen
+from speech import speak, listen_dictation
 import threading
 import time
 import socket
-from datetime import datetime
-from speech import speak
 import re
 from utils import log_command
+from slots import extract_slots
+from action_registry import REGISTRY, register_action, LATENCY_INSTANT, LATENCY_FAST, LATENCY_SLOW, LATENCY_INTERACTIVE
 from assistant.state import INTERACTION_IN_PROGRESS
 from contextlib import contextmanager
 from ai_conversation import ask_ai, clear_conversation
@@ -30,7 +31,7 @@ def search_google(query):
     webbrowser.open(f"https://www.google.com/search?q={query}")
 
 def tell_time():
-    now = datetime.datetime.now()
+    now = datetime.now()
     return f"The current time is {now.strftime('%I:%M %p')}"
 
 # New actions
@@ -344,169 +345,207 @@ def run_utility(util_type):
         speak(f"You rolled a {result}.")
         return str(result)
 
-def route_action(action, command):
-    """Route the action to the correct function."""
-    if action == "stop_assistant":
-        speak("Okay, stopping now. Goodbye!")
-        log_command(command, "stop_assistant")
-        import sys
-        sys.exit(0)
-    if action == "increase_volume":
-        import ctypes
-        for _ in range(5):
-            ctypes.windll.user32.keybd_event(0xAF, 0, 0, 0)
-        speak("Volume increased.")
-    elif action == "decrease_volume":
-        import ctypes
-        for _ in range(5):
-            ctypes.windll.user32.keybd_event(0xAE, 0, 0, 0)
-        speak("Volume decreased.")
-    elif action == "mute_audio":
-        import ctypes
-        ctypes.windll.user32.keybd_event(0xAD, 0, 0, 0)
-        speak("Volume muted.")
-    elif action == "open_app":
-        # Extract app name from command, removing filler words
-        app_name = command.lower()
-        # Remove action words
-        for word in ["open", "launch", "start", "run"]:
-            app_name = app_name.replace(word, "")
-        # Remove filler words
-        for filler in ["to", "the", "a", "an", "my", "please"]:
-            app_name = app_name.replace(filler, "")
-        app_name = app_name.strip()
-        
-        # Handle common variations
-        if "google" in app_name or "chrome" in app_name:
-            app_name = "chrome"
-        elif "edge" in app_name:
-            app_name = "edge"
-        elif "firefox" in app_name:
-            app_name = "firefox"
-        elif "notepad" in app_name:
-            app_name = "notepad"
-        elif "calculator" in app_name or "calc" in app_name:
-            app_name = "calc"
-        
-        result = open_app(app_name)
-        return result
-    elif action == "close_app":
-        app_name = command.replace("close", "").replace("exit", "").replace("quit", "").strip()
-        import os
-        os.system(f"taskkill /im {app_name}.exe /f")
-        speak(f"Closed {app_name}")
-    elif action == "set_timer":
-        import re
-        match = re.search(r'(\d+)', command)
-        seconds = int(match.group(1)) if match else 60
-        set_timer(seconds)
-    elif action == "tell_joke":
-        tell_joke()
-    elif action == "tell_time":
-        import datetime
-        now = datetime.datetime.now().strftime("%I:%M %p")
-        speak(f"The time is {now}")
-    elif action == "tell_date":
-        import datetime
-        today = datetime.datetime.now().strftime("%A, %B %d, %Y")
-        speak(f"Today is {today}")
-    elif action == "get_ip":
-        get_ip()
-    elif action == "generate_code":
-        prefixes = [
-            "generate code for",
-            "write code for",
-            "create code for",
-            "write a script to",
-            "make a program that",
-        ]
-        lower_cmd = command.lower().strip()
-        prompt = None
-        for p in prefixes:
-            if lower_cmd.startswith(p):
-                prompt = lower_cmd[len(p):].strip()
-                break
-        if not prompt:
-            # Fallback: try to remove any prefix occurrence
-            for p in prefixes:
-                if p in lower_cmd:
-                    prompt = lower_cmd.split(p, 1)[1].strip()
-                    break
-        if not prompt:
-            speak("What should I generate code for?")
-            return "No prompt provided for code generation."
-
-        # --- Ask follow-up questions to clarify (pause main mic during Q&A) ---
-        with interaction_in_progress():
-            language = _ask_with_default(
-                question="Which programming language should I use? You can say Python, JavaScript, or something else.",
-                default_answer="Python",
-            )
-            filename = _ask_with_default(
-                question="What file name should I save it as? You can say for example generated_code dot py.",
-                default_answer=_default_filename_for_language(language),
-            )
-            extra = _ask_optional(
-                question="Any extra requirements? For example libraries to use or constraints.",
-            )
-
-        full_prompt = prompt
-        if extra:
-            full_prompt = f"{prompt}. Additional requirements: {extra}."
-        return generate_code_with_gemini(full_prompt, filename=filename, language=language)
-    elif action == "ask_ai":
-        # Use AI to answer the question
-        response = ask_ai(command)
-        speak(response)
-        log_command(command, "ask_ai")
-        return response
-    # --- New Route Handlers ---
-    elif action == "play_youtube":
-        # Extract query
-        query = command.lower().replace("play", "", 1).strip()
-        # Remove filler words
-        for filler in ["song", "video", "music", "on youtube"]:
-            query = query.replace(filler, "")
-        query = query.strip()
-        
-        if not query:
-            # Fallback to just resume if no query
-            control_media("play_pause")
-            speak("Resumed playback.")
-        else:
-            play_youtube(query)
-    elif action == "media_play_pause":
+# --- Registered action handlers ---
+# Each handler receives the slots.Intent for the utterance. The metadata tells
+# the voice loop how to schedule it (see action_registry.ActionSpec).
+
+@register_action("stop_assistant", blocking=True, latency=LATENCY_INSTANT)
+def _handle_stop_assistant(intent):
+    speak("Okay, stopping now. Goodbye!")
+    log_command(intent.text, "stop_assistant")
+    sys.exit(0)
+
+
+def _press_volume_key(key_code, times=1):
+    for _ in range(times):
+        ctypes.windll.user32.keybd_event(key_code, 0, 0, 0)
+
+
+@register_action("increase_volume", latency=LATENCY_INSTANT)
+def _handle_increase_volume(intent):
+    _press_volume_key(0xAF, times=5)
+    speak("Volume increased.")
+
+
+@register_action("decrease_volume", latency=LATENCY_INSTANT)
+def _handle_decrease_volume(intent):
+    _press_volume_key(0xAE, times=5)
+    speak("Volume decreased.")
+
+
+@register_action("mute_audio", latency=LATENCY_INSTANT)
+def _handle_mute_audio(intent):
+    _press_volume_key(0xAD)
+    speak("Volume muted.")
+
+
+@register_action("open_app", latency=LATENCY_FAST)
+def _handle_open_app(intent):
+    return open_app(intent.app_name)
+
+
+@register_action("close_app", latency=LATENCY_FAST)
+def _handle_close_app(intent):
+    app_name = intent.app_name
+    os.system(f"taskkill /im {app_name}.exe /f")
+    speak(f"Closed {app_name}")
+
+
+@register_action("set_timer", latency=LATENCY_INSTANT)
+def _handle_set_timer(intent):
+    set_timer(intent.duration_seconds)
+
+
+@register_action("tell_joke", latency=LATENCY_INSTANT)
+def _handle_tell_joke(intent):
+    tell_joke()
+
+
+@register_action("tell_time", latency=LATENCY_INSTANT)
+def _handle_tell_time(intent):
+    now = datetime.now().strftime("%I:%M %p")
+    speak(f"The time is {now}")
+
+
+@register_action("tell_date", latency=LATENCY_INSTANT)
+def _handle_tell_date(intent):
+    today = datetime.now().strftime("%A, %B %d, %Y")
+    speak(f"Today is {today}")
+
+
+@register_action("get_ip", latency=LATENCY_INSTANT)
+def _handle_get_ip(intent):
+    get_ip()
+
+
+@register_action("generate_code", blocking=True, latency=LATENCY_INTERACTIVE, concurrent_safe=False)
+def _handle_generate_code(intent):
+    prompt = intent.query
+    if not prompt:
+        speak("What should I generate code for?")
+        return "No prompt provided for code generation."
+
+    # --- Ask follow-up questions to clarify (pause main mic during Q&A) ---
+    with interaction_in_progress():
+        # Skip the language question if the request already named one
+        language = intent.language or _ask_with_default(
+            question="Which programming language should I use? You can say Python, JavaScript, or something else.",
+            default_answer="Python",
+        )
+        filename = _ask_with_default(
+            question="What file name should I save it as? You can say for example generated_code dot py.",
+            default_answer=_default_filename_for_language(language),
+        )
+        extra = _ask_optional(
+            question="Any extra requirements? For example libraries to use or constraints.",
+        )
+
+    full_prompt = prompt
+    if extra:
+        full_prompt = f"{prompt}. Additional requirements: {extra}."
+    return generate_code_with_gemini(full_prompt, filename=filename, language=language)
+
+
+@register_action("ask_ai", latency=LATENCY_SLOW)
+def _handle_ask_ai(intent):
+    # Use AI to answer the question
+    response = ask_ai(intent.text)
+    speak(response)
+    log_command(intent.text, "ask_ai")
+    return response
+
+
+@register_action("play_youtube", latency=LATENCY_FAST)
+def _handle_play_youtube(intent):
+    if not intent.query:
+        # Fallback to just resume if no query
         control_media("play_pause")
-    elif action == "media_next":
-        control_media("next")
-    elif action == "media_prev":
-        control_media("prev")
-    elif action == "system_lock":
-        lock_screen()
-    elif action == "system_brightness_up":
-        control_brightness("up")
-    elif action == "system_brightness_down":
-        control_brightness("down")
-    elif action == "system_recycle_bin":
-        empty_recycle_bin()
-    elif action == "system_stats":
-        get_system_stats(command)
-    elif action == "window_minimize":
-        window_manager("minimize")
-    elif action == "window_switch":
-        window_manager("switch")
-    elif action == "utility_coin":
-        run_utility("coin")
-    elif action == "utility_dice":
-        run_utility("dice")
+        speak("Resumed playback.")
     else:
+        play_youtube(intent.query)
+
+
+@register_action("media_play_pause", speaks=False, latency=LATENCY_INSTANT)
+def _handle_media_play_pause(intent):
+    control_media("play_pause")
+
+
+@register_action("media_next", speaks=False, latency=LATENCY_INSTANT)
+def _handle_media_next(intent):
+    control_media("next")
+
+
+@register_action("media_prev", speaks=False, latency=LATENCY_INSTANT)
+def _handle_media_prev(intent):
+    control_media("prev")
+
+
+@register_action("system_lock", speaks=False, latency=LATENCY_INSTANT)
+def _handle_system_lock(intent):
+    lock_screen()
+
+
+@register_action("system_brightness_up", latency=LATENCY_FAST, concurrent_safe=False)
+def _handle_brightness_up(intent):
+    control_brightness("up")
+
+
+@register_action("system_brightness_down", latency=LATENCY_FAST, concurrent_safe=False)
+def _handle_brightness_down(intent):
+    control_brightness("down")
+
+
+@register_action("system_recycle_bin", latency=LATENCY_SLOW, concurrent_safe=False)
+def _handle_recycle_bin(intent):
+    empty_recycle_bin()
+
+
+@register_action("system_stats", latency=LATENCY_SLOW)
+def _handle_system_stats(intent):
+    # cpu_percent samples for a full second
+    get_system_stats(intent.query)
+
+
+@register_action("window_minimize", speaks=False, latency=LATENCY_INSTANT)
+def _handle_window_minimize(intent):
+    window_manager("minimize")
+
+
+@register_action("window_switch", speaks=False, latency=LATENCY_INSTANT)
+def _handle_window_switch(intent):
+    window_manager("switch")
+
+
+@register_action("utility_coin", latency=LATENCY_INSTANT)
+def _handle_utility_coin(intent):
+    run_utility("coin")
+
+
+@register_action("utility_dice", latency=LATENCY_INSTANT)
+def _handle_utility_dice(intent):
+    run_utility("dice")
+
+
+def route_action(action, command, intent=None):
+    """Route the action to its registered handler.
+
+    Handlers read their arguments from the Intent slots, which are extracted
+    once here unless the caller already has them.
+    """
+    if intent is None:
+        intent = extract_slots(action, command)
+    spec = REGISTRY.get(action)
+    if spec is None:
         speak("Sorry, I didn't understand that command. Please try again or rephrase.")
-    
+        return None
+    return spec(intent)
+
+
 def _ask_with_default(question: str, default_answer: str) -> str:
     """Ask a question via voice, return answer or default if no clear response."""
     for _ in range(2):
         speak(question)
-        ans = listen()
+        ans = listen_dictation()
         if ans:
             return ans.strip()
     return default_answer
@@ -515,7 +554,7 @@ def _ask_with_default(question: str, default_answer: str) -> str:
 def _ask_optional(question: str) -> str | None:
     """Ask a question; return answer or None if not captured."""
     speak(question)
-    ans = listen()
+    ans = listen_dictation()
     return ans.strip() if ans else None
 
 
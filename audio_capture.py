@@ -0,0 +1,456 @@
+import logging
+import threading
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+import speech_recognition as sr
+
+from audio_source import AudioSource
+from device_registry import get_registry
+from vad import Endpointer, VoiceActivityDetector
+
+try:
+    import pyaudio
+    PYAUDIO_AVAILABLE = True
+except ImportError:
+    PYAUDIO_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+FRAME_SAMPLES = 480          # 30 ms at 16 kHz
+BUFFER_SECONDS = 30
+PRE_ROLL_SECONDS = 0.5
+# Audio before the trigger used to estimate the noise floor instead of a blocking calibration
+AMBIENT_SECONDS = 0.5
+
+
+def pcm16_to_float32(pcm) -> np.ndarray:
+    """View 16-bit PCM bytes (or an int16 array) as float32 samples in [-1, 1)"""
+    samples = np.frombuffer(pcm, dtype=np.int16) if not isinstance(pcm, np.ndarray) else pcm
+    return samples.astype(np.float32) / 32768.0
+
+
+def pcm16_audio_data(samples: np.ndarray, sample_rate: int) -> sr.AudioData:
+    """Wrap int16 samples in an ``sr.AudioData`` without copying them.
+
+    The frame data is a byte-wise memoryview of the array, which
+    ``get_raw_data`` hands back untouched as long as no rate or width
+    conversion is asked for; ``audio_data_to_int16`` turns it back into the
+    same array.
+    """
+    return sr.AudioData(memoryview(np.ascontiguousarray(samples, dtype=np.int16)).cast("B"), sample_rate, 2)
+
+
+def audio_data_to_int16(audio_data) -> np.ndarray:
+    """int16 samples of an ``sr.AudioData``; a view of its frame data when already 16-bit"""
+    return np.frombuffer(audio_data.get_raw_data(convert_width=2), dtype=np.int16)
+
+
+def audio_data_to_float32(audio_data, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Mono float32 samples at ``sample_rate`` from an ``sr.AudioData``, without a WAV round trip.
+
+    This is the array form whisper's ``transcribe()`` accepts directly.
+    """
+    convert_rate = None if audio_data.sample_rate == sample_rate else sample_rate
+    return pcm16_to_float32(audio_data.get_raw_data(convert_rate=convert_rate, convert_width=2))
+
+
+class RingBuffer:
+    """Fixed-size int16 ring buffer with one writer and any number of readers.
+
+    Samples are addressed by absolute position (total samples ever written),
+    so readers keep their own cursor and never block the writer. The writer
+    copies a chunk in and only then publishes the new ``written`` count, so a
+    reader never sees half-written samples. A reader that falls more than
+    ``capacity`` samples behind loses the oldest audio, not the newest.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = int(capacity)
+        self._data = np.zeros(self.capacity, dtype=np.int16)
+        self._written = 0
+        self._cond = threading.Condition()
+
+    @property
+    def written(self) -> int:
+        return self._written
+
+    @property
+    def oldest(self) -> int:
+        """Absolute position of the oldest sample still held"""
+        return max(0, self._written - self.capacity)
+
+    def write(self, samples) -> int:
+        """Append int16 samples (array or raw bytes); returns the new write position"""
+        if isinstance(samples, (bytes, bytearray, memoryview)):
+            samples = np.frombuffer(samples, dtype=np.int16)
+        n = len(samples)
+        if n > self.capacity:
+            samples = samples[-self.capacity:]
+            self._written += n - self.capacity
+            n = self.capacity
+        start = self._written % self.capacity
+        first = min(n, self.capacity - start)
+        self._data[start:start + first] = samples[:first]
+        if first < n:
+            self._data[:n - first] = samples[first:]
+        self._written += n
+        with self._cond:
+            self._cond.notify_all()
+        return self._written
+
+    def views(self, start: int, end: Optional[int] = None) -> List[np.ndarray]:
+        """Zero-copy views covering absolute positions [start, end), at most two pieces"""
+        end = self._written if end is None else min(end, self._written)
+        start = max(start, self.oldest)
+        if start >= end:
+            return []
+        a, b = start % self.capacity, end % self.capacity
+        if a < b or b == 0:
+            return [self._data[a:b or self.capacity]]
+        return [self._data[a:], self._data[:b]]
+
+    def read(self, start: int, end: Optional[int] = None) -> np.ndarray:
+        """Copy of the samples at absolute positions [start, end)"""
+        pieces = self.views(start, end)
+        if not pieces:
+            return np.empty(0, dtype=np.int16)
+        return pieces[0].copy() if len(pieces) == 1 else np.concatenate(pieces)
+
+    def wait(self, position: int, timeout: Optional[float] = None) -> bool:
+        """Block until more than ``position`` samples have been written"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._written > position, timeout)
+
+
+class RingReader:
+    """A listener's cursor into a ``RingBuffer``"""
+
+    def __init__(self, ring: RingBuffer, start: int):
+        self.ring = ring
+        self.position = max(start, ring.oldest)
+
+    def available(self) -> int:
+        return self.ring.written - self.position
+
+    def read(self, max_samples: Optional[int] = None, timeout: Optional[float] = None) -> np.ndarray:
+        """Return new samples since the last read, waiting up to ``timeout`` for some"""
+        if self.available() <= 0 and timeout:
+            self.ring.wait(self.position, timeout)
+        self.position = max(self.position, self.ring.oldest)
+        end = self.ring.written
+        if max_samples is not None:
+            end = min(end, self.position + max_samples)
+        samples = self.ring.read(self.position, end)
+        self.position += len(samples)
+        return samples
+
+
+class CaptureService:
+    """One long-lived input stream feeding a ring buffer.
+
+    The stream is opened once and stays open; command capture just takes a
+    reader positioned ``pre_roll`` seconds in the past, so listening starts
+    instantly and includes the words spoken right before the trigger. The
+    device's tracked noise floor (or the audio already in the buffer) seeds
+    the VAD, which replaces the per-command ``adjust_for_ambient_noise`` pause.
+    """
+
+    def __init__(self, device_index: Optional[int] = None, sample_rate: int = SAMPLE_RATE,
+                 frame_samples: int = FRAME_SAMPLES, buffer_seconds: float = BUFFER_SECONDS):
+        self.device_index = device_index
+        self.sample_rate = sample_rate
+        self.frame_samples = frame_samples
+        self.ring = RingBuffer(int(buffer_seconds * sample_rate))
+        self.running = False
+        self._pa = None
+        self._stream = None
+
+    def start(self) -> bool:
+        """Open the input stream; returns False if no stream could be opened"""
+        if self.running:
+            return True
+        if not PYAUDIO_AVAILABLE:
+            logger.error("PyAudio not installed. Install with: pip install pyaudio")
+            return False
+        try:
+            self._pa = pyaudio.PyAudio()
+            get_registry().hold()
+            try:
+                self._stream = self._open(self.sample_rate)
+            except (OSError, ValueError):
+                # Some host APIs (WASAPI) only open at the device's native rate
+                info = (self._pa.get_device_info_by_index(self.device_index)
+                        if self.device_index is not None else self._pa.get_default_input_device_info())
+                native_rate = int(info.get("defaultSampleRate", self.sample_rate))
+                self.ring = RingBuffer(int(self.ring.capacity / self.sample_rate * native_rate))
+                self.sample_rate = native_rate
+                self._stream = self._open(native_rate)
+            self._stream.start_stream()
+            self.running = True
+            logger.info(f"Capture stream open on device {self.device_index} at {self.sample_rate} Hz")
+            return True
+        except Exception as e:
+            logger.error(f"Error opening capture stream on device {self.device_index}: {e}")
+            self.stop()
+            return False
+
+    def _open(self, rate: int):
+        return self._pa.open(
+            rate=rate,
+            channels=1,
+            format=pyaudio.paInt16,
+            input=True,
+            input_device_index=self.device_index,
+            frames_per_buffer=self.frame_samples,
+            stream_callback=self._on_audio,
+        )
+
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        self.ring.write(in_data)
+        return None, pyaudio.paContinue
+
+    def stop(self):
+        self.running = False
+        try:
+            if self._stream is not None:
+                self._stream.stop_stream()
+                self._stream.close()
+            if self._pa is not None:
+                self._pa.terminate()
+        except Exception as e:
+            logger.error(f"Error closing capture stream: {e}")
+        if self._pa is not None:
+            get_registry().release()
+        self._stream = None
+        self._pa = None
+
+    @property
+    def active(self) -> bool:
+        """False once the stream has died, e.g. because the device was unplugged"""
+        try:
+            return self.running and self._stream is not None and self._stream.is_active()
+        except Exception:
+            return False
+
+    def reader(self, pre_roll: float = 0.0) -> RingReader:
+        """A new listener cursor starting ``pre_roll`` seconds before now"""
+        return RingReader(self.ring, self.ring.written - int(pre_roll * self.sample_rate))
+
+    def source(self, reopen: Optional[Callable[[], Optional["CaptureService"]]] = None) -> "RingSource":
+        """An ``AudioSource`` over this stream, e.g. for the wake word detector"""
+        return RingSource(self, reopen)
+
+    def capture_utterance(self, timeout: float, phrase_time_limit: float,
+                          pre_roll: float = PRE_ROLL_SECONDS,
+                          vad: Optional[VoiceActivityDetector] = None,
+                          on_chunk: Optional[Callable[[np.ndarray], None]] = None,
+                          noise_db: Optional[float] = None, start: Optional[int] = None) -> Optional[np.ndarray]:
+        """Return the int16 samples of the next utterance, or None on timeout.
+
+        Endpointing is done by ``vad`` (an office-profile detector by default),
+        whose noise floor is ``noise_db`` if known, else estimated from the
+        audio already in the buffer. The utterance is closed as soon as the
+        detector's hangover expires, or after ``phrase_time_limit`` seconds of
+        speech. ``on_chunk`` sees every chunk as it is read (pre-roll first),
+        so a streaming recognizer can decode while the user is still talking.
+
+        ``start`` is an absolute ring position to listen from instead of now,
+        such as the point where the wake word was detected, so speech that
+        followed the keyword while the detector was still deciding is part of
+        the command. An utterance that is over by ``start`` is only the tail
+        of the keyword caught by the pre-roll; it is skipped and listening
+        goes on.
+        """
+        pre_roll_samples = int(pre_roll * self.sample_rate)
+        if start is None:
+            reader = self.reader(pre_roll)
+        else:
+            reader = RingReader(self.ring, start - pre_roll_samples)
+        origin = reader.position
+        trigger = 0 if start is None else start - origin
+        vad = vad or VoiceActivityDetector.from_profile(sample_rate=self.sample_rate)
+        ambient = self.ring.read(origin - int(AMBIENT_SECONDS * self.sample_rate), origin)
+        endpointer = Endpointer(vad, ambient, noise_db)
+        # Where the current endpointer's first sample sits, counted from origin
+        base = 0
+        limit_samples = int(phrase_time_limit * self.sample_rate) if phrase_time_limit else None
+        deadline = time.monotonic() + timeout if timeout else None
+
+        while self.running:
+            chunk = reader.read(timeout=0.1)
+            if chunk.size and on_chunk is not None:
+                on_chunk(chunk)
+            if chunk.size and endpointer.feed(chunk):
+                if base + endpointer.speech_end <= trigger:
+                    base += endpointer.position
+                    endpointer = Endpointer(vad, noise_db=endpointer.noise_db)
+                    continue
+                end = endpointer.speech_end + endpointer.hangover_frames * vad.frame_samples
+                break
+            if endpointer.speech_start is None:
+                if deadline and time.monotonic() > deadline:
+                    return None
+            elif limit_samples and endpointer.position - endpointer.speech_start >= limit_samples:
+                end = endpointer.position
+                break
+        else:
+            return None
+        # Keep the pre-roll ahead of the first speech frame
+        begin = max(0, base + endpointer.speech_start - pre_roll_samples)
+        return self.ring.read(origin + begin, origin + base + end)
+
+
+class RingSource(AudioSource):
+    """A live ``AudioSource`` reading one ``CaptureService`` stream through its own cursor.
+
+    Any number of these share one input stream, each seeing every sample.
+    ``position`` is the absolute ring position of the next sample to be read,
+    which ``CaptureService.capture_utterance`` accepts as ``start``. Stopping
+    the source only detaches it; the stream stays open for the other readers.
+
+    When the stream is closed under it (another microphone was selected, or a
+    device rescan released it), a source given ``reopen`` moves to the
+    service that returns instead of running dry.
+    """
+
+    live = True
+
+    def __init__(self, service: CaptureService,
+                 reopen: Optional[Callable[[], Optional[CaptureService]]] = None):
+        super().__init__(service.sample_rate)
+        self.service = service
+        self._reader = service.reader()
+        self._reopen = reopen
+        self._closed = False
+
+    @property
+    def position(self) -> int:
+        return self._reader.position
+
+    def read(self, n: int) -> np.ndarray:
+        """Block until ``n`` samples arrive; fewer once the stream or this source stops.
+
+        The result is a read-only view into the ring buffer, copied only when
+        it straddles the ring's end, so a steady stream of fixed-size frames
+        allocates no sample data at all. A view stays valid until the writer
+        laps this reader (BUFFER_SECONDS); copy anything kept longer.
+        """
+        while True:
+            reader, ring = self._reader, self.service.ring
+            while reader.available() < n and self.service.running and not self._closed:
+                ring.wait(reader.position + n - 1, timeout=0.1)
+            if reader.available() >= n or self._closed or not self.reattach():
+                break
+        reader.position = max(reader.position, ring.oldest)
+        pieces = [] if self._closed else ring.views(reader.position, reader.position + n)
+        if not pieces:
+            return np.empty(0, dtype=np.int16)
+        frame = pieces[0] if len(pieces) == 1 else np.concatenate(pieces)
+        reader.position += len(frame)
+        frame.flags.writeable = False
+        return frame
+
+    @property
+    def exhausted(self) -> bool:
+        return self._closed or (not self.service.running and self._reopen is None)
+
+    def catch_up(self):
+        self._reader.position = self.service.ring.written
+
+    def reattach(self) -> bool:
+        """Move to the stream ``reopen`` returns; False if there is none this source can read"""
+        service = self._reopen() if self._reopen is not None and not self._closed else None
+        if service is None or service is self.service:
+            return False
+        if service.sample_rate != self.sample_rate:
+            logger.warning(f"Reopened capture stream runs at {service.sample_rate} Hz, not {self.sample_rate}")
+            return False
+        self.service = service
+        self._reader = service.reader()
+        return True
+
+    def stop(self):
+        self._closed = True
+
+
+def capture_from_source(source, timeout: float, phrase_time_limit: float,
+                        pre_roll: float = PRE_ROLL_SECONDS,
+                        vad: Optional[VoiceActivityDetector] = None,
+                        on_chunk: Optional[Callable[[np.ndarray], None]] = None,
+                        noise_db: Optional[float] = None) -> Optional[np.ndarray]:
+    """``CaptureService.capture_utterance`` for any ``audio_source.AudioSource``.
+
+    The first AMBIENT_SECONDS read seed the noise floor. ``timeout`` and
+    ``phrase_time_limit`` count audio time, not wall time, so file and array
+    sources are endpointed as fast as they can be read. A source that runs
+    out mid-utterance ends it there.
+    """
+    rate = source.sample_rate
+    vad = vad or VoiceActivityDetector.from_profile(sample_rate=rate)
+    ring = RingBuffer(int(BUFFER_SECONDS * rate))
+    ambient = source.read(int(AMBIENT_SECONDS * rate))
+    ring.write(ambient)
+    # Endpointer positions count from the first sample after the ambient block
+    offset = len(ambient)
+    endpointer = Endpointer(vad, ambient, noise_db)
+    pre_roll_samples = int(pre_roll * rate)
+    timeout_samples = int(timeout * rate) if timeout else None
+    limit_samples = int(phrase_time_limit * rate) if phrase_time_limit else None
+
+    while True:
+        chunk = source.read(FRAME_SAMPLES)
+        if not chunk.size:
+            if endpointer.speech_start is None:
+                return None
+            end = endpointer.position
+            break
+        ring.write(chunk)
+        if on_chunk is not None:
+            on_chunk(chunk)
+        if endpointer.feed(chunk):
+            end = endpointer.speech_end + endpointer.hangover_frames * vad.frame_samples
+            break
+        if endpointer.speech_start is None:
+            if timeout_samples and endpointer.position >= timeout_samples:
+                return None
+        elif limit_samples and endpointer.position - endpointer.speech_start >= limit_samples:
+            end = endpointer.position
+            break
+    begin = max(-offset, endpointer.speech_start - pre_roll_samples)
+    return ring.read(offset + begin, offset + end)
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_capture_service(device_index: Optional[int] = None) -> Optional[CaptureService]:
+    """Shared, already-running capture service for ``device_index`` (None if it can't open)"""
+    with _services_lock:
+        service = _services.get(device_index)
+        if service is not None and service.running and not service.active:
+            logger.warning(f"Capture stream on device {device_index} stopped; reopening")
+            service.stop()
+            # A dead stream usually means the device list changed
+            get_registry().invalidate()
+        if service is None or not service.running:
+            service = CaptureService(device_index)
+            if not service.start():
+                get_registry().invalidate()
+                return None
+            _services[device_index] = service
+        return service
+
+
+def stop_capture_services():
+    with _services_lock:
+        for service in _services.values():
+            service.stop()
+        _services.clear()
+
+
+# An explicit device refresh closes the streams so PortAudio really rescans; they reopen on demand
+get_registry().add_release_hook(stop_capture_services)
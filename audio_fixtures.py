@@ -0,0 +1,124 @@
+"""
+Synthetic audio fixtures for the audio benchmarks.
+
+Real recordings can be dropped into the fixtures directory instead; the
+generated ones only stand in when nothing has been recorded yet. Each
+generated file is a speech-like command (harmonic vowels with syllable-rate
+envelopes, plus fricative bursts) over background noise, and ``labels.json``
+records where speech starts and ends so endpointing can be scored.
+"""
+import json
+import os
+import wave
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+FIXTURE_DIR = os.path.join("fixtures", "audio")
+LABELS_FILE = "labels.json"
+SAMPLE_RATE = 16000
+
+# name: (leading silence s, syllable durations s, gap between syllables s, noise type, SNR dB)
+FIXTURE_SPECS = {
+    "quiet_short": (0.8, [0.25, 0.3], 0.08, "white", 30),
+    "quiet_long": (0.8, [0.2, 0.25, 0.3, 0.2, 0.35], 0.12, "white", 30),
+    "office_short": (1.0, [0.3, 0.25], 0.1, "pink", 18),
+    "office_pause": (1.0, [0.25, 0.3, 0.3], 0.35, "pink", 18),
+    "fan_noise": (1.0, [0.3, 0.2, 0.3], 0.1, "brown", 12),
+    "noisy_long": (1.2, [0.25, 0.3, 0.2, 0.3, 0.25, 0.3], 0.15, "pink", 8),
+}
+TRAILING_SILENCE = 2.0
+
+
+def _noise(kind: str, n: int, rng: np.random.Generator) -> np.ndarray:
+    white = rng.standard_normal(n)
+    if kind == "white":
+        return white
+    spectrum = np.fft.rfft(white)
+    freqs = np.fft.rfftfreq(n, 1.0 / SAMPLE_RATE)
+    freqs[0] = freqs[1]
+    # 1/f (pink) or 1/f^2 (brown) power falloff
+    spectrum /= np.sqrt(freqs) if kind == "pink" else freqs
+    shaped = np.fft.irfft(spectrum, n)
+    return shaped / shaped.std()
+
+
+def _syllable(duration: float, rng: np.random.Generator) -> np.ndarray:
+    t = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+    f0 = rng.uniform(100, 220) * (1 + 0.1 * np.sin(2 * np.pi * 3 * t))
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    formants = rng.uniform([500, 1200], [900, 2200])
+    voiced = sum(np.sin(k * phase) / k * (1 + 2 * np.exp(-((k * f0 - formants[:, None]) ** 2).min(0) / 2e4))
+                 for k in range(1, 25))
+    envelope = np.sin(np.pi * t / duration) ** 0.6
+    syllable = voiced * envelope
+    if rng.random() < 0.5:
+        # Fricative onset ("s", "f"): a short high-passed noise burst
+        burst = int(0.06 * SAMPLE_RATE)
+        hiss = np.diff(rng.standard_normal(burst + 1)) * 0.4
+        syllable[:burst] = syllable[:burst] * 0.3 + hiss * np.hanning(burst)
+    return syllable / np.abs(syllable).max()
+
+
+def synth_command(lead: float, syllables: List[float], gap: float, noise: str, snr_db: float,
+                  seed: int = 0) -> Tuple[np.ndarray, float, float]:
+    """Return (int16 samples, speech start s, speech end s) for one synthetic command"""
+    rng = np.random.default_rng(seed)
+    parts = [np.zeros(int(lead * SAMPLE_RATE))]
+    for i, duration in enumerate(syllables):
+        if i:
+            parts.append(np.zeros(int(gap * SAMPLE_RATE)))
+        parts.append(_syllable(duration, rng))
+    speech_end = sum(len(p) for p in parts) / SAMPLE_RATE
+    parts.append(np.zeros(int(TRAILING_SILENCE * SAMPLE_RATE)))
+    speech = np.concatenate(parts) * 0.3
+    active = speech[int(lead * SAMPLE_RATE):int(speech_end * SAMPLE_RATE)]
+    speech_rms = np.sqrt(np.mean(active ** 2))
+    background = _noise(noise, len(speech), rng) * speech_rms / (10 ** (snr_db / 20))
+    mixed = np.clip(speech + background, -1.0, 1.0)
+    return (mixed * 32767).astype(np.int16), lead, speech_end
+
+
+def write_wav(path: str, samples: np.ndarray, sample_rate: int = SAMPLE_RATE):
+    with wave.open(path, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(samples.astype(np.int16).tobytes())
+
+
+def read_wav(path: str) -> Tuple[np.ndarray, int]:
+    """Return (int16 mono samples, sample rate); stereo files are averaged down"""
+    with wave.open(path, "rb") as wav_file:
+        if wav_file.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit WAV is supported")
+        channels = wav_file.getnchannels()
+        rate = wav_file.getframerate()
+        samples = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return samples, rate
+
+
+def ensure_fixtures(directory: str = FIXTURE_DIR) -> Dict[str, dict]:
+    """Generate the synthetic fixtures if ``directory`` has no WAV files; return the labels"""
+    os.makedirs(directory, exist_ok=True)
+    labels_path = os.path.join(directory, LABELS_FILE)
+    if not any(name.lower().endswith(".wav") for name in os.listdir(directory)):
+        labels = {}
+        for seed, (name, spec) in enumerate(FIXTURE_SPECS.items()):
+            samples, start, end = synth_command(*spec, seed=seed)
+            write_wav(os.path.join(directory, name + ".wav"), samples)
+            labels[name + ".wav"] = {"speech_start": start, "speech_end": end}
+        with open(labels_path, "w", encoding="utf-8") as f:
+            json.dump(labels, f, indent=2)
+    try:
+        with open(labels_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def list_fixtures(directory: str = FIXTURE_DIR) -> List[str]:
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.lower().endswith(".wav"))
@@ -0,0 +1,271 @@
+"""
+Where audio comes from, behind one small interface.
+
+Listeners and the wake word detector read mono int16 blocks from an
+``AudioSource`` instead of opening the microphone themselves, so the same
+capture -> STT -> intent -> action path runs against a live mic, a recorded
+file, an in-memory array or a synthetic signal. Non-live sources are served
+as fast as they are read (no real-time pacing) unless asked otherwise, which
+lets tests and benchmarks run faster than real time.
+"""
+import logging
+import time
+from typing import Optional
+
+import numpy as np
+import speech_recognition as sr
+
+from device_registry import get_registry
+
+try:
+    import pyaudio
+    PYAUDIO_AVAILABLE = True
+except ImportError:
+    PYAUDIO_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+CHUNK_SAMPLES = 480          # 30 ms at 16 kHz
+AUDIO_EXTENSIONS = (".wav", ".flac", ".aif", ".aiff")
+
+
+class AudioSource:
+    """Base class: a mono 16-bit stream read in blocks.
+
+    ``read(n)`` returns up to ``n`` int16 samples; an empty array means the
+    source is exhausted. Live sources block until audio arrives. Sources are
+    context managers (``start``/``stop``) and can be handed to
+    speech_recognition through ``as_sr_source``.
+    """
+
+    # True when reads are paced by a clock (a microphone), False for files and arrays
+    live = False
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        self.sample_rate = sample_rate
+
+    def start(self):
+        return self
+
+    def stop(self):
+        pass
+
+    def read(self, n: int) -> np.ndarray:
+        raise NotImplementedError
+
+    @property
+    def exhausted(self) -> bool:
+        """True once a finite source has nothing left to read"""
+        return False
+
+    def catch_up(self):
+        """Skip audio buffered while the reader was busy elsewhere (live shared sources only)"""
+        pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def as_sr_source(self) -> "SRSource":
+        return SRSource(self)
+
+
+class MicrophoneSource(AudioSource):
+    """Live input from a PyAudio device (blocking reads)"""
+
+    live = True
+
+    def __init__(self, device_index: Optional[int] = None, sample_rate: int = SAMPLE_RATE,
+                 frames_per_buffer: int = CHUNK_SAMPLES):
+        super().__init__(sample_rate)
+        self.device_index = device_index
+        self.frames_per_buffer = frames_per_buffer
+        self._pa = None
+        self._stream = None
+
+    def start(self):
+        if self._stream is not None:
+            return self
+        if not PYAUDIO_AVAILABLE:
+            raise ImportError("PyAudio not installed. Install with: pip install pyaudio")
+        self._pa = pyaudio.PyAudio()
+        get_registry().hold()
+        try:
+            self._stream = self._pa.open(
+                rate=self.sample_rate,
+                channels=1,
+                format=pyaudio.paInt16,
+                input=True,
+                input_device_index=self.device_index,
+                frames_per_buffer=self.frames_per_buffer,
+            )
+        except Exception:
+            self._pa.terminate()
+            self._pa = None
+            get_registry().release()
+            raise
+        return self
+
+    def read(self, n: int) -> np.ndarray:
+        if self._stream is None:
+            self.start()
+        data = self._stream.read(n, exception_on_overflow=False)
+        return np.frombuffer(data, dtype=np.int16)
+
+    def stop(self):
+        try:
+            if self._stream is not None:
+                self._stream.stop_stream()
+                self._stream.close()
+            if self._pa is not None:
+                self._pa.terminate()
+        except Exception as e:
+            logger.error(f"Error closing microphone source: {e}")
+        if self._pa is not None:
+            get_registry().release()
+        self._stream = None
+        self._pa = None
+
+
+class ArraySource(AudioSource):
+    """Samples already in memory; ``realtime`` paces reads like a microphone would"""
+
+    def __init__(self, samples: np.ndarray, sample_rate: int = SAMPLE_RATE, realtime: bool = False,
+                 loop: bool = False):
+        super().__init__(sample_rate)
+        samples = np.asarray(samples)
+        if samples.dtype != np.int16:
+            # Float audio in [-1, 1]
+            samples = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+        self.samples = samples
+        self.realtime = realtime
+        self.live = realtime
+        self.loop = loop
+        self.position = 0
+        self._clock = None
+
+    def read(self, n: int) -> np.ndarray:
+        if self.loop and self.position >= len(self.samples) and len(self.samples):
+            self.position = 0
+        chunk = self.samples[self.position:self.position + n]
+        self.position += len(chunk)
+        if self.realtime and len(chunk):
+            if self._clock is None:
+                self._clock = time.monotonic()
+            self._clock += len(chunk) / self.sample_rate
+            delay = self._clock - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return chunk
+
+    @property
+    def exhausted(self) -> bool:
+        return not self.loop and self.position >= len(self.samples)
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+
+class FileSource(ArraySource):
+    """A WAV, FLAC or AIFF recording, converted to mono 16-bit at ``sample_rate``"""
+
+    def __init__(self, path: str, sample_rate: Optional[int] = SAMPLE_RATE, realtime: bool = False,
+                 loop: bool = False):
+        with sr.AudioFile(path) as source:
+            audio = sr.Recognizer().record(source)
+        rate = sample_rate or audio.sample_rate
+        convert_rate = None if audio.sample_rate == rate else rate
+        samples = np.frombuffer(audio.get_raw_data(convert_rate=convert_rate, convert_width=2), dtype=np.int16)
+        super().__init__(samples, rate, realtime=realtime, loop=loop)
+        self.path = path
+
+
+class SyntheticSource(AudioSource):
+    """Generated silence, a sine tone or white noise; endless when ``seconds`` is None"""
+
+    KINDS = ("silence", "tone", "noise")
+
+    def __init__(self, kind: str = "silence", seconds: Optional[float] = None,
+                 sample_rate: int = SAMPLE_RATE, frequency: float = 440.0, amplitude: float = 0.1,
+                 seed: int = 0):
+        super().__init__(sample_rate)
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown synthetic source {kind!r}; expected one of {', '.join(self.KINDS)}")
+        self.kind = kind
+        self.total = None if seconds is None else int(seconds * sample_rate)
+        self.frequency = frequency
+        self.amplitude = amplitude
+        self.position = 0
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.total is not None and self.position >= self.total
+
+    def read(self, n: int) -> np.ndarray:
+        if self.total is not None:
+            n = max(0, min(n, self.total - self.position))
+        if self.kind == "silence":
+            chunk = np.zeros(n)
+        elif self.kind == "tone":
+            t = (self.position + np.arange(n)) / self.sample_rate
+            chunk = np.sin(2 * np.pi * self.frequency * t)
+        else:
+            chunk = self._rng.standard_normal(n) / 3.0
+        self.position += n
+        return (np.clip(chunk * self.amplitude, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+class _SRStream:
+    def __init__(self, source: AudioSource):
+        self.source = source
+
+    def read(self, size: int) -> bytes:
+        return self.source.read(size).tobytes()
+
+
+class SRSource(sr.AudioSource):
+    """Adapter so ``sr.Recognizer.listen`` and friends can read from any ``AudioSource``"""
+
+    def __init__(self, source: AudioSource, chunk: int = 1024):
+        self.source = source
+        self.SAMPLE_RATE = source.sample_rate
+        self.SAMPLE_WIDTH = 2
+        self.CHUNK = chunk
+        self.stream = None
+
+    def __enter__(self):
+        self.source.start()
+        self.stream = _SRStream(self.source)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
+        self.source.stop()
+
+
+def open_source(spec: str, sample_rate: int = SAMPLE_RATE, realtime: bool = False) -> AudioSource:
+    """Build a source from a short description.
+
+    ``mic`` or ``mic:INDEX``; a path to an audio file (or ``file:PATH``);
+    ``silence:SECONDS``, ``noise:SECONDS`` or ``tone:HZ:SECONDS``.
+    """
+    kind, _, rest = spec.partition(":")
+    kind = kind.lower()
+    if kind == "mic":
+        return MicrophoneSource(int(rest) if rest else None, sample_rate)
+    if kind == "file":
+        return FileSource(rest, sample_rate, realtime=realtime)
+    if kind in ("silence", "noise"):
+        return SyntheticSource(kind, float(rest) if rest else None, sample_rate)
+    if kind == "tone":
+        frequency, _, seconds = rest.partition(":")
+        return SyntheticSource("tone", float(seconds) if seconds else None, sample_rate,
+                               frequency=float(frequency or 440.0))
+    if spec.lower().endswith(AUDIO_EXTENSIONS):
+        return FileSource(spec, sample_rate, realtime=realtime)
+    raise ValueError(f"Unrecognised audio source: {spec!r}")
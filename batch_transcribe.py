@@ -0,0 +1,110 @@
+"""
+Batch transcription of recorded commands across a process pool.
+
+Each worker process loads its own copy of the STT model once (in the pool
+initializer) and then decodes whole files; results are written as JSON lines
+in completion order, so long runs can be watched or piped while they go.
+"""
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+
+AUDIO_EXTENSIONS = (".wav", ".flac", ".aif", ".aiff")
+# Engines that decode locally; Google would just be rate-limited network calls
+BATCH_ENGINES = ("vosk", "whisper", "faster_whisper")
+
+_engine = None
+_profile = "command"
+
+
+def find_audio_files(pattern: str) -> List[str]:
+    """Audio files under a directory (recursively) or matching a glob"""
+    if os.path.isdir(pattern):
+        paths = [os.path.join(root, name) for root, _, names in os.walk(pattern) for name in names]
+    else:
+        paths = glob.glob(pattern, recursive=True)
+    return sorted(p for p in paths if p.lower().endswith(AUDIO_EXTENSIONS))
+
+
+def _init_worker(engine_name: str, profile: str, threads: int):
+    """Load one model per worker process"""
+    global _engine, _profile
+    # Split the cores between workers instead of every model grabbing all of them
+    os.environ.setdefault("OMP_NUM_THREADS", str(threads))
+    os.environ.setdefault("FASTER_WHISPER_THREADS", str(threads))
+    from speech import create_stt_engine
+    _engine = create_stt_engine(engine_name)
+    if not _engine.load_model():
+        raise RuntimeError(f"{engine_name} model failed to load")
+    _profile = profile
+
+
+def _transcribe_one(path: str) -> dict:
+    import speech_recognition as sr
+    record = {"file": path, "engine": _engine.name, "worker": os.getpid()}
+    try:
+        with sr.AudioFile(path) as source:
+            audio = sr.Recognizer().record(source)
+        duration = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+        start = time.perf_counter()
+        text = _engine.recognize(audio, _profile)
+        decode = time.perf_counter() - start
+        record.update(duration=round(duration, 3), decode_seconds=round(decode, 3),
+                      rtf=round(decode / duration, 4) if duration else None, text=text or "")
+    except Exception as e:
+        record["error"] = str(e)
+    return record
+
+
+def transcribe_paths(pattern: str, engine_name: str, workers: Optional[int] = None,
+                     output: Optional[str] = None, profile: str = "command") -> int:
+    """Transcribe every audio file matched by ``pattern``; returns the number of files that failed.
+
+    Results go to ``output`` (JSONL) or stdout; a summary goes to stderr.
+    """
+    if engine_name not in BATCH_ENGINES:
+        print(f"Batch transcription needs a local engine ({', '.join(BATCH_ENGINES)}), not {engine_name!r}",
+              file=sys.stderr)
+        return 1
+    paths = find_audio_files(pattern)
+    if not paths:
+        print(f"No audio files match {pattern}", file=sys.stderr)
+        return 0
+    cpus = os.cpu_count() or 1
+    workers = max(1, min(workers or max(1, cpus // 2), len(paths)))
+    threads = max(1, cpus // workers)
+
+    out = open(output, "w", encoding="utf-8") if output else sys.stdout
+    started = time.perf_counter()
+    audio_total, failed, rtfs = 0.0, 0, []
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(engine_name, profile, threads)) as pool:
+            futures = [pool.submit(_transcribe_one, path) for path in paths]
+            for future in as_completed(futures):
+                record = future.result()
+                if "error" in record:
+                    failed += 1
+                else:
+                    audio_total += record["duration"]
+                    if record["rtf"] is not None:
+                        rtfs.append(record["rtf"])
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+    except BrokenProcessPool:
+        print(f"{engine_name} workers could not start (is the model installed?)", file=sys.stderr)
+        return len(paths)
+    finally:
+        if output:
+            out.close()
+    elapsed = time.perf_counter() - started
+    mean_rtf = sum(rtfs) / len(rtfs) if rtfs else 0.0
+    print(f"Transcribed {len(paths) - failed}/{len(paths)} files ({audio_total:.1f} s of audio) with "
+          f"{engine_name} on {workers} workers in {elapsed:.2f}s: mean RTF {mean_rtf:.3f}, "
+          f"{audio_total / elapsed if elapsed > 0 else 0.0:.1f}x real time overall", file=sys.stderr)
+    return failed
@@ -0,0 +1,172 @@
+"""
+Microbenchmark for intent matching latency.
+
+Compares the old per-action extractOne loop against match_intent (prefix router
+plus the flattened IntentIndex), both on a fixed set of distinct utterances and
+on a replay of the real command logs, where the same commands repeat.
+
+"Uncached" clears the utterance cache on every call and is the number to
+compare with the legacy loops: it is the cost of an utterance the assistant
+hasn't heard before. The first-hit loop stops at the first action over the
+threshold, so it is cheaper than any global best-score match; the full scan
+is the like-for-like baseline. "Cached" only measures the lru_cache on
+repeated utterances and is reported separately, not as a speedup of the
+index. The n-gram engine (INTENT_ENGINE=ngram) is timed uncached, along with
+how long it takes to train.
+Run with: python bench_intents.py
+"""
+import json
+import time
+
+from rapidfuzz import process
+
+import utils
+from utils import COMMANDS, MATCH_THRESHOLD, match_intent, read_command_log
+
+UTTERANCES = [
+    "open notepad",
+    "open google chrome",
+    "close spotify",
+    "set timer for 5 minutes",
+    "what time is it",
+    "tell me a joke",
+    "volume up",
+    "empty recycle bin",
+    "how is my pc",
+    "flip a coin",
+    "cal do jarurat hai per",
+    "bartan kahan hai jaane wala",
+    "verification baji",
+    "exit",
+]
+
+# Transcripts with typical STT mishears, for the phonetic correction section
+MISHEARD = [
+    "open node pair",
+    "open Note 3",
+    "open brve",
+    "open GoogleAnswers.exe",
+    "volum up",
+]
+
+
+def legacy_match_intent(user_input):
+    """The previous implementation: one extractOne scan per action, first hit wins."""
+    user_input = user_input.lower().strip()
+    if user_input.startswith("play ") and len(user_input) > 5:
+        return "play_youtube"
+    for action, phrases in COMMANDS.items():
+        match, score, _ = process.extractOne(user_input, phrases)
+        if score >= MATCH_THRESHOLD:
+            return action
+    return None
+
+
+def legacy_full_scan(user_input):
+    """The previous loop without the early exit, i.e. what a global best would cost."""
+    user_input = user_input.lower().strip()
+    best_action, best_score = None, 0
+    for action, phrases in COMMANDS.items():
+        match, score, _ = process.extractOne(user_input, phrases)
+        if score > best_score:
+            best_action, best_score = action, score
+    return best_action if best_score >= MATCH_THRESHOLD else None
+
+
+def cold_match_intent(user_input):
+    """match_intent with the utterance cache disabled, to time the raw index scan."""
+    utils._match_normalized.cache_clear()
+    return match_intent(user_input)
+
+
+def cold_ngram_intent(user_input):
+    """match_intent through the n-gram engine with the utterance cache disabled."""
+    utils._match_normalized.cache_clear()
+    utils.set_intent_engine("ngram")
+    try:
+        return match_intent(user_input)
+    finally:
+        utils.set_intent_engine("fuzzy")
+
+
+def load_replay():
+    """Commands from jarvo_command_log.txt and command_history.json, in log order."""
+    texts = [command for command, _ in read_command_log()]
+    try:
+        with open("command_history.json", "r", encoding="utf-8") as f:
+            texts.extend(entry["command"] for entry in json.load(f) if entry.get("command"))
+    except (FileNotFoundError, ValueError):
+        pass
+    return texts
+
+
+def bench(fn, texts, rounds):
+    """Return mean microseconds per utterance for ``fn`` over ``texts``."""
+    for text in texts:
+        fn(text)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            fn(text)
+    elapsed = time.perf_counter() - start
+    return elapsed / (rounds * len(texts)) * 1e6
+
+
+def report(label, texts, rounds):
+    legacy_us = bench(legacy_match_intent, texts, rounds)
+    full_us = bench(legacy_full_scan, texts, rounds)
+    cold_us = bench(cold_match_intent, texts, rounds)
+    ngram_us = bench(cold_ngram_intent, texts, rounds)
+    utils._match_normalized.cache_clear()
+    index_us = bench(match_intent, texts, rounds)
+    print(f"{label} ({len(texts)} utterances)")
+    print(f"  Legacy loop, first hit:  {legacy_us:8.1f} us/utterance")
+    print(f"  Legacy loop, full scan:  {full_us:8.1f} us/utterance")
+    print(f"  match_intent, uncached:  {cold_us:8.1f} us/utterance")
+    print(f"  n-gram engine, uncached: {ngram_us:8.1f} us/utterance")
+    print(f"  match_intent, cached:    {index_us:8.1f} us/utterance (repeats only)")
+
+
+if __name__ == "__main__":
+    print("Intent matching microbenchmark")
+    print("=" * 60)
+    start = time.perf_counter()
+    utils._NGRAM_CLASSIFIER = None
+    classifier = utils.get_ngram_classifier()
+    print(f"N-gram engine trained on {classifier._weights_t.shape[1]} examples "
+          f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+    report("Distinct utterances", UTTERANCES, rounds=500)
+    replay = load_replay()
+    if replay:
+        report("Log replay", replay, rounds=20)
+        utils.ROUTER_STATS.clear()
+        for text in replay:
+            match_intent(text)
+        rates = utils.router_hit_rates()
+        print(f"  Tier hit rates: prefix {rates['prefix']:.0%}, fuzzy {rates['fuzzy']:.0%}, "
+              f"miss {rates['miss']:.0%}")
+    print("=" * 60)
+    print("Utterances where best-score matching disagrees with first-hit matching:")
+    changed = [(t, legacy_match_intent(t), match_intent(t)) for t in UTTERANCES
+               if legacy_match_intent(t) != match_intent(t)]
+    for text, old, new in changed:
+        print(f"  {text!r}: {old} -> {new}")
+    print("=" * 60)
+    from phonetic import correct_command, correction_hit_rate, get_corrector
+    from slots import extract_intent
+    corrector = get_corrector()
+    texts = list(dict.fromkeys(MISHEARD + UTTERANCES + replay))
+    print(f"Phonetic correction ({len(texts)} distinct utterances, "
+          f"{bench(corrector.correct, texts, rounds=20):.1f} us/utterance)")
+    corrector.stats.clear()
+    for text in texts:
+        corrected, changes = corrector.correct_with_changes(text)
+        if changes:
+            kept = correct_command(text)[0] != text
+            print(f"  {text!r} -> {corrected!r} ({'kept' if kept else 'dropped, same command'})")
+            print(f"      {extract_intent(text)} -> {extract_intent(corrected)}")
+        else:
+            correct_command(text)
+    stats = correction_hit_rate()
+    print(f"  Hit rate: {stats['hit_rate']:.1%} of utterances corrected "
+          f"({stats.get('tokens', 0)} spans rewritten)")
@@ -0,0 +1,91 @@
+"""
+Cost of each audio preprocessing stage, in milliseconds per second of audio.
+
+Every WAV fixture is also resampled to the common device rates (44.1 and
+48 kHz) so the resample stage is timed the way a USB or WASAPI microphone
+would exercise it; the other stages run at the 16 kHz engine rate they see
+in the pipeline. The budget is a few milliseconds per second of audio for
+the whole chain.
+
+The gate's effect is reported from labels.json: the noise level outside the
+labelled speech and the speech level inside it, before and after, so a
+higher SNR gain means more noise removed without eating into the speech.
+Run with: python bench_preprocess.py [--fixtures DIR] [--rounds 20]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from audio_fixtures import FIXTURE_DIR, ensure_fixtures, list_fixtures, read_wav
+from preprocess import PREPROCESS_STAGES, Preprocessor, auto_gain, remove_dc, resample, spectral_gate
+
+DEVICE_RATES = [44100, 48000]
+BUDGET_MS = 5.0
+
+
+def ms_per_second(fn, x, rate, rounds):
+    fn(x)  # warm-up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(x)
+    return (time.perf_counter() - start) / rounds * 1000 / (len(x) / rate)
+
+
+def level_db(x):
+    return 10.0 * np.log10(np.mean(x * x) + 1e-12) if len(x) else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the preprocessing stages on the audio fixtures")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    labels = ensure_fixtures(args.fixtures)
+    clips = []
+    for path in list_fixtures(args.fixtures):
+        samples, rate = read_wav(path)
+        clips.append((os.path.basename(path), samples.astype(np.float32) / 32768.0, rate))
+
+    print("Preprocessing cost, ms per second of audio")
+    print("=" * 60)
+    totals = {}
+    for rate in DEVICE_RATES:
+        cost = np.mean([ms_per_second(lambda x: resample(x, rate, 16000), resample(clip, clip_rate, rate),
+                                      rate, args.rounds) for _, clip, clip_rate in clips])
+        totals[f"resample {rate}"] = cost
+        print(f"resample {rate:>5} -> 16000  {cost:7.3f} ms/s")
+    stages = {
+        "dc": remove_dc,
+        "agc": lambda x: auto_gain(x, 16000),
+        "gate": spectral_gate,
+    }
+    for name, fn in stages.items():
+        totals[name] = np.mean([ms_per_second(fn, clip, clip_rate, args.rounds) for _, clip, clip_rate in clips])
+        print(f"{name:<22}  {totals[name]:7.3f} ms/s")
+    chain = Preprocessor(PREPROCESS_STAGES)
+    worst = np.mean([ms_per_second(lambda x: chain.process(x, 48000),
+                                   (resample(clip, clip_rate, 48000) * 32767).astype(np.int16),
+                                   48000, args.rounds) for _, clip, clip_rate in clips])
+    print(f"{'all stages from 48000':<22}  {worst:7.3f} ms/s  "
+          f"({'within' if worst <= BUDGET_MS else 'over'} the {BUDGET_MS:.0f} ms/s budget)")
+
+    print("=" * 60)
+    print("Spectral gate on the labelled fixtures")
+    for name, clip, clip_rate in clips:
+        label = labels.get(name)
+        if not label:
+            continue
+        start, end = int(label["speech_start"] * clip_rate), int(label["speech_end"] * clip_rate)
+        gated = spectral_gate(clip)
+        before = (level_db(clip[start:end]), level_db(np.concatenate([clip[:start], clip[end:]])))
+        after = (level_db(gated[start:end]), level_db(np.concatenate([gated[:start], gated[end:]])))
+        print(f"  {name:<18} noise {before[1]:6.1f} -> {after[1]:6.1f} dBFS  "
+              f"speech {before[0]:6.1f} -> {after[0]:6.1f} dBFS  "
+              f"SNR gain {(after[0] - after[1]) - (before[0] - before[1]):+5.1f} dB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Slot extraction check and benchmark.
+
+Runs every utterance in slot_corpus.jsonl (commands taken from the real logs,
+plus timer phrasings) through slots.extract_intent, reports mismatches, and
+compares extraction time against the old str.replace parsing in route_action.
+Run with: python bench_slots.py
+"""
+import json
+import re
+import time
+
+from slots import extract_intent, extract_slots
+
+CORPUS_FILE = "slot_corpus.jsonl"
+
+
+def legacy_parse(action, command):
+    """The parsing route_action used to do inline, kept here for comparison."""
+    if action == "open_app":
+        app_name = command.lower()
+        for word in ["open", "launch", "start", "run"]:
+            app_name = app_name.replace(word, "")
+        for filler in ["to", "the", "a", "an", "my", "please"]:
+            app_name = app_name.replace(filler, "")
+        app_name = app_name.strip()
+        if "google" in app_name or "chrome" in app_name:
+            app_name = "chrome"
+        elif "edge" in app_name:
+            app_name = "edge"
+        elif "firefox" in app_name:
+            app_name = "firefox"
+        elif "notepad" in app_name:
+            app_name = "notepad"
+        elif "calculator" in app_name or "calc" in app_name:
+            app_name = "calc"
+        return app_name
+    if action == "set_timer":
+        match = re.search(r'(\d+)', command)
+        return int(match.group(1)) if match else 60
+    if action == "play_youtube":
+        query = command.lower().replace("play", "", 1).strip()
+        for filler in ["song", "video", "music", "on youtube"]:
+            query = query.replace(filler, "")
+        return query.strip()
+    return None
+
+
+def load_corpus():
+    with open(CORPUS_FILE, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def check(corpus):
+    failures = 0
+    for case in corpus:
+        intent = extract_intent(case["text"])
+        if intent.action != case["action"] or intent.slots() != case["slots"]:
+            failures += 1
+            print(f"  MISMATCH {case['text']!r}")
+            print(f"    expected {case['action']} {case['slots']}")
+            print(f"    got      {intent.action} {intent.slots()}")
+    return failures
+
+
+def bench(fn, corpus, rounds=2000):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for case in corpus:
+            fn(case["action"], case["text"])
+    return (time.perf_counter() - start) / (rounds * len(corpus)) * 1e6
+
+
+if __name__ == "__main__":
+    corpus = load_corpus()
+    print(f"Slot extraction corpus: {len(corpus)} utterances")
+    print("=" * 60)
+    failures = check(corpus)
+    print(f"Correct: {len(corpus) - failures}/{len(corpus)}")
+    print("=" * 60)
+    print(f"Legacy str.replace parsing: {bench(legacy_parse, corpus):6.1f} us/utterance")
+    print(f"extract_slots:              {bench(extract_slots, corpus):6.1f} us/utterance")
+    print("\nLegacy parse vs extracted slots:")
+    for case in corpus:
+        old = legacy_parse(case["action"], case["text"])
+        if old is not None:
+            print(f"  {case['text']!r}: {old!r} -> {case['slots']}")
@@ -0,0 +1,85 @@
+"""
+Real-time factor (decode time / audio duration) of the local STT engines.
+
+Each engine installed here is created through speech.create_stt_engine,
+exactly as STT_ENGINE selects it, and decodes every fixture; an RTF below
+1.0 means faster than real time. Model load time is reported separately
+because it is paid once per session, not per command. Engines that are not
+installed, or whose model fails to load, are listed and skipped.
+
+faster-whisper runs with the FASTER_WHISPER_* settings from the environment
+(int8 on CPU by default); use --model to compare the same size as whisper,
+and --profile to time the command or dictation decoding settings.
+Run with: python bench_stt.py [--fixtures DIR] [--engines whisper,vosk,faster_whisper]
+          [--profile command] [--rounds 3]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import speech_recognition as sr
+
+from audio_fixtures import FIXTURE_DIR, ensure_fixtures, list_fixtures, read_wav
+from speech import DECODING_PROFILES, create_stt_engine
+
+LOCAL_ENGINES = ["whisper", "vosk", "faster_whisper"]
+
+
+def load_engine(name, model=None):
+    """Return (engine, load seconds), or (None, reason) if it can't run here"""
+    engine = create_stt_engine(name)
+    if not engine.is_available():
+        return None, "not installed"
+    if model and hasattr(engine, "model_size"):
+        engine.model_size = model
+    start = time.perf_counter()
+    if not engine.load_model():
+        return None, "model failed to load"
+    return engine, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare STT real-time factor on the audio fixtures")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR)
+    parser.add_argument("--engines", default=",".join(LOCAL_ENGINES))
+    parser.add_argument("--model", help="model size for whisper and faster_whisper, e.g. base")
+    parser.add_argument("--profile", default="command", choices=sorted(DECODING_PROFILES))
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    ensure_fixtures(args.fixtures)
+    clips = []
+    for path in list_fixtures(args.fixtures):
+        samples, rate = read_wav(path)
+        clips.append((os.path.basename(path), sr.AudioData(samples.tobytes(), rate, 2), len(samples) / rate))
+
+    print(f"STT real-time factor, {args.profile} profile (lower is faster; < 1.0 is faster than real time)")
+    print("=" * 60)
+    summary = []
+    for name in [e.strip() for e in args.engines.split(",") if e.strip()]:
+        engine, load = load_engine(name, args.model)
+        if engine is None:
+            print(f"{name}: skipped ({load})")
+            continue
+        print(f"{name}: model loaded in {load:.2f} s")
+        rtfs = []
+        for clip_name, audio, duration in clips:
+            engine.recognize(audio, args.profile)  # warm-up
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                text = engine.recognize(audio, args.profile)
+            decode = (time.perf_counter() - start) / args.rounds
+            rtfs.append(decode / duration)
+            print(f"  {clip_name:<18}{duration:6.2f} s  decode {decode * 1000:8.1f} ms  "
+                  f"RTF {rtfs[-1]:.3f}  {text!r}")
+        summary.append((name, load, float(np.mean(rtfs)) if rtfs else float("nan")))
+    print("=" * 60)
+    for name, load, rtf in summary:
+        print(f"{name:<16} load {load:6.2f} s   mean RTF {rtf:.3f}")
+    if not summary:
+        print("No local STT engine is installed (pip install faster-whisper, openai-whisper or vosk)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Endpointing benchmark: NumPy VAD vs the recognizer's fixed pause threshold.
+
+For every WAV fixture, measures how long after the true end of speech each
+path closes the utterance (the wait before STT can start; decoding time is
+the same for both paths) and whether the captured audio covers the whole
+command. The legacy path is speech_recognition's listen() configured exactly
+as SpeechRecognizer does on first use of a device; the VAD path is the Endpointer
+used by the persistent capture service, seeded with 0.5 s of ambient audio.
+
+Fixtures come from fixtures/audio (labels.json gives the true speech end);
+synthetic ones are generated there if the directory has no WAV files.
+Run with: python bench_vad.py [--fixtures DIR] [--profile office]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import speech_recognition as sr
+
+from audio_fixtures import FIXTURE_DIR, ensure_fixtures, list_fixtures, read_wav
+from vad import VAD_PRESETS, Endpointer, VoiceActivityDetector
+
+AMBIENT_SECONDS = 0.5
+CHUNK_SAMPLES = 480
+
+
+def legacy_endpoint(path):
+    """Return how many seconds into the file listen() returned, or None if it heard nothing"""
+    recognizer = sr.Recognizer()
+    with sr.AudioFile(path) as source:
+        recognizer.adjust_for_ambient_noise(source, duration=AMBIENT_SECONDS)
+        recognizer.energy_threshold = max(300, recognizer.energy_threshold * 0.8)
+        recognizer.dynamic_energy_threshold = True
+        recognizer.dynamic_energy_adjustment_damping = 0.15
+        recognizer.dynamic_energy_ratio = 1.5
+        recognizer.pause_threshold = 0.8
+        try:
+            recognizer.listen(source, timeout=6, phrase_time_limit=8)
+        except sr.WaitTimeoutError:
+            return None
+        return source.audio_reader.tell() / source.SAMPLE_RATE
+
+
+def vad_endpoint(samples, rate, profile):
+    """Return (seconds into the file where the utterance closed, speech start, speech end, cpu s)"""
+    ambient_samples = int(AMBIENT_SECONDS * rate)
+    detector = VoiceActivityDetector.from_profile(profile, sample_rate=rate)
+    start = time.perf_counter()
+    endpointer = Endpointer(detector, samples[:ambient_samples])
+    for i in range(ambient_samples, len(samples), CHUNK_SAMPLES):
+        if endpointer.feed(samples[i:i + CHUNK_SAMPLES]):
+            break
+    cpu = time.perf_counter() - start
+    if endpointer.speech_start is None:
+        return None, None, None, cpu
+    offset = ambient_samples / rate
+    speech_end = endpointer.speech_end if endpointer.done else endpointer.position
+    return (offset + endpointer.position / rate, offset + endpointer.speech_start / rate,
+            offset + speech_end / rate, cpu)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare VAD endpointing with the fixed pause threshold")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR)
+    parser.add_argument("--profile", default="office", choices=sorted(VAD_PRESETS))
+    args = parser.parse_args()
+
+    labels = ensure_fixtures(args.fixtures)
+    print("Endpointing benchmark (seconds after true end of speech)")
+    print("=" * 60)
+    print(f"{'fixture':<18}{'legacy':>9}{'vad':>9}{'saved':>9}  covers speech (legacy/vad)")
+    legacy_delays, vad_delays, cpu_total, audio_total = [], [], 0.0, 0.0
+    for path in list_fixtures(args.fixtures):
+        name = os.path.basename(path)
+        samples, rate = read_wav(path)
+        label = labels.get(name)
+        legacy_end = legacy_endpoint(path)
+        vad_end, start, end, cpu = vad_endpoint(samples, rate, args.profile)
+        cpu_total += cpu
+        audio_total += (vad_end or len(samples) / rate) - AMBIENT_SECONDS
+        if label is None or legacy_end is None or vad_end is None:
+            print(f"{name:<18}  no label or no speech detected (legacy {legacy_end}, vad {vad_end})")
+            continue
+        true_end = label["speech_end"]
+        legacy_delay, vad_delay = legacy_end - true_end, vad_end - true_end
+        # A negative delay means the utterance was cut off before the speech ended
+        legacy_covers = legacy_delay >= 0
+        vad_covers = start <= label["speech_start"] + 0.1 and end >= true_end - 0.1
+        if legacy_covers and vad_covers:
+            legacy_delays.append(legacy_delay)
+            vad_delays.append(vad_delay)
+        print(f"{name:<18}{legacy_delay:9.2f}{vad_delay:9.2f}{legacy_delay - vad_delay:9.2f}  "
+              f"{'yes' if legacy_covers else 'CUT'}/{'yes' if vad_covers else 'CUT'}")
+    print("=" * 60)
+    if vad_delays:
+        print(f"Mean wait after speech where both kept the whole command ({len(vad_delays)} files): "
+              f"legacy {np.mean(legacy_delays):.2f} s, VAD ({args.profile}) {np.mean(vad_delays):.2f} s")
+    if audio_total:
+        print(f"VAD cost: {cpu_total / audio_total * 1000:.2f} ms CPU per second of audio")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+CPU cost of an idle wake-word session: struct.unpack frames vs the zero-copy path.
+
+Simulates an hour (or --minutes) of background noise the way the assistant
+receives it: 30 ms capture callbacks written into the shared ring buffer,
+read back in Porcupine-sized frames through a RingSource and handed to the
+wake word engine. Both paths do the same capture and ring work; they differ
+only in how a frame reaches the engine:
+
+- legacy: frame bytes -> struct.unpack_from tuple -> ctypes array built
+  from the tuple (what Porcupine.process does with its argument)
+- zero-copy: ring view -> pointer to its memory (wake_word.native_process)
+
+With pvporcupine installed the real engine runs; otherwise a no-op C call
+stands in for it, which isolates the per-frame overhead being compared.
+CPU time is process time, reported per hour of audio and as a share of
+one core.
+Run with: python bench_wake_word.py [--minutes 60]
+"""
+import argparse
+import ctypes
+import ctypes.util
+import struct
+import sys
+import time
+from ctypes import POINTER, c_int, c_short
+
+import numpy as np
+
+from audio_capture import FRAME_SAMPLES, CaptureService
+from wake_word import frame_pointer, native_process
+
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 512
+
+
+def stand_in_engine():
+    """(process(pointer) -> int, name): a C call that ignores the frame, shaped like pv_porcupine_process"""
+    libc = ctypes.CDLL(ctypes.util.find_library("c") if sys.platform != "win32" else "msvcrt")
+    memchr = libc.memchr
+    memchr.argtypes = [POINTER(c_short), c_int, ctypes.c_size_t]
+    memchr.restype = ctypes.c_void_p
+    return (lambda pointer: memchr(pointer, 0, 0) or -1), "no-op C call (pvporcupine not installed)"
+
+
+def make_paths():
+    """Return ({path name: process(frame ndarray) -> int}, engine description)"""
+    try:
+        import pvporcupine
+        porcupine = pvporcupine.create(keywords=["jarvis"], sensitivities=[0.7])
+        fast = native_process(porcupine)
+        if fast is None:
+            raise ImportError("this pvporcupine has no native process function")
+        legacy = lambda frame: porcupine.process(struct.unpack_from("h" * FRAME_LENGTH, frame))
+        return {"legacy struct.unpack": legacy, "zero-copy": fast}, "Porcupine"
+    except Exception:
+        engine, name = stand_in_engine()
+
+        def legacy(frame):
+            pcm = struct.unpack_from("h" * FRAME_LENGTH, frame)
+            return engine((c_short * len(pcm))(*pcm))
+
+        def zero_copy(frame):
+            return engine(frame_pointer(frame))
+
+        return {"legacy struct.unpack": legacy, "zero-copy": zero_copy}, name
+
+
+def run_session(process, seconds, noise):
+    """CPU seconds to capture and scan ``seconds`` of ``noise`` bytes (looped)"""
+    service = CaptureService(buffer_seconds=30)
+    # No device: the benchmark plays the capture callback itself
+    service.running = True
+    source = service.source()
+    chunk_bytes = FRAME_SAMPLES * 2
+    total_chunks = int(seconds * SAMPLE_RATE / FRAME_SAMPLES)
+    offset = 0
+    start = time.process_time()
+    for _ in range(total_chunks):
+        # PyAudio hands every callback a fresh bytes object
+        service.ring.write(noise[offset:offset + chunk_bytes])
+        offset = (offset + chunk_bytes) % (len(noise) - chunk_bytes)
+        while service.ring.written - source.position >= FRAME_LENGTH:
+            process(source.read(FRAME_LENGTH))
+    return time.process_time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU usage of an idle wake word session")
+    parser.add_argument("--minutes", type=float, default=60.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    noise = (rng.standard_normal(SAMPLE_RATE * 10) * 300).astype(np.int16).tobytes()
+    paths, engine = make_paths()
+    seconds = args.minutes * 60
+
+    print(f"Idle wake word session, {args.minutes:g} min of audio, engine: {engine}")
+    print("=" * 60)
+    results = {}
+    for name, process in paths.items():
+        cpu = run_session(process, seconds, noise)
+        per_hour = cpu * 3600 / seconds
+        results[name] = per_hour
+        print(f"{name:<22} {cpu:8.2f} s CPU   {per_hour:8.2f} s/hour   {per_hour / 36:6.3f}% of a core")
+    print("=" * 60)
+    legacy, fast = results["legacy struct.unpack"], results["zero-copy"]
+    print(f"zero-copy saves {legacy - fast:.2f} CPU seconds per idle hour ({legacy / fast:.1f}x less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Per-utterance overhead of getting captured audio into Whisper.
+
+Legacy: WAV-encode the AudioData, wrap it in a second WAV inside a
+NamedTemporaryFile, then let whisper.load_audio() run ffmpeg on it (skipped,
+and reported as such, when neither whisper nor ffmpeg is installed).
+Direct: audio_capture.audio_data_to_float32(), which is what
+WhisperSTT.recognize now hands to transcribe().
+
+Model inference is identical for both, so it is not timed.
+Run with: python bench_whisper_input.py [--fixtures DIR] [--rounds 20]
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import wave
+
+import numpy as np
+import speech_recognition as sr
+
+from audio_capture import audio_data_to_float32
+from audio_fixtures import FIXTURE_DIR, ensure_fixtures, list_fixtures, read_wav
+
+
+def _ffmpeg_load(path, sample_rate=16000):
+    """The decode whisper.load_audio() performs, for when whisper itself isn't installed"""
+    cmd = ["ffmpeg", "-nostdin", "-threads", "0", "-i", path, "-f", "s16le", "-ac", "1",
+           "-acodec", "pcm_s16le", "-ar", str(sample_rate), "-"]
+    out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+
+
+def _decoder():
+    try:
+        import whisper
+        return whisper.load_audio
+    except ImportError:
+        return _ffmpeg_load if shutil.which("ffmpeg") else None
+
+
+def legacy_input(audio_data, decode):
+    """The old WhisperSTT.recognize preparation, up to the array transcribe() ends up with"""
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
+        with wave.open(temp_file.name, 'wb') as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(16000)
+            wav_file.writeframes(audio_data.get_wav_data())
+        samples = decode(temp_file.name) if decode else None
+        os.unlink(temp_file.name)
+    return samples
+
+
+def bench(fn, rounds):
+    fn()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the Whisper input path per utterance")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    ensure_fixtures(args.fixtures)
+    decode = _decoder()
+    print("Whisper input preparation, ms per utterance")
+    print("=" * 60)
+    if decode is None:
+        print("(whisper/ffmpeg not installed: legacy column omits the ffmpeg decode)")
+    print(f"{'fixture':<18}{'seconds':>8}{'legacy':>10}{'direct':>10}{'saved':>10}")
+    totals = np.zeros(2)
+    for path in list_fixtures(args.fixtures):
+        samples, rate = read_wav(path)
+        audio = sr.AudioData(samples.tobytes(), rate, 2)
+        legacy_ms = bench(lambda: legacy_input(audio, decode), args.rounds)
+        direct_ms = bench(lambda: audio_data_to_float32(audio), args.rounds)
+        totals += (legacy_ms, direct_ms)
+        print(f"{os.path.basename(path):<18}{len(samples) / rate:8.2f}{legacy_ms:10.3f}{direct_ms:10.3f}"
+              f"{legacy_ms - direct_ms:10.3f}")
+    print("=" * 60)
+    count = len(list_fixtures(args.fixtures))
+    if count:
+        print(f"Mean: legacy {totals[0] / count:.3f} ms, direct {totals[1] / count:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -24,10 +24,58 @@ def get_gemini_api_key() -> str:
 
 
 def get_stt_engine() -> str:
-    """Return Speech-to-Text engine preference."""
+    """Return Speech-to-Text engine preference: google, vosk, whisper, faster_whisper or hedged."""
     return os.getenv("STT_ENGINE", "google")
 
 
+def get_intent_engine() -> str:
+    """Return the second-tier intent matcher: "fuzzy" (rapidfuzz) or "ngram"."""
+    return os.getenv("INTENT_ENGINE", "fuzzy").lower()
+
+
+def get_intent_training_file() -> str:
+    """Return the labelled JSONL file the n-gram intent engine also trains on, or "" for none.
+
+    There is no default: intent_eval.jsonl is the evaluation set and must not be trained on.
+    """
+    return os.getenv("INTENT_TRAINING_FILE", "")
+
+
+def get_faster_whisper_model() -> str:
+    """Return the faster-whisper model size or path (tiny, base, small, ... or a CTranslate2 dir)."""
+    return os.getenv("FASTER_WHISPER_MODEL", "base")
+
+
+def get_faster_whisper_compute_type() -> str:
+    """Return the CTranslate2 compute type, e.g. int8, int8_float32 or float32."""
+    return os.getenv("FASTER_WHISPER_COMPUTE_TYPE", "int8")
+
+
+def get_faster_whisper_threads() -> int:
+    """Return CPU threads for faster-whisper; 0 lets CTranslate2 decide."""
+    return int(os.getenv("FASTER_WHISPER_THREADS", "0"))
+
+
+def get_dictation_beam_size() -> int:
+    """Return the Whisper beam size for dictation; commands always decode greedily."""
+    return int(os.getenv("DICTATION_BEAM_SIZE", "5"))
+
+
+def get_vosk_grammar() -> bool:
+    """Return whether Vosk decodes against a grammar built from the command phrases."""
+    return os.getenv("VOSK_GRAMMAR", "false").lower() == "true"
+
+
+def get_vosk_grammar_confidence() -> float:
+    """Return the mean word confidence below which a grammar result falls back to free-form Vosk."""
+    return float(os.getenv("VOSK_GRAMMAR_CONFIDENCE", "0.7"))
+
+
+def get_whisper_language() -> str:
+    """Return the Whisper language code for commands; empty detects it once and reuses it."""
+    return os.getenv("WHISPER_LANGUAGE", "").strip().lower()
+
+
 def get_wake_word_enabled() -> bool:
     """Return whether wake word detection is enabled."""
     return os.getenv("WAKE_WORD_ENABLED", "true").lower() == "true"
@@ -43,3 +91,67 @@ def get_phrase_time_limit() -> int:
     return int(os.getenv("PHRASE_TIME_LIMIT", "8"))
 
 
+def get_persistent_capture() -> bool:
+    """Return whether to keep one microphone stream open instead of reopening it per command."""
+    return os.getenv("PERSISTENT_CAPTURE", "true").lower() == "true"
+
+
+def get_device_refresh_seconds() -> float:
+    """Return how long the cached audio device list is trusted before re-scanning."""
+    return float(os.getenv("DEVICE_REFRESH_SECONDS", "30"))
+
+
+def get_mic_quality_file() -> str:
+    """Return the JSON file that caches measured microphone quality scores."""
+    return os.getenv("MIC_QUALITY_FILE", "mic_quality.json")
+
+
+def get_vad_profile() -> str:
+    """Return the VAD endpointing profile: "quiet", "office" or "noisy"."""
+    return os.getenv("VAD_PROFILE", "office").lower()
+
+
+def get_pre_roll_seconds() -> float:
+    """Return how much audio from before the trigger to include in a command."""
+    return float(os.getenv("PRE_ROLL_SECONDS", "0.5"))
+
+
+def get_preprocess_stages() -> list:
+    """Return the enabled audio preprocessing stages, from "resample", "dc", "agc" and "gate"."""
+    stages = os.getenv("PREPROCESS_STAGES", "resample,dc")
+    return [stage.strip().lower() for stage in stages.split(",") if stage.strip()]
+
+
+def get_noise_profile_file() -> str:
+    """Return the JSON file that keeps each microphone's tracked background noise."""
+    return os.getenv("NOISE_PROFILE_FILE", "noise_profiles.json")
+
+
+def get_hedge_local_engine() -> str:
+    """Return the offline engine the "hedged" STT mode races against Google: vosk, whisper or faster_whisper."""
+    return os.getenv("HEDGE_LOCAL_ENGINE", "vosk").lower()
+
+
+def get_hedge_budget_seconds() -> float:
+    """Return how long hedged STT waits for a confident result before taking the best one so far."""
+    return float(os.getenv("HEDGE_BUDGET_SECONDS", "2.0"))
+
+
+def get_hedge_min_confidence() -> float:
+    """Return the confidence (0..1) a hedged STT result needs to win the race outright."""
+    return float(os.getenv("HEDGE_MIN_CONFIDENCE", "0.6"))
+
+
+def get_hedge_breaker_failures() -> int:
+    """Return how many failures in a row take an engine out of the hedged race."""
+    return int(os.getenv("HEDGE_BREAKER_FAILURES", "3"))
+
+
+def get_hedge_breaker_seconds() -> float:
+    """Return how long an engine stays out of the hedged race before it is retried."""
+    return float(os.getenv("HEDGE_BREAKER_SECONDS", "60"))
+
+
+def get_wake_pre_roll_seconds() -> float:
+    """Return how much audio from before the wake word detection to include in the command."""
+    return float(os.getenv("WAKE_PRE_ROLL_SECONDS", "0.3"))
@@ -2,6 +2,8 @@ import speech_recognition as sr
 import pyaudio
 import sys
 
+from mic_quality import score_microphones
+
 def test_mic(index, name):
     print(f"\n--- Testing Mic [{index}] {name} ---")
     r = sr.Recognizer()
@@ -32,8 +34,11 @@ def test_mic(index, name):
 
 mics = sr.Microphone.list_microphone_names()
 candidates = [i for i, m in enumerate(mics) if "Microphone" in m or "Input" in m]
+# Measure every candidate at once and try the best first
+scores = score_microphones(candidates, force=True)
+candidates.sort(key=lambda i: scores[i], reverse=True)
 
-print(f"Found candidates: {candidates}")
+print(f"Found candidates: {[(i, scores[i]) for i in candidates]}")
 
 for i in candidates:
     if test_mic(i, mics[i]):
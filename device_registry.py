@@ -0,0 +1,197 @@
+"""
+Cached list of audio input devices, independent of any STT engine.
+
+Enumerating devices initialises PortAudio, which is slow enough to notice
+(and on Windows can take a good fraction of a second), so the list is
+cached and only rebuilt when it is older than DEVICE_REFRESH_SECONDS, when
+someone asks explicitly (the Settings "Refresh" button), or when a capture
+stream dies, which is how an unplugged device shows up. Listeners are told
+whenever a rebuild finds a different set of devices.
+
+PortAudio only rescans the hardware when it is initialised from scratch,
+i.e. when no other PyAudio instance in the process is still open. Streams
+that stay open (the persistent capture stream) therefore ``hold`` the
+registry: while one is held, a stale cache is kept instead of re-enumerating
+the same list, and an explicit refresh first runs the release hooks, which
+close those streams so the rescan is real. They reopen on the next listen.
+
+Indices are PortAudio device indices, the ones ``sr.Microphone``,
+``pyaudio`` and ``sounddevice`` all accept.
+"""
+import logging
+import threading
+import time
+from typing import Callable, List, Optional
+
+from config import get_device_refresh_seconds
+
+logger = logging.getLogger(__name__)
+
+
+def device_key(name: str, host_api: str) -> str:
+    """Stable identity of an input device across reboots (indices are not)"""
+    return f"{name}|{host_api}"
+
+
+class DeviceInfo:
+    """One PortAudio input device"""
+
+    def __init__(self, index: int, name: str, host_api: str, channels: int, default_rate: int):
+        self.index = index
+        self.name = name
+        self.host_api = host_api
+        self.channels = channels
+        self.default_rate = default_rate
+
+    @property
+    def key(self) -> str:
+        return device_key(self.name, self.host_api)
+
+    def __repr__(self):
+        return f"DeviceInfo({self.index}, {self.name!r}, {self.host_api!r})"
+
+
+def _enumerate_pyaudio() -> List[DeviceInfo]:
+    import pyaudio
+    pa = pyaudio.PyAudio()
+    try:
+        devices = []
+        for index in range(pa.get_device_count()):
+            info = pa.get_device_info_by_index(index)
+            if info.get("maxInputChannels", 0) <= 0:
+                continue
+            host_api = pa.get_host_api_info_by_index(info["hostApi"])["name"]
+            devices.append(DeviceInfo(index, info["name"], host_api, int(info["maxInputChannels"]),
+                                      int(info.get("defaultSampleRate", 16000))))
+        return devices
+    finally:
+        pa.terminate()
+
+
+def _enumerate_sounddevice() -> List[DeviceInfo]:
+    import sounddevice as sd
+    # sounddevice only rescans when PortAudio is re-initialised, which it has no public call for
+    terminate, initialize = getattr(sd, "_terminate", None), getattr(sd, "_initialize", None)
+    if callable(terminate) and callable(initialize):
+        try:
+            terminate()
+            initialize()
+        except Exception as e:
+            logger.debug(f"sounddevice could not re-initialise PortAudio, device list may be stale: {e}")
+    host_apis = sd.query_hostapis()
+    return [DeviceInfo(index, device["name"], host_apis[device["hostapi"]]["name"],
+                       int(device["max_input_channels"]), int(device["default_samplerate"]))
+            for index, device in enumerate(sd.query_devices()) if device["max_input_channels"] > 0]
+
+
+class DeviceRegistry:
+    """Input devices, cached for ``max_age`` seconds"""
+
+    def __init__(self, max_age: Optional[float] = None):
+        self.max_age = get_device_refresh_seconds() if max_age is None else max_age
+        self._devices: List[DeviceInfo] = []
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        # One rescan at a time, release hooks included
+        self._rescan_lock = threading.Lock()
+        self._listeners: List[Callable[[List[DeviceInfo]], None]] = []
+        self._release_hooks: List[Callable[[], None]] = []
+        # Open PortAudio streams; while any is open a rescan sees the old device list
+        self._holders = 0
+
+    def devices(self, refresh: bool = False) -> List[DeviceInfo]:
+        """Input devices, re-enumerated if ``refresh`` or the cache is stale.
+
+        A stale cache is kept while a stream holds PortAudio open, since
+        enumerating then would only repeat the old list; ``refresh`` closes
+        those streams first (see ``add_release_hook``).
+        """
+        with self._lock:
+            if not (refresh or self._stale()):
+                return list(self._devices)
+        with self._rescan_lock:
+            with self._lock:
+                held = self._holders > 0
+                if not refresh and (not self._stale() or (held and self._loaded_at is not None)):
+                    # Another thread just rescanned, or a held stream would make this one pointless
+                    return list(self._devices)
+                previous = [d.key for d in self._devices] if self._loaded_at is not None else None
+                # Anyone asking while the streams are released waits here for the new list
+                self._loaded_at = None if previous is None else -float("inf")
+            if held and refresh:
+                for release in list(self._release_hooks):
+                    try:
+                        release()
+                    except Exception as e:
+                        logger.error(f"Error releasing audio streams before a device rescan: {e}")
+            devices = self._enumerate()
+            with self._lock:
+                self._devices = devices
+                self._loaded_at = time.monotonic()
+                devices = list(devices)
+        if previous is not None and previous != [d.key for d in devices]:
+            logger.info(f"Audio input devices changed: {len(devices)} now available")
+            for callback in list(self._listeners):
+                try:
+                    callback(devices)
+                except Exception as e:
+                    logger.error(f"Error in device registry listener: {e}")
+        return devices
+
+    def _stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.max_age
+
+    def _enumerate(self) -> List[DeviceInfo]:
+        for enumerate_devices in (_enumerate_pyaudio, _enumerate_sounddevice):
+            try:
+                return enumerate_devices()
+            except ImportError:
+                continue
+            except Exception as e:
+                logger.error(f"Error enumerating audio devices: {e}")
+                return []
+        logger.error("Neither PyAudio nor sounddevice is installed; no microphones available")
+        return []
+
+    def get(self, index: int) -> Optional[DeviceInfo]:
+        for device in self.devices():
+            if device.index == index:
+                return device
+        return None
+
+    def names(self) -> List[str]:
+        return [device.name for device in self.devices()]
+
+    def invalidate(self):
+        """Re-enumerate on the next query (a stream failed, a device was plugged in)"""
+        with self._lock:
+            self._loaded_at = None if not self._devices else -float("inf")
+
+    def add_listener(self, callback: Callable[[List[DeviceInfo]], None]):
+        """Call ``callback(devices)`` whenever a rebuild finds a different device set"""
+        self._listeners.append(callback)
+
+    def hold(self):
+        """A long-lived stream opened PortAudio; timed rescans wait for ``release``"""
+        with self._lock:
+            self._holders += 1
+
+    def release(self):
+        with self._lock:
+            self._holders = max(0, self._holders - 1)
+
+    def add_release_hook(self, callback: Callable[[], None]):
+        """``callback()`` closes held streams; an explicit refresh runs it before rescanning"""
+        self._release_hooks.append(callback)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> DeviceRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = DeviceRegistry()
+        return _registry
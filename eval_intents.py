@@ -0,0 +1,229 @@
+"""
+Offline intent accuracy and latency evaluation.
+
+Scores the intent matcher (fuzzy or n-gram engine, and optionally the Ollama
+intent LLM) against a
+labelled JSONL file and prints a machine-readable JSON report with per-intent
+precision/recall, a confusion matrix and p50/p95/p99 latency.
+
+Each line of the labelled file is {"text": "...", "label": "<action>|none"};
+"none" means the utterance should not match any action (AI fallback).
+
+Usage:
+  python eval_intents.py --bootstrap intent_eval.jsonl   # draft labels from the logs
+  python eval_intents.py --data intent_eval.jsonl --output report.json
+  python eval_intents.py --engine ngram --ngram-train my_history.jsonl
+  python eval_intents.py --engine ollama --ollama-url http://localhost:8080/api/generate
+  python eval_intents.py --min-accuracy 0.9              # exit 1 below the gate
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+import utils
+from ngram_intent import NgramIntentClassifier, load_labelled_pairs
+from utils import COMMANDS, PREFIX_ROUTER, TIE_BREAK, match_intent, read_command_log
+
+NO_INTENT = "none"
+DEFAULT_DATA_FILE = "intent_eval.jsonl"
+
+
+def load_labelled(path):
+    """Read {"text", "label"} records from a JSONL file."""
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if "text" not in record:
+                raise ValueError(f"{path}:{line_no}: missing 'text'")
+            records.append({"text": record["text"], "label": record.get("label") or NO_INTENT})
+    return records
+
+
+def bootstrap_records(log_file="jarvo_command_log.txt", history_file="command_history.json",
+                      memory_file="assistant_memory.json"):
+    """Draft labelled records from the logs, one per distinct utterance.
+
+    The draft label is the current matcher's guess; the action the log recorded
+    at the time is kept alongside as ``logged_action`` (it reflects whatever
+    matcher was running then, so it isn't ground truth either). Every record
+    is marked ``"verified": false`` so it gets reviewed before use.
+    """
+    seen = {}
+
+    def _add(text, logged_action, source):
+        text = (text or "").strip()
+        key = text.lower()
+        if not text or text == "None" or key in seen or text in COMMANDS:
+            # Some log lines carry the action name in the command column
+            return
+        record = {"text": text, "label": match_intent(text) or NO_INTENT, "source": source}
+        if logged_action:
+            record["logged_action"] = logged_action
+        record["verified"] = False
+        seen[key] = record
+
+    for command, action in read_command_log(log_file):
+        _add(command, action, log_file)
+    for path, list_key, text_key in ((history_file, None, "command"),
+                                     (memory_file, "interactions", "user")):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            continue
+        entries = data.get(list_key, []) if list_key else data
+        for entry in entries:
+            _add(entry.get(text_key), None, path)
+    return list(seen.values())
+
+
+def _fuzzy_engine():
+    def predict(text):
+        # Clear the utterance cache so latency reflects a real first-time match
+        utils._match_normalized.cache_clear()
+        return match_intent(text) or NO_INTENT
+    return predict
+
+
+def _ngram_engine(train_file=None, records=()):
+    # Trained on COMMANDS plus ``train_file``, minus anything in the evaluation data
+    extra = load_labelled_pairs(train_file) if train_file else []
+    held_out = {record["text"].lower().strip() for record in records}
+    train = [(text, label) for text, label in extra if text.lower().strip() not in held_out]
+    if len(train) < len(extra):
+        print(f"[ngram] dropped {len(extra) - len(train)} training utterances that are also in the "
+              f"evaluation data", file=sys.stderr)
+    classifier = NgramIntentClassifier(tie_break=TIE_BREAK).fit_commands(COMMANDS, train or None)
+
+    def predict(text):
+        text = text.lower().strip()
+        routed = PREFIX_ROUTER.route(text)
+        if routed:
+            return routed[0]
+        return classifier.predict(text)[0] or NO_INTENT
+    return predict
+
+
+def _ollama_engine(url, model, timeout):
+    from llm_intent import get_intent_from_ollama
+
+    def predict(text):
+        try:
+            result = get_intent_from_ollama(text, model=model, url=url, timeout=timeout)
+        except Exception:
+            return NO_INTENT
+        return result.get("action") or NO_INTENT
+    return predict
+
+
+def evaluate(records, predict):
+    """Run ``predict`` over ``records`` and return the metrics dict."""
+    labels, predictions, latencies = [], [], []
+    for record in records:
+        start = time.perf_counter()
+        predicted = predict(record["text"])
+        latencies.append((time.perf_counter() - start) * 1000.0)
+        labels.append(record["label"])
+        predictions.append(predicted)
+
+    classes = sorted(set(labels) | set(predictions))
+    index = {name: i for i, name in enumerate(classes)}
+    confusion = np.zeros((len(classes), len(classes)), dtype=np.int64)
+    np.add.at(confusion, ([index[l] for l in labels], [index[p] for p in predictions]), 1)
+
+    true_pos = np.diag(confusion)
+    predicted_totals = confusion.sum(axis=0)
+    actual_totals = confusion.sum(axis=1)
+    precision = np.divide(true_pos, predicted_totals, out=np.zeros(len(classes)), where=predicted_totals > 0)
+    recall = np.divide(true_pos, actual_totals, out=np.zeros(len(classes)), where=actual_totals > 0)
+    f1 = np.divide(2 * precision * recall, precision + recall,
+                   out=np.zeros(len(classes)), where=(precision + recall) > 0)
+
+    latency = np.asarray(latencies) if latencies else np.zeros(1)
+    per_intent = {
+        name: {
+            "precision": round(float(precision[i]), 4),
+            "recall": round(float(recall[i]), 4),
+            "f1": round(float(f1[i]), 4),
+            "support": int(actual_totals[i]),
+        }
+        for i, name in enumerate(classes)
+    }
+    return {
+        "count": len(records),
+        "accuracy": round(float(true_pos.sum() / max(len(records), 1)), 4),
+        "per_intent": per_intent,
+        "confusion": {"labels": classes, "matrix": confusion.tolist()},
+        "latency_ms": {
+            "mean": round(float(latency.mean()), 4),
+            "p50": round(float(np.percentile(latency, 50)), 4),
+            "p95": round(float(np.percentile(latency, 95)), 4),
+            "p99": round(float(np.percentile(latency, 99)), 4),
+        },
+        "errors": [
+            {"text": r["text"], "label": l, "predicted": p}
+            for r, l, p in zip(records, labels, predictions) if l != p
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate intent matching accuracy and latency")
+    parser.add_argument("--data", default=DEFAULT_DATA_FILE, help="Labelled JSONL file")
+    parser.add_argument("--bootstrap", metavar="OUT", help="Write draft labels from the logs to OUT and exit")
+    parser.add_argument("--engine", choices=["fuzzy", "ngram", "ollama", "both", "all"],
+                        default="fuzzy", help='"both" is fuzzy and ollama; "all" adds ngram')
+    parser.add_argument("--ngram-train", help="Extra labelled JSONL to train the n-gram engine on")
+    parser.add_argument("--ollama-url", default=None, help="Ollama /api/generate URL (or a local stand-in)")
+    parser.add_argument("--ollama-model", default="llama2")
+    parser.add_argument("--ollama-timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--min-accuracy", type=float, help="Exit with status 1 if any engine scores below this")
+    args = parser.parse_args()
+
+    if args.bootstrap:
+        records = bootstrap_records()
+        with open(args.bootstrap, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        print(f"Wrote {len(records)} draft records to {args.bootstrap}", file=sys.stderr)
+        return 0
+
+    records = load_labelled(args.data)
+    engines = {}
+    if args.engine in ("fuzzy", "both", "all"):
+        engines["fuzzy"] = _fuzzy_engine()
+    if args.engine in ("ngram", "all"):
+        engines["ngram"] = _ngram_engine(args.ngram_train, records)
+    if args.engine in ("ollama", "both", "all"):
+        from llm_intent import OLLAMA_GENERATE_URL
+        engines["ollama"] = _ollama_engine(args.ollama_url or OLLAMA_GENERATE_URL,
+                                           args.ollama_model, args.ollama_timeout)
+
+    report = {"data": args.data, "engines": {name: evaluate(records, fn) for name, fn in engines.items()}}
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    failed = False
+    for name, result in report["engines"].items():
+        lat = result["latency_ms"]
+        print(f"[{name}] accuracy {result['accuracy']:.1%} on {result['count']} utterances, "
+              f"p50 {lat['p50']:.3f} ms, p95 {lat['p95']:.3f} ms, p99 {lat['p99']:.3f} ms", file=sys.stderr)
+        if args.min_accuracy is not None and result["accuracy"] < args.min_accuracy:
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,9 @@
 import speech_recognition as sr
 
-def listen():
+def listen(audio_source=None):
+    """Transcribe one phrase from the microphone, or from an audio_source.AudioSource"""
     r = sr.Recognizer()
-    with sr.Microphone() as source:
+    with (audio_source.as_sr_source() if audio_source else sr.Microphone()) as source:
         audio = r.listen(source)
     try:
         command = r.recognize_google(audio)
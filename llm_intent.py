@@ -1,7 +1,8 @@
 import requests
 
-def get_intent_from_ollama(user_text, model="llama2"):
-    url = "http://localhost:11434/api/generate"
+OLLAMA_GENERATE_URL = "http://localhost:11434/api/generate"
+
+def get_intent_from_ollama(user_text, model="llama2", url=OLLAMA_GENERATE_URL, timeout=None):
     prompt = f"""
 You are a local AI desktop assistant. Your job is to interpret the user's spoken commands and return a single, valid JSON object describing the system-level action to take. 
 NEVER explain, NEVER add extra text, ONLY output a JSON object. 
@@ -33,7 +34,7 @@ User: {user_text}
         "prompt": prompt,
         "stream": False
     }
-    response = requests.post(url, json=data)
+    response = requests.post(url, json=data, timeout=timeout)
     result = response.json()
     # The model's response will be in result['response']
     # Try to extract the JSON part
@@ -8,10 +8,15 @@ import subprocess
 import webbrowser
 import sys
 import argparse
+import json
 import time
-from speech import listen, speak, list_microphones, set_mic_index, set_status_callback, get_current_stt_engine
+from speech import (
+    listen, speak, list_input_devices, set_mic_index, set_status_callback, get_current_stt_engine, preload_speech
+)
 from actions import route_action
-from utils import match_intent, log_command
+from utils import match_intents, log_command, parse_log_line
+from phonetic import correct_command
+from action_registry import REGISTRY
 import threading
 from threading import Event
 from assistant.state import INTERACTION_IN_PROGRESS
@@ -27,13 +32,15 @@ def _speak_follow_up() -> None:
     speak(phrase)
 
 
-def process_command(command: str) -> None:
+def process_command(command: str, intent=None) -> None:
     if not command:
         speak("No input detected. Please try again.")
         log_command(command, "no_input")
         _speak_follow_up()
         return
-    action = match_intent(command)
+    if intent is None:
+        command, intent = correct_command(command)
+    action = intent.action
     # Handle stop command explicitly to end the assistant gracefully
     if action == "stop_assistant":
         speak("Okay, stopping now. Goodbye!")
@@ -41,7 +48,7 @@ def process_command(command: str) -> None:
         STOP_EVENT.set()
         return
     if action:
-        route_action(action, command)
+        route_action(action, command, intent)
         log_command(command, action)
         if not INTERACTION_IN_PROGRESS.is_set():
             _speak_follow_up()
@@ -62,6 +69,70 @@ def process_command(command: str) -> None:
 STOP_EVENT: Event = Event()
 
 
+def dispatch_command(command: str) -> None:
+    """Schedule a recognised command according to its action registry metadata.
+
+    Blocking actions (follow-up Q&A, shutdown) and instant ones run on the
+    calling loop, so it doesn't start listening again underneath them; slower
+    actions and the AI fallback get a worker thread.
+    """
+    # Fix common mishears ("node pair" -> notepad) when they change the command
+    command, intent = correct_command(command)
+    spec = REGISTRY.get(intent.action) if intent else None
+    if spec is not None and spec.runs_inline:
+        process_command(command, intent)
+    else:
+        threading.Thread(target=process_command, args=(command, intent), daemon=True).start()
+
+
+def _iter_transcripts(path: str):
+    """Yield transcripts from a plain text, log_command or command_history.json file."""
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get("interactions", [])
+        for entry in data:
+            text = (entry.get("command") or entry.get("user")) if isinstance(entry, dict) else entry
+            if text:
+                yield str(text).strip()
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            entry = parse_log_line(line)
+            text = entry[0] if entry else line.strip()
+            if text and text != "None":
+                yield text
+
+
+def classify_file(path: str, batch_size: int = 2048) -> None:
+    """Stream transcripts through match_intents in batches and print TSV results.
+
+    Each output line is ``action<TAB>score<TAB>margin<TAB>text``; unmatched
+    utterances get the action ``-``.
+    """
+    total = 0
+    started = time.perf_counter()
+    batch = []
+
+    def _flush():
+        actions, scores, margins = match_intents(batch)
+        for text, action, score, margin in zip(batch, actions, scores, margins):
+            print(f"{action or '-'}\t{score:.1f}\t{margin:.1f}\t{text}")
+        batch.clear()
+
+    for text in _iter_transcripts(path):
+        batch.append(text)
+        total += 1
+        if len(batch) >= batch_size:
+            _flush()
+    if batch:
+        _flush()
+    elapsed = time.perf_counter() - started
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print(f"Classified {total} transcripts in {elapsed:.2f}s ({rate:.0f}/s)", file=sys.stderr)
+
+
 def main():
     """Jarvo assistant entrypoint.
 
@@ -71,6 +142,9 @@ def main():
       - --interactive-text: Read typed commands in a loop
       - --wake-word: Use wake word detection mode
       - --direct: Direct listening without wake word
+      - --classify-file PATH: Batch-classify transcripts from a file then exit
+      - --transcribe DIR|GLOB: Transcribe audio files on a process pool to JSONL then exit
+      - --source SPEC: Run the voice pipeline on a file or synthetic source until it ends
     """
     parser = argparse.ArgumentParser(description="Jarvo Assistant")
     parser.add_argument("--text", type=str, help="Run a single typed command and exit")
@@ -80,15 +154,37 @@ def main():
     parser.add_argument("--wake-word", action="store_true", help="Use wake word detection mode")
     parser.add_argument("--direct", action="store_true", help="Direct listening without wake word")
     parser.add_argument("--status", action="store_true", help="Show current STT engine and microphone info")
+    parser.add_argument("--classify-file", type=str, help="Classify transcripts from a text, log or JSON history file and exit")
+    parser.add_argument("--batch-size", type=int, default=2048, help="Transcripts per batch for --classify-file")
+    parser.add_argument("--transcribe", type=str, help="Transcribe audio files in a directory or matching a glob and exit")
+    parser.add_argument("--engine", type=str, help="STT engine for --transcribe (default: STT_ENGINE)")
+    parser.add_argument("--workers", type=int, help="Worker processes for --transcribe (default: half the CPUs)")
+    parser.add_argument("--output", type=str, help="JSONL file for --transcribe results (default: stdout)")
+    parser.add_argument("--source", type=str,
+                        help="Listen to an audio file or silence:S / noise:S / tone:HZ:S instead of the microphone")
     args = parser.parse_args()
 
+    if args.transcribe:
+        from batch_transcribe import transcribe_paths
+        failed = transcribe_paths(args.transcribe, (args.engine or config.get_stt_engine()).lower(),
+                                  workers=args.workers, output=args.output)
+        sys.exit(1 if failed else 0)
+
+    if not (args.classify_file or args.list_mics or args.status or args.text or args.interactive_text):
+        # Voice mode: load and warm up the STT engine while the rest of startup runs
+        preload_speech()
+
+    if args.classify_file:
+        classify_file(args.classify_file, batch_size=args.batch_size)
+        return
+
     if args.list_mics:
-        names = list_microphones()
-        if not names:
+        devices = list_input_devices()
+        if not devices:
             print("No microphones found.")
         else:
-            for idx, name in enumerate(names):
-                print(f"[{idx}] {name}")
+            for device in devices:
+                print(f"[{device.index}] {device.name} ({device.host_api})")
         return
 
     if args.mic is not None:
@@ -97,9 +193,8 @@ def main():
     if args.status:
         print(f"Current STT Engine: {get_current_stt_engine()}")
         print(f"Available microphones:")
-        mics = list_microphones()
-        for i, mic in enumerate(mics):
-            print(f"  [{i}] {mic}")
+        for device in list_input_devices():
+            print(f"  [{device.index}] {device.name} ({device.host_api})")
         return
 
     if args.text:
@@ -118,8 +213,8 @@ def main():
             if user_input.lower() in {"exit", "quit"}:
                 break
             print("Processing...")
-            # Run handling on a background thread to keep UI responsive if actions block
-            threading.Thread(target=process_command, args=(user_input,), daemon=True).start()
+            # Slow actions run on a background thread to keep the prompt responsive
+            dispatch_command(user_input)
         return
 
     # Set up status callback for better feedback
@@ -128,6 +223,22 @@ def main():
     
     set_status_callback(status_callback)
 
+    print("Loading speech engine...")
+    preload_speech().result()
+
+    if args.source:
+        # Headless run: every command in the source, processed in order, as fast as it decodes
+        from audio_source import open_source
+        from speech import set_audio_source, listen_direct
+        source = open_source(args.source)
+        set_audio_source(source)
+        while not STOP_EVENT.is_set() and not source.exhausted:
+            command = listen_direct()
+            if command:
+                print(f"Processing: {command}")
+                process_command(command)
+        return
+
     # Voice mode with options
     if args.wake_word:
         print("Starting wake word mode. Say 'Jarvis' to activate...")
@@ -139,7 +250,7 @@ def main():
             command = listen_with_wake_word()
             if command:
                 print("Processing...")
-                threading.Thread(target=process_command, args=(command,), daemon=True).start()
+                dispatch_command(command)
     elif args.direct:
         print("Starting direct listening mode...")
         from speech import listen_direct
@@ -151,7 +262,7 @@ def main():
             command = listen_direct()
             if command:
                 print("Processing...")
-                threading.Thread(target=process_command, args=(command,), daemon=True).start()
+                dispatch_command(command)
     else:
         # Default: voice mode (uses config to determine wake word or direct)
         print("Starting voice mode...")
@@ -164,7 +275,7 @@ def main():
             command = listen()
             if command:
                 print("Processing...")
-                threading.Thread(target=process_command, args=(command,), daemon=True).start()
+                dispatch_command(command)
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
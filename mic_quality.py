@@ -0,0 +1,164 @@
+"""
+Microphone quality measured from real audio.
+
+Every candidate input device records the same short window in parallel
+(one callback stream each, all open at once), and each recording is scored
+on its noise floor, SNR and clipping rate. Scores are saved in a JSON file
+keyed by device name and host API, which stay stable across reboots while
+device indices don't, so later startups skip the probe.
+"""
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from config import get_mic_quality_file
+from device_registry import device_key
+
+try:
+    import pyaudio
+    PYAUDIO_AVAILABLE = True
+except ImportError:
+    PYAUDIO_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+PROBE_SECONDS = 1.0
+FRAME_MS = 30
+# A sample this close to full scale counts as clipped
+CLIP_LEVEL = 32700
+# Noise floor (dBFS) mapped onto the 0..1 noise score: -70 is excellent, -30 unusable
+NOISE_BEST_DB, NOISE_WORST_DB = -70.0, -30.0
+# Headroom of the loudest frames over the floor that earns the full SNR score
+SNR_FULL_DB = 30.0
+# Below this peak level the device is muted or not delivering audio at all
+DEAD_DB = -85.0
+
+
+def measure_quality(samples: np.ndarray, sample_rate: int) -> Dict[str, float]:
+    """Noise floor, SNR and clipping of int16 ``samples``, plus a 0..1 score.
+
+    The noise floor is the 10th percentile of 30 ms frame energies and the
+    signal level the 95th, so the SNR is the headroom between background and
+    the loudest sounds in the window. The score weights a low floor most,
+    then SNR, and scales the result down by the clipping rate.
+    """
+    frame = max(1, int(sample_rate * FRAME_MS / 1000))
+    n = len(samples) // frame
+    if n == 0:
+        return {"score": 0.0, "noise_db": DEAD_DB, "snr_db": 0.0, "clip_rate": 0.0}
+    frames = samples[:n * frame].reshape(n, frame).astype(np.float32) / 32768.0
+    energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-12)
+    noise_db = float(np.percentile(energy_db, 10))
+    signal_db = float(np.percentile(energy_db, 95))
+    snr_db = signal_db - noise_db
+    clip_rate = float(np.count_nonzero(np.abs(samples.astype(np.int32)) >= CLIP_LEVEL) / len(samples))
+    if signal_db < DEAD_DB:
+        score = 0.0
+    else:
+        noise_score = np.clip((NOISE_WORST_DB - noise_db) / (NOISE_WORST_DB - NOISE_BEST_DB), 0.0, 1.0)
+        snr_score = np.clip(snr_db / SNR_FULL_DB, 0.0, 1.0)
+        # 1% clipped samples already halves the score
+        score = (0.7 * noise_score + 0.3 * snr_score) / (1.0 + 100.0 * clip_rate)
+    return {"score": round(float(score), 3), "noise_db": round(noise_db, 1),
+            "snr_db": round(snr_db, 1), "clip_rate": round(clip_rate, 5)}
+
+
+def load_scores(path: Optional[str] = None) -> Dict[str, dict]:
+    path = path or get_mic_quality_file()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_scores(scores: Dict[str, dict], path: Optional[str] = None):
+    path = path or get_mic_quality_file()
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(scores, f, indent=2)
+    except OSError as e:
+        logger.error(f"Error saving microphone scores: {e}")
+
+
+def probe_devices(pa, indices: Iterable[int], seconds: float = PROBE_SECONDS) -> Dict[int, tuple]:
+    """Record ``seconds`` from every device at once; returns {index: (int16 samples, rate)}"""
+    chunks, streams, rates = {}, {}, {}
+    for index in indices:
+        try:
+            rate = int(pa.get_device_info_by_index(index).get("defaultSampleRate", 16000))
+            chunks[index] = []
+
+            def on_audio(in_data, frame_count, time_info, status, index=index):
+                chunks[index].append(in_data)
+                return None, pyaudio.paContinue
+
+            streams[index] = pa.open(rate=rate, channels=1, format=pyaudio.paInt16, input=True,
+                                     input_device_index=index, frames_per_buffer=int(rate * FRAME_MS / 1000),
+                                     stream_callback=on_audio)
+            rates[index] = rate
+        except Exception as e:
+            logger.warning(f"Cannot probe microphone {index}: {e}")
+    try:
+        if streams:
+            time.sleep(seconds)
+    finally:
+        for stream in streams.values():
+            try:
+                stream.stop_stream()
+                stream.close()
+            except Exception as e:
+                logger.error(f"Error closing probe stream: {e}")
+    return {index: (np.frombuffer(b"".join(chunks[index]), dtype=np.int16), rates[index]) for index in streams}
+
+
+def score_microphones(indices: Iterable[int], force: bool = False,
+                     path: Optional[str] = None) -> Dict[int, float]:
+    """Quality score (0..1) per PyAudio device index, probing only devices not scored before.
+
+    Devices that can't be opened score 0. ``force`` re-probes every device,
+    e.g. after plugging a headset into a port that was empty before.
+    """
+    indices = list(indices)
+    if not PYAUDIO_AVAILABLE or not indices:
+        return {index: 0.0 for index in indices}
+    saved = load_scores(path)
+    scores, keys, to_probe = {}, {}, []
+    pa = pyaudio.PyAudio()
+    try:
+        for index in indices:
+            try:
+                info = pa.get_device_info_by_index(index)
+                host_api = pa.get_host_api_info_by_index(info["hostApi"])["name"]
+            except Exception as e:
+                logger.warning(f"Unknown microphone {index}: {e}")
+                scores[index] = 0.0
+                continue
+            keys[index] = device_key(info["name"], host_api)
+            if not force and keys[index] in saved:
+                scores[index] = saved[keys[index]]["score"]
+            else:
+                to_probe.append(index)
+        if to_probe:
+            recordings = probe_devices(pa, to_probe)
+            for index in to_probe:
+                if index in recordings:
+                    quality = measure_quality(*recordings[index])
+                else:
+                    # Remembered too, so a device that won't open isn't retried every startup
+                    quality = {"score": 0.0, "error": "could not open device"}
+                quality["measured"] = datetime.now().isoformat(timespec="seconds")
+                saved[keys[index]] = quality
+                scores[index] = quality["score"]
+                if "error" not in quality:
+                    logger.info(f"Microphone {index} ({keys[index]}): score {quality['score']:.2f}, "
+                                f"noise {quality['noise_db']} dBFS, SNR {quality['snr_db']} dB, "
+                                f"clipping {quality['clip_rate']:.2%}")
+            save_scores(saved, path)
+    finally:
+        pa.terminate()
+    return scores
@@ -25,10 +25,12 @@ from PyQt6.QtGui import (
 )
 
 # Import your existing modules
-from speech import speak, listen, listen_direct, list_microphones, set_mic_index
+from speech import (
+    speak, listen_direct, list_input_devices, set_mic_index, preload_speech,
+    create_wake_word_detector, listen_after_wake_word
+)
 from actions import route_action
-from utils import match_intent, log_command
-from wake_word import WakeWordDetector
+from utils import log_command
 from config import get_gemini_api_key, get_livekit_api_key, get_livekit_api_secret
 from assistant.state import INTERACTION_IN_PROGRESS
 from plugin_manager import PluginManager, PluginManagerDialog
@@ -74,11 +76,8 @@ class VoiceWorker(QThread):
             
     def _wake_word_mode(self):
         try:
-            self.wake_detector = WakeWordDetector(
-                keyword="jarvis",
-                sensitivity=0.7,
-                callback=self._on_wake_word_detected
-            )
+            # Shares the command capture stream, so "Jarvis open chrome" works in one breath
+            self.wake_detector = create_wake_word_detector(self._on_wake_word_detected)
             self.status_update.emit("Listening for wake word 'jarvis'...")
             self.wake_detector.listen()
         except Exception as e:
@@ -87,7 +86,7 @@ class VoiceWorker(QThread):
     def _on_wake_word_detected(self):
         self.status_update.emit("Wake word detected! Listening for command...")
         try:
-            command = listen()
+            command = listen_after_wake_word(self.wake_detector)
             if command:
                 # Emit recognized text first
                 self.text_recognized.emit(command)
@@ -130,7 +129,7 @@ class SettingsDialog(QDialog):
         
         self.mic_combo = QComboBox()
         self.refresh_mics_btn = QPushButton("Refresh")
-        self.refresh_mics_btn.clicked.connect(self.refresh_microphones)
+        self.refresh_mics_btn.clicked.connect(lambda: self.refresh_microphones())
         
         mic_layout.addWidget(QLabel("Select Microphone:"))
         mic_layout.addWidget(self.mic_combo)
@@ -252,17 +251,17 @@ class SettingsDialog(QDialog):
         
         self.setLayout(layout)
         
-    def refresh_microphones(self):
+    def refresh_microphones(self, rescan: bool = True):
+        # Device registry only: no recognizer or STT model is touched to fill the list
         self.mic_combo.clear()
-        mics = list_microphones()
-        for i, mic in enumerate(mics):
-            self.mic_combo.addItem(mic, i)
+        for device in list_input_devices(refresh=rescan):
+            self.mic_combo.addItem(f"{device.name} ({device.host_api})", device.index)
             
     def load_settings(self):
         # Load microphone
-        self.refresh_microphones()
+        self.refresh_microphones(rescan=False)
         mic_index = self.settings.value("microphone_index", 0, type=int)
-        self.mic_combo.setCurrentIndex(mic_index)
+        self.mic_combo.setCurrentIndex(max(0, self.mic_combo.findData(mic_index)))
         
         # Load audio settings
         self.volume_slider.setValue(self.settings.value("tts_volume", 50, type=int))
@@ -283,8 +282,9 @@ class SettingsDialog(QDialog):
         
     def save_settings(self):
         # Save microphone
-        self.settings.setValue("microphone_index", self.mic_combo.currentData())
-        set_mic_index(self.mic_combo.currentData())
+        if self.mic_combo.currentData() is not None:
+            self.settings.setValue("microphone_index", self.mic_combo.currentData())
+            set_mic_index(self.mic_combo.currentData())
         
         # Save audio settings
         self.settings.setValue("tts_volume", self.volume_slider.value())
@@ -410,6 +410,7 @@ class ModernVoiceAssistantGUI(QMainWindow):
     replay_command_signal = pyqtSignal(str)
     command_processed = pyqtSignal(str, str)  # command, response
     command_error = pyqtSignal(str)  # error message
+    speech_ready = pyqtSignal(str)  # empty, or the error that stopped the STT engine loading
     
     # Follow-up messages for after actions
     FOLLOW_UP_MESSAGES = [
@@ -441,6 +442,12 @@ class ModernVoiceAssistantGUI(QMainWindow):
         self.replay_command_signal.connect(self.process_text_command)
         self.command_processed.connect(self.on_command_processed)
         self.command_error.connect(self.handle_error)
+        self.speech_ready.connect(self.on_speech_ready)
+        
+        # Load and warm up the STT engine while the window comes up
+        self.start_btn.setEnabled(False)
+        self.update_status("Loading speech engine...")
+        preload_speech().add_done_callback(self._emit_speech_ready)
         
         # Store current recognized text and matched intent
         self.current_recognized_text = ""
@@ -813,6 +820,18 @@ class ModernVoiceAssistantGUI(QMainWindow):
             self.text_input.setVisible(False)
             self.send_btn.setVisible(False)
             
+    def _emit_speech_ready(self, future):
+        # Called on the preload thread; the signal hands the result to the GUI thread
+        error = future.exception()
+        self.speech_ready.emit("" if error is None else str(error))
+        
+    def on_speech_ready(self, error: str):
+        self.start_btn.setEnabled(True)
+        if error:
+            self.handle_error(f"Speech engine failed to load: {error}")
+        else:
+            self.update_status("Ready")
+            
     def toggle_listening(self):
         if self.voice_worker and self.voice_worker.isRunning():
             self.stop_listening()
@@ -899,6 +918,11 @@ class ModernVoiceAssistantGUI(QMainWindow):
             log_command(command, "no_input")
             return
             
+        # Match intent and extract slots once, fixing common mishears
+        # ("node pair" -> notepad) only when they change the command
+        from phonetic import correct_command
+        command, intent = correct_command(command)
+
         # Store the recognized text
         self.current_recognized_text = command
         
@@ -911,12 +935,10 @@ class ModernVoiceAssistantGUI(QMainWindow):
         # Update status
         self.update_status("Processing...")
         
-        # Match intent and route action
-        from utils import match_intent
         from actions import route_action
         from speech import speak
         
-        action = match_intent(command)
+        action = intent.action
         self.log_matched_intent(action if action else "unknown")
         
         # Handle stop command explicitly
@@ -931,7 +953,7 @@ class ModernVoiceAssistantGUI(QMainWindow):
             # Execute the action in a background thread
             def execute_action():
                 try:
-                    result = route_action(action, command)
+                    result = route_action(action, command, intent)
                     response = result if result else "Command executed successfully."
                     self.command_processed.emit(command, response)
                 except Exception as e:
@@ -0,0 +1,163 @@
+import json
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Label for utterances that should not trigger any action
+NO_INTENT = "none"
+
+_HASH_PRIME = np.uint64(1099511628211)
+
+
+class NgramIntentClassifier:
+    """Pure-NumPy intent classifier over hashed character n-grams.
+
+    Every training utterance becomes an L2-normalised bag of hashed character
+    n-grams (a fixed-size vector, no vocabulary to store or download). A query
+    is scored by cosine similarity against all training examples and each
+    label keeps its best example score, like ``utils.IntentIndex`` does for
+    phrases. Because character n-grams survive misheard or mixed-language
+    words, "note pad" and "notepad" still land close together.
+
+    Scores are reported on the same 0-100 scale as the rapidfuzz matcher.
+    Labels listed in ``tie_break`` win equal scores, in that order, as in
+    ``utils.IntentIndex``.
+    """
+
+    def __init__(self, n_features: int = 2 ** 13, ngram_range: Tuple[int, int] = (2, 4),
+                 threshold: float = 55.0, tie_break: Iterable[str] = ()):
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.threshold = threshold
+        self.tie_break = tuple(tie_break)
+        self.labels: List[str] = []
+        self._tie_rank = None
+        self._weights_t = None
+        self._group_starts = None
+
+    def _hash_ngrams(self, text: str) -> np.ndarray:
+        """Return the feature index of every character n-gram in ``text`` (with repeats)"""
+        padded = f" {text.lower().strip()} ".encode("utf-8")
+        data = np.frombuffer(padded, dtype=np.uint8).astype(np.uint64)
+        low, high = self.ngram_range
+        buckets = []
+        h = data
+        # Extend every window by one character per step; uint64 arithmetic wraps
+        for n in range(2, high + 1):
+            if len(data) < n:
+                break
+            h = h[:-1] * _HASH_PRIME + data[n - 1:]
+            if n >= low:
+                buckets.append(h)
+        if not buckets:
+            return np.empty(0, dtype=np.intp)
+        return (np.concatenate(buckets) % np.uint64(self.n_features)).astype(np.intp)
+
+    def vectorize(self, texts: Iterable[str]) -> np.ndarray:
+        """Dense L2-normalised feature matrix, shape ``(len(texts), n_features)``"""
+        texts = list(texts)
+        matrix = np.zeros((len(texts), self.n_features), dtype=np.float32)
+        for row, text in enumerate(texts):
+            np.add.at(matrix[row], self._hash_ngrams(text), 1.0)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    def fit(self, texts: Iterable[str], labels: Iterable[str]) -> "NgramIntentClassifier":
+        """Train on parallel sequences of utterances and labels"""
+        pairs = sorted(zip(labels, texts), key=lambda pair: pair[0])
+        if not pairs:
+            raise ValueError("NgramIntentClassifier needs at least one training example")
+        example_labels = [label for label, _ in pairs]
+        self.labels = sorted(set(example_labels))
+        # Secondary sort key: lower wins a tie
+        preferred = {label: i for i, label in enumerate(self.tie_break)}
+        self._tie_rank = np.array([preferred.get(label, len(preferred) + i)
+                                   for i, label in enumerate(self.labels)], dtype=np.intp)
+        label_ids = np.searchsorted(self.labels, example_labels)
+        # Examples are sorted by label, so each label's rows start where the id changes
+        self._group_starts = np.flatnonzero(np.diff(label_ids, prepend=-1))
+        # Stored transposed so a query gathers only the rows of its own n-grams
+        self._weights_t = np.ascontiguousarray(self.vectorize(text for _, text in pairs).T)
+        return self
+
+    def fit_commands(self, commands: dict, extra: Optional[Iterable[Tuple[str, str]]] = None):
+        """Train on a COMMANDS-style {action: [phrases]} dict plus (text, label) pairs"""
+        texts, labels = [], []
+        for action, phrases in commands.items():
+            texts.extend(phrases)
+            labels.extend([action] * len(phrases))
+        for text, label in extra or ():
+            texts.append(text)
+            labels.append(label or NO_INTENT)
+        return self.fit(texts, labels)
+
+    def label_scores(self, text: str) -> np.ndarray:
+        """Cosine similarity (0-100) of ``text`` to each label, in ``self.labels`` order"""
+        if self._weights_t is None:
+            raise RuntimeError("NgramIntentClassifier is not trained")
+        idx = self._hash_ngrams(text)
+        if idx.size == 0:
+            return np.zeros(len(self.labels), dtype=np.float32)
+        # Summing one gathered row per n-gram occurrence weights rows by their counts
+        norm = np.sqrt(np.square(np.bincount(idx)).sum())
+        example_scores = self._weights_t[idx].sum(axis=0) * (100.0 / norm)
+        return np.maximum.reduceat(example_scores, self._group_starts)
+
+    def _rank(self, scores: np.ndarray) -> np.ndarray:
+        """Label indices from best to worst along the last axis, ties settled by ``tie_break``"""
+        return np.lexsort((np.broadcast_to(self._tie_rank, scores.shape), -scores), axis=-1)
+
+    def predict(self, text: str):
+        """Return ``(action, score, runner_up, runner_up_score)`` for ``text``.
+
+        ``action`` is None when the best label is below the threshold or is the
+        explicit "none" label.
+        """
+        scores = self.label_scores(text)
+        order = self._rank(scores)
+        best = int(order[0])
+        label = self.labels[best]
+        action = label if scores[best] >= self.threshold and label != NO_INTENT else None
+        if len(order) < 2:
+            return action, float(scores[best]), None, 0.0
+        second = int(order[1])
+        return action, float(scores[best]), self.labels[second], float(scores[second])
+
+    def match_batch(self, texts, workers: int = 1):
+        """Classify many texts with one matrix product.
+
+        Returns ``(actions, scores, margins)`` NumPy arrays, like
+        ``utils.IntentIndex.match_batch``; ``workers`` is accepted for
+        interface parity (NumPy's BLAS already uses every core).
+        """
+        if len(texts) == 0:
+            return np.empty(0, dtype=object), np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32)
+        example_scores = self.vectorize(texts) @ self._weights_t * 100.0
+        scores = np.maximum.reduceat(example_scores, self._group_starts, axis=1)
+        rows = np.arange(len(texts))
+        order = self._rank(scores)
+        best_scores = scores[rows, order[:, 0]]
+        second_scores = scores[rows, order[:, 1]] if scores.shape[1] > 1 else np.zeros_like(best_scores)
+        names = np.asarray(self.labels, dtype=object)
+        best_names = names[order[:, 0]]
+        matched = (best_scores >= self.threshold) & (best_names != NO_INTENT)
+        actions = np.where(matched, best_names, None)
+        return actions, best_scores, best_scores - second_scores
+
+
+def load_labelled_pairs(path: str) -> List[Tuple[str, str]]:
+    """Read (text, label) pairs from a JSONL file; returns [] if the file is missing"""
+    pairs = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if record.get("text"):
+                    pairs.append((record["text"], record.get("label") or NO_INTENT))
+    except FileNotFoundError:
+        pass
+    return pairs
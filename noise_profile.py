@@ -0,0 +1,186 @@
+"""
+Background noise per input device, tracked continuously and kept across restarts.
+
+A ``NoiseTracker`` thread reads the persistent capture stream about once a
+second and folds the quietest frames of each window into the device's
+profile: a noise floor in dBFS and a noise spectrum for the preprocessing
+gate. Without a persistent stream, the audio of every command updates the
+profile instead. Profiles are saved to a JSON file keyed like the microphone
+scores (device name and host API), so listening can start with the right
+threshold immediately instead of calibrating for half a second first.
+"""
+import atexit
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+
+from config import get_noise_profile_file
+from preprocess import TARGET_RATE, noise_spectrum, resample
+
+logger = logging.getLogger(__name__)
+
+FRAME_MS = 30
+UPDATE_SECONDS = 1.0
+SAVE_SECONDS = 60.0
+# Frames at or below this percentile of a window count as background
+QUIET_PERCENTILE = 20
+# Weight of each new window in the running estimate (about 10 s of memory at one update a second)
+ADAPT = 0.1
+# speech_recognition's energy_threshold is int16 RMS: 1.5x the noise (its dynamic ratio),
+# less the 20% the old per-command calibration took off, and never below 300
+ENERGY_RATIO = 1.2
+MIN_ENERGY_THRESHOLD = 300
+
+
+class NoiseProfile:
+    """Running noise floor (dBFS) and spectrum at TARGET_RATE for one device"""
+
+    def __init__(self, noise_db: Optional[float] = None, spectrum: Optional[np.ndarray] = None,
+                 updated: Optional[str] = None):
+        self.noise_db = noise_db
+        self.spectrum = spectrum
+        self.updated = updated
+
+    @property
+    def known(self) -> bool:
+        return self.noise_db is not None
+
+    def update(self, samples: np.ndarray, sample_rate: int):
+        """Fold the quietest frames of int16 ``samples`` into the estimate"""
+        frame = int(sample_rate * FRAME_MS / 1000)
+        n = len(samples) // frame
+        if n < 4:
+            return
+        x = samples[:n * frame].astype(np.float32) / 32768.0
+        energy_db = 10.0 * np.log10(np.mean(x.reshape(n, frame) ** 2, axis=1) + 1e-10)
+        level = float(np.median(energy_db[energy_db <= np.percentile(energy_db, QUIET_PERCENTILE)]))
+        spectrum = noise_spectrum(resample(x, sample_rate, TARGET_RATE), QUIET_PERCENTILE / 100)
+        if self.noise_db is None:
+            self.noise_db, self.spectrum = level, spectrum
+        else:
+            self.noise_db += ADAPT * (level - self.noise_db)
+            if spectrum is not None:
+                self.spectrum = spectrum if self.spectrum is None else self.spectrum + ADAPT * (spectrum - self.spectrum)
+        self.updated = datetime.now().isoformat(timespec="seconds")
+
+    def energy_threshold(self) -> float:
+        """The matching ``sr.Recognizer.energy_threshold``"""
+        rms = 32768.0 * 10 ** (self.noise_db / 20)
+        return max(MIN_ENERGY_THRESHOLD, rms * ENERGY_RATIO)
+
+    def spectrum_at(self, sample_rate: int) -> Optional[np.ndarray]:
+        """Noise spectrum for the gate, if audio at ``sample_rate`` matches its bins"""
+        return self.spectrum if sample_rate == TARGET_RATE else None
+
+    def to_dict(self) -> dict:
+        return {"noise_db": round(self.noise_db, 2),
+                "spectrum": None if self.spectrum is None else [round(float(v), 6) for v in self.spectrum],
+                "updated": self.updated}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "NoiseProfile":
+        spectrum = data.get("spectrum")
+        return cls(data.get("noise_db"), None if spectrum is None else np.array(spectrum, dtype=np.float32),
+                   data.get("updated"))
+
+
+class NoiseProfiles:
+    """Every device's profile, loaded from and saved to ``path``"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or get_noise_profile_file()
+        self._profiles: Dict[str, NoiseProfile] = {}
+        self._lock = threading.Lock()
+        self._saved_at = time.monotonic()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._profiles = {key: NoiseProfile.from_dict(data) for key, data in json.load(f).items()}
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+        except Exception as e:
+            logger.error(f"Error loading noise profiles: {e}")
+
+    def get(self, key: str) -> NoiseProfile:
+        with self._lock:
+            return self._profiles.setdefault(key, NoiseProfile())
+
+    def update(self, key: str, samples: np.ndarray, sample_rate: int):
+        """Update ``key``'s profile, saving at most every SAVE_SECONDS"""
+        profile = self.get(key)
+        with self._lock:
+            profile.update(samples, sample_rate)
+        if time.monotonic() - self._saved_at > SAVE_SECONDS:
+            self.save()
+
+    def save(self):
+        with self._lock:
+            data = {key: profile.to_dict() for key, profile in self._profiles.items() if profile.known}
+            self._saved_at = time.monotonic()
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+        except OSError as e:
+            logger.error(f"Error saving noise profiles: {e}")
+
+
+class NoiseTracker:
+    """Keeps one device's profile current from a running ``CaptureService``"""
+
+    def __init__(self, service, key: str, profiles: NoiseProfiles, interval: float = UPDATE_SECONDS):
+        self.service = service
+        self.key = key
+        self.profiles = profiles
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"noise-{key}", daemon=True)
+
+    def start(self) -> "NoiseTracker":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def _run(self):
+        reader = self.service.reader()
+        # Ends with the stream: a reopened device gets a new service and a new tracker
+        while not self._stop.wait(self.interval) and self.service.running:
+            try:
+                self.profiles.update(self.key, reader.read(), self.service.sample_rate)
+            except Exception as e:
+                logger.error(f"Error updating noise profile for {self.key}: {e}")
+
+
+_profiles = None
+_trackers: Dict[str, NoiseTracker] = {}
+_lock = threading.Lock()
+
+
+def get_noise_profiles() -> NoiseProfiles:
+    global _profiles
+    with _lock:
+        if _profiles is None:
+            _profiles = NoiseProfiles()
+            atexit.register(_profiles.save)
+        return _profiles
+
+
+def track_noise(service, key: str) -> NoiseProfile:
+    """Make sure ``service``'s device is being tracked; returns its profile"""
+    profiles = get_noise_profiles()
+    with _lock:
+        tracker = _trackers.get(key)
+        if tracker is None or not tracker.alive or tracker.service is not service:
+            if tracker is not None:
+                tracker.stop()
+            _trackers[key] = NoiseTracker(service, key, profiles).start()
+    return profiles.get(key)
@@ -0,0 +1,283 @@
+import logging
+import re
+from collections import Counter
+from typing import Iterable, List, Optional, Tuple
+
+from rapidfuzz import fuzz, process
+
+from utils import COMMANDS, add_phrase_listener
+from slots import APP_ALIASES, APP_VERBS, FILLER_WORDS, extract_intent
+
+logger = logging.getLogger(__name__)
+
+# Apps open_app can launch beyond the aliases slots.py maps
+KNOWN_APPS = [
+    "notepad", "calculator", "chrome", "google chrome", "edge", "microsoft edge", "firefox",
+    "brave", "opera", "spotify", "discord", "telegram", "whatsapp", "zoom", "teams", "slack",
+    "vlc", "steam", "obs", "word", "excel", "powerpoint", "outlook", "onenote", "paint",
+    "command prompt", "powershell", "terminal", "explorer", "vscode", "visual studio code",
+    "task manager", "control panel", "settings",
+]
+
+# Actions that take the whole utterance as free text; a correction never turns into one
+FREE_TEXT_ACTIONS = {"ask_ai", "system_stats"}
+
+# App names may be rewritten on a close Metaphone key (Levenshtein ratio on the
+# keys) plus a looser spelling match: "node pair" -> "notepad"
+APP_KEY_CUTOFF = 75
+APP_CHAR_CUTOFF = 65
+# Other command words need an identical key and a close spelling, so ordinary
+# speech ("rate", "perform") isn't bent into "create" or "program"
+WORD_CHAR_CUTOFF = 70
+# Shorter spans ("per", "use") are too ambiguous to correct
+MIN_SPAN_LETTERS = 4
+
+_DIGIT_WORDS = {
+    "0": "zero", "1": "one", "2": "two", "3": "three", "4": "four",
+    "5": "five", "6": "six", "7": "seven", "8": "eight", "9": "nine",
+}
+_VOWELS = set("AEIOU")
+_FRONT_VOWELS = set("EIY")
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+_CAMEL_RE = re.compile(r"(?<=[a-z])(?=[A-Z])")
+_EXE_RE = re.compile(r"(\w+)\.exe\b", re.IGNORECASE)
+
+
+def metaphone(word: str) -> str:
+    """Return a Metaphone-style phonetic key ("notepad" -> "NTPT", "brve" -> "BRF")."""
+    w = "".join(ch for ch in word.upper() if "A" <= ch <= "Z")
+    if not w:
+        return ""
+    if w[:2] in ("AE", "GN", "KN", "PN", "WR"):
+        w = w[1:]
+    elif w[0] == "X":
+        w = "S" + w[1:]
+    elif w[:2] == "WH":
+        w = "W" + w[2:]
+
+    key = []
+    n = len(w)
+    for i, ch in enumerate(w):
+        prev = w[i - 1] if i > 0 else ""
+        nxt = w[i + 1] if i + 1 < n else ""
+        nxt2 = w[i + 2] if i + 2 < n else ""
+        if ch == prev and ch != "C":
+            continue
+        if ch in _VOWELS:
+            if i == 0:
+                key.append(ch)
+        elif ch == "B":
+            if not (prev == "M" and i == n - 1):
+                key.append("B")
+        elif ch == "C":
+            if nxt == "I" and nxt2 == "A":
+                key.append("X")
+            elif nxt == "H":
+                key.append("K" if prev == "S" else "X")
+            elif nxt in _FRONT_VOWELS:
+                if prev != "S":
+                    key.append("S")
+            else:
+                key.append("K")
+        elif ch == "D":
+            key.append("J" if nxt == "G" and nxt2 in _FRONT_VOWELS else "T")
+        elif ch == "G":
+            if nxt == "H" and nxt2 and nxt2 not in _VOWELS:
+                continue
+            if nxt == "N" and (i + 2 == n or w[i + 2:] == "ED"):
+                continue
+            if prev == "D" and nxt in _FRONT_VOWELS:
+                continue
+            key.append("J" if nxt in _FRONT_VOWELS else "K")
+        elif ch == "H":
+            if prev not in "CSPTG" and nxt in _VOWELS:
+                key.append("H")
+        elif ch == "K":
+            if prev != "C":
+                key.append("K")
+        elif ch == "P":
+            key.append("F" if nxt == "H" else "P")
+        elif ch == "Q":
+            key.append("K")
+        elif ch == "S":
+            if nxt == "H" or (nxt == "I" and nxt2 in ("O", "A")):
+                key.append("X")
+            else:
+                key.append("S")
+        elif ch == "T":
+            if nxt == "I" and nxt2 in ("O", "A"):
+                key.append("X")
+            elif nxt == "H":
+                key.append("0")
+            elif not (nxt == "C" and nxt2 == "H"):
+                key.append("T")
+        elif ch == "V":
+            key.append("F")
+        elif ch == "W" or ch == "Y":
+            if nxt in _VOWELS:
+                key.append(ch)
+        elif ch == "X":
+            key.append("KS")
+        elif ch == "Z":
+            key.append("S")
+        else:
+            # F, J, L, M, N, R sound as written
+            key.append(ch)
+    return "".join(key)
+
+
+def _split_exe(text: str) -> str:
+    """"open GoogleAnswers.exe" -> "open Google Answers" """
+    return _EXE_RE.sub(lambda m: _CAMEL_RE.sub(" ", m.group(1)), text)
+
+
+class PhoneticCorrector:
+    """Rewrites misheard words into command vocabulary before intent matching.
+
+    Every target (app names and command words) is indexed once by its
+    Metaphone key. A transcript is scanned left to right; each unknown word,
+    or pair of adjacent unknown words ("node pair"), is replaced by the target
+    it sounds like, provided the spelling is close too. Words that already
+    belong to a command phrase are never touched.
+    """
+
+    def __init__(self, apps: Iterable[str], words: Iterable[str], protected: Iterable[str] = ()):
+        self.apps = list(dict.fromkeys(a.lower().strip() for a in apps))
+        self._app_compact = [app.replace(" ", "") for app in self.apps]
+        self._app_keys = [metaphone(compact) for compact in self._app_compact]
+        self._word_by_key = {}
+        for word in dict.fromkeys(w.lower().strip() for w in words):
+            self._word_by_key.setdefault(metaphone(word), word)
+        vocabulary = {w for app in self.apps for w in app.split()} | set(self._word_by_key.values())
+        self.protected = vocabulary | {p.lower() for p in protected}
+        # Commands seen by correct_command, "corrected" ones it kept and their "tokens" rewritten
+        self.stats = Counter()
+
+    def lookup(self, span: str) -> Optional[str]:
+        """Return the app name or command word ``span`` was probably meant to be."""
+        compact = span.replace(" ", "")
+        if len(compact) < MIN_SPAN_LETTERS:
+            return None
+        key = metaphone(compact)
+        for _, _, i in process.extract(key, self._app_keys, scorer=fuzz.ratio,
+                                       score_cutoff=APP_KEY_CUTOFF, limit=5):
+            if fuzz.ratio(compact, self._app_compact[i]) >= APP_CHAR_CUTOFF:
+                return self.apps[i]
+        word = self._word_by_key.get(key)
+        if word and fuzz.ratio(compact, word) >= WORD_CHAR_CUTOFF:
+            return word
+        return None
+
+    def _app_with_number(self, word: str, raw_next: str) -> Optional[str]:
+        """STT sometimes renders a trailing syllable as a digit: "Note 3" -> "notepad"."""
+        if not raw_next.isdigit() or len(word) < MIN_SPAN_LETTERS:
+            return None
+        matches = [app for app, compact in zip(self.apps, self._app_compact)
+                   if compact.startswith(word) and compact != word]
+        return matches[0] if len(matches) == 1 else None
+
+    def correct_with_changes(self, text: str) -> Tuple[str, List[Tuple[str, str]]]:
+        """Return the corrected text and the (heard, replacement) pairs applied.
+
+        Only the rewritten spans change; the rest of the text keeps its
+        spelling, case and punctuation.
+        """
+        source = _split_exe(text)
+        spans = list(_TOKEN_RE.finditer(source.lower()))
+        raw = [m.group() for m in spans]
+        tokens = [_DIGIT_WORDS.get(token, token) for token in raw]
+        pieces, changes = [], []
+        if source != text:
+            # "GoogleAnswers.exe" style transcripts are split into plain words
+            changes.append((text, source))
+        i, copied = 0, 0
+        while i < len(tokens):
+            target, width = None, 1
+            if tokens[i] not in self.protected:
+                if i + 1 < len(tokens):
+                    target = self._app_with_number(tokens[i], raw[i + 1])
+                    if target is None and tokens[i + 1] not in self.protected:
+                        target = self.lookup(tokens[i] + " " + tokens[i + 1])
+                    width = 2
+                if target is None:
+                    target, width = self.lookup(tokens[i]), 1
+            if target and target != " ".join(tokens[i:i + width]):
+                start, end = spans[i].start(), spans[i + width - 1].end()
+                pieces.extend((source[copied:start], target))
+                copied = end
+                changes.append((" ".join(raw[i:i + width]), target))
+                i += width
+            else:
+                i += 1
+        if not changes:
+            return text, changes
+        pieces.append(source[copied:])
+        return "".join(pieces), changes
+
+    def correct(self, text: str) -> str:
+        return self.correct_with_changes(text)[0]
+
+    def hit_rate(self) -> float:
+        """Share of commands whose correction ``correct_command`` kept."""
+        seen = self.stats["utterances"]
+        return self.stats["corrected"] / seen if seen else 0.0
+
+
+def command_words() -> List[str]:
+    """Every word of the command phrases."""
+    return [word for phrases in COMMANDS.values() for phrase in phrases for word in phrase.split()]
+
+
+_CORRECTOR = None
+
+
+def get_corrector() -> PhoneticCorrector:
+    """Shared corrector, rebuilt by ``rebuild_corrector`` when COMMANDS changes."""
+    global _CORRECTOR
+    if _CORRECTOR is None:
+        _CORRECTOR = PhoneticCorrector(KNOWN_APPS + list(APP_ALIASES), command_words(),
+                                       protected=FILLER_WORDS | APP_VERBS)
+    return _CORRECTOR
+
+
+def rebuild_corrector():
+    global _CORRECTOR
+    _CORRECTOR = None
+
+
+add_phrase_listener(rebuild_corrector)
+
+
+def correct_command(text: Optional[str]):
+    """Return ``(command, intent)`` for a transcript, corrected only where it matters.
+
+    The correction is kept only when it changes the matched action or fixes
+    the app name of an app command ("open node pair" -> "open notepad").
+    Otherwise the transcript is returned as heard, so free-form questions
+    ("tell me about rome") reach the AI untouched.
+    """
+    if not text:
+        return text, None
+    corrector = get_corrector()
+    corrector.stats["utterances"] += 1
+    heard = extract_intent(text)
+    corrected, changes = corrector.correct_with_changes(text)
+    if not changes:
+        return text, heard
+    intent = extract_intent(corrected)
+    if intent.action is None or intent.action in FREE_TEXT_ACTIONS:
+        return text, heard
+    if intent.action == heard.action and (intent.app_name is None or intent.app_name == heard.app_name):
+        return text, heard
+    corrector.stats["corrected"] += 1
+    corrector.stats["tokens"] += len(changes)
+    logger.info(f"Corrected transcript: '{text}' -> '{corrected}'")
+    return corrected, intent
+
+
+def correction_hit_rate() -> dict:
+    """Counters for the live corrector plus the share of commands it corrected."""
+    corrector = get_corrector()
+    stats = dict(corrector.stats)
+    stats["hit_rate"] = corrector.hit_rate()
+    return stats
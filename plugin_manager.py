@@ -14,6 +14,24 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QIcon
 
+from action_registry import REGISTRY
+from utils import COMMANDS, set_command_phrases
+
+
+def _adapt_plugin_handler(func):
+    """Wrap a plugin callable so the registry can call it with an Intent.
+
+    Plugin functions take either no arguments or the raw command text.
+    """
+    try:
+        takes_args = len(inspect.signature(func).parameters) > 0
+    except (TypeError, ValueError):
+        takes_args = True
+
+    def handler(intent):
+        return func(intent.text) if takes_args else func()
+    return handler
+
 
 class PluginInfo:
     """Information about a plugin"""
@@ -55,6 +73,8 @@ class PluginManager:
         self.plugins_dir = Path(plugins_dir)
         self.plugins: Dict[str, PluginInfo] = {}
         self.action_map: Dict[str, Any] = {}
+        # Actions whose intent phrases were supplied by a plugin, by plugin name
+        self._plugin_phrases: Dict[str, List[str]] = {}
         self.settings_file = Path("plugin_settings.json")
         self.load_settings()
         
@@ -96,7 +116,7 @@ class PluginManager:
                 # Register plugin if it has a register function
                 if hasattr(module, 'register') and plugin_info.enabled:
                     try:
-                        module.register(self.action_map)
+                        self._register_plugin_actions(plugin_name, module)
                     except Exception as e:
                         print(f"Error registering plugin {plugin_name}: {e}")
                 
@@ -105,6 +125,46 @@ class PluginManager:
             except Exception as e:
                 print(f"Error loading plugin {plugin_name}: {e}")
                 
+    def _register_plugin_actions(self, plugin_name: str, module):
+        """Collect a plugin's actions through its register() hook into the shared registry.
+
+        ``register(actions)`` fills a dict mapping action names to either a
+        callable or a ``(callable, metadata)`` tuple, where metadata takes the
+        ActionSpec keywords (blocking, speaks, latency, concurrent_safe,
+        phrases, description). Names already taken by a core action or another
+        plugin are skipped, so disabling the plugin can't remove them.
+        """
+        plugin_actions: Dict[str, Any] = {}
+        module.register(plugin_actions)
+        for name, entry in plugin_actions.items():
+            if self._owned_elsewhere(plugin_name, name):
+                print(f"Plugin {plugin_name} tried to replace action '{name}'; skipped")
+                continue
+            func, metadata = entry if isinstance(entry, tuple) else (entry, {})
+            metadata = {key: value for key, value in metadata.items() if key != 'source'}
+            REGISTRY.register(name, _adapt_plugin_handler(func), source=plugin_name, **metadata)
+            self.action_map[name] = func
+            if metadata.get('phrases'):
+                set_command_phrases(name, metadata['phrases'])
+                names = self._plugin_phrases.setdefault(plugin_name, [])
+                if name not in names:
+                    names.append(name)
+
+    def _owned_elsewhere(self, plugin_name: str, name: str) -> bool:
+        """Whether ``name`` belongs to a core action or to a different plugin"""
+        spec = REGISTRY.get(name)
+        if spec is not None and spec.source != plugin_name:
+            return True
+        # Core phrases can exist before actions.py has registered the handlers
+        return name in COMMANDS and name not in self._plugin_phrases.get(plugin_name, [])
+
+    def _unregister_plugin_actions(self, plugin_name: str):
+        """Remove a plugin's actions and intent phrases from the shared registry"""
+        for name in REGISTRY.unregister_source(plugin_name):
+            self.action_map.pop(name, None)
+        for name in self._plugin_phrases.pop(plugin_name, []):
+            set_command_phrases(name, None)
+
     def is_plugin_enabled(self, plugin_name: str) -> bool:
         """Check if a plugin is enabled in settings"""
         return self.settings.get('enabled_plugins', {}).get(plugin_name, True)
@@ -118,7 +178,7 @@ class PluginManager:
             # Register plugin functions
             if plugin.module and hasattr(plugin.module, 'register'):
                 try:
-                    plugin.module.register(self.action_map)
+                    self._register_plugin_actions(plugin_name, plugin.module)
                 except Exception as e:
                     print(f"Error registering plugin {plugin_name}: {e}")
                     
@@ -130,11 +190,8 @@ class PluginManager:
             plugin = self.plugins[plugin_name]
             plugin.enabled = False
             
-            # Remove plugin functions from action map
-            if plugin.module and hasattr(plugin.module, 'register'):
-                # This is a simplified approach - in a real implementation,
-                # you'd want to track which functions belong to which plugin
-                pass
+            # Remove plugin functions from the shared registry
+            self._unregister_plugin_actions(plugin_name)
                 
             self.save_settings()
             
@@ -147,7 +204,7 @@ class PluginManager:
         return actions
         
     def execute_action(self, action_name: str, *args, **kwargs):
-        """Execute an action from a plugin"""
+        """Execute a plugin action directly with its original arguments"""
         if action_name in self.action_map:
             try:
                 return self.action_map[action_name](*args, **kwargs)
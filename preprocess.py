@@ -0,0 +1,200 @@
+"""
+Vectorised clean-up between capture and STT.
+
+Stages, each switched on or off through PREPROCESS_STAGES:
+
+- ``resample``: to the engine's native rate (windowed-sinc low-pass, then
+  decimation or interpolation), so the recognizer gets the rate its model
+  was trained on instead of whatever the device delivers.
+- ``dc``: removes the DC offset cheap USB mics add.
+- ``agc``: one gain for the whole utterance that brings the speech level
+  (loud frames, not the average) to AGC_TARGET_DB, capped at MAX_GAIN_DB
+  and never pushing peaks into clipping.
+- ``gate``: spectral gating. Each STFT bin is compared against a noise
+  spectrum (given, or taken from the quietest frames) and bins that don't
+  rise clearly above it are attenuated by GATE_REDUCTION_DB, with a
+  smoothed mask so the result doesn't warble.
+
+Everything works on whole utterances in float32; the target cost is a few
+milliseconds per second of audio (see bench_preprocess.py).
+"""
+import logging
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+PREPROCESS_STAGES = ("resample", "dc", "agc", "gate")
+TARGET_RATE = 16000
+RESAMPLE_TAPS = 63
+POLYPHASE_TAPS = 32
+RESAMPLE_PHASES = 64
+AGC_TARGET_DB = -20.0
+MAX_GAIN_DB = 30.0
+PEAK_LIMIT = 0.95
+GATE_FFT = 512
+GATE_HOP = GATE_FFT // 2   # the overlap-add assumes 50% overlap
+# A bin counts as signal this far above the noise spectrum
+GATE_THRESHOLD_DB = 6.0
+GATE_REDUCTION_DB = 12.0
+# Share of the quietest frames taken as noise when no profile is given
+GATE_NOISE_QUANTILE = 0.2
+
+
+def _lowpass(cutoff: float, taps: int = RESAMPLE_TAPS) -> np.ndarray:
+    """Hann-windowed sinc low-pass; ``cutoff`` is a fraction of the sample rate"""
+    n = np.arange(taps) - (taps - 1) / 2
+    h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hanning(taps)
+    return (h / h.sum()).astype(np.float32)
+
+
+@lru_cache(maxsize=8)
+def _polyphase_table(cutoff: float) -> np.ndarray:
+    """RESAMPLE_PHASES windowed-sinc kernels, one per fractional offset between input samples"""
+    offsets = np.arange(POLYPHASE_TAPS) - (POLYPHASE_TAPS // 2 - 1)
+    t = offsets[None, :] - (np.arange(RESAMPLE_PHASES) / RESAMPLE_PHASES)[:, None]
+    h = 2 * cutoff * np.sinc(2 * cutoff * t) * (0.5 + 0.5 * np.cos(np.pi * t / (POLYPHASE_TAPS / 2)))
+    return (h / h.sum(axis=1, keepdims=True)).astype(np.float32)
+
+
+def resample(x: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    """Band-limited resampling of float samples, computing only the output samples.
+
+    Integer down-sampling (48 kHz to 16 kHz) is a plain decimating FIR; other
+    ratios (44.1 kHz) take, for each output, the kernel for the nearest of
+    RESAMPLE_PHASES fractional positions.
+    """
+    if src_rate == dst_rate or len(x) == 0:
+        return x
+    cutoff = 0.5 * min(1.0, dst_rate / src_rate) * 0.9
+    if src_rate % dst_rate == 0:
+        h = _lowpass(cutoff)
+        padded = np.pad(x, (len(h) // 2, len(h) // 2))
+        return sliding_window_view(padded, len(h))[::src_rate // dst_rate] @ h[::-1]
+    n_out = int(round(len(x) * dst_rate / src_rate))
+    positions = np.arange(n_out) * (src_rate / dst_rate)
+    base = positions.astype(np.int64)
+    phase = np.rint((positions - base) * RESAMPLE_PHASES).astype(np.int64)
+    base += phase // RESAMPLE_PHASES
+    phase %= RESAMPLE_PHASES
+    padded = np.pad(x, (POLYPHASE_TAPS // 2 - 1, POLYPHASE_TAPS // 2 + 1))
+    windows = sliding_window_view(padded, POLYPHASE_TAPS)[base]
+    return np.einsum("ij,ij->i", windows, _polyphase_table(cutoff)[phase])
+
+
+def remove_dc(x: np.ndarray) -> np.ndarray:
+    return x - x.mean() if len(x) else x
+
+
+def _frame_levels_db(x: np.ndarray, frame: int) -> np.ndarray:
+    n = len(x) // frame
+    if n == 0:
+        return np.array([10.0 * np.log10(np.mean(x * x) + 1e-10)]) if len(x) else np.array([-100.0])
+    frames = x[:n * frame].reshape(n, frame)
+    return 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+
+
+def auto_gain(x: np.ndarray, sample_rate: int, target_db: float = AGC_TARGET_DB,
+              max_gain_db: float = MAX_GAIN_DB) -> np.ndarray:
+    """Scale so the 90th-percentile 30 ms frame level sits at ``target_db`` dBFS"""
+    if len(x) == 0:
+        return x
+    speech_db = np.percentile(_frame_levels_db(x, int(sample_rate * 0.03)), 90)
+    gain_db = min(max_gain_db, target_db - speech_db)
+    peak = np.abs(x).max()
+    gain = 10 ** (gain_db / 20)
+    if peak * gain > PEAK_LIMIT:
+        gain = PEAK_LIMIT / peak if peak > 0 else 1.0
+    return x * np.float32(gain)
+
+
+def _quiet_mean(magnitude: np.ndarray, quantile: float) -> np.ndarray:
+    energy = magnitude.sum(axis=1)
+    return magnitude[energy <= np.quantile(energy, quantile)].mean(axis=0)
+
+
+def noise_spectrum(x: np.ndarray, quantile: float = 1.0) -> Optional[np.ndarray]:
+    """Mean STFT magnitude of ambient audio, for ``spectral_gate``.
+
+    With ``quantile`` below 1 only that share of the quietest frames counts,
+    so audio with some speech in it still gives the background spectrum.
+    """
+    if len(x) < GATE_FFT:
+        return None
+    frames = sliding_window_view(x, GATE_FFT)[::GATE_HOP] * np.hanning(GATE_FFT).astype(np.float32)
+    return _quiet_mean(np.abs(np.fft.rfft(frames, axis=1)), quantile)
+
+
+def spectral_gate(x: np.ndarray, noise: Optional[np.ndarray] = None,
+                  threshold_db: float = GATE_THRESHOLD_DB,
+                  reduction_db: float = GATE_REDUCTION_DB) -> np.ndarray:
+    """Attenuate STFT bins that stay within ``threshold_db`` of the noise spectrum"""
+    if len(x) < GATE_FFT:
+        return x
+    window = np.hanning(GATE_FFT).astype(np.float32)
+    pad = (-(len(x) - GATE_FFT)) % GATE_HOP
+    padded = np.pad(x, (GATE_FFT - GATE_HOP, pad + GATE_FFT - GATE_HOP))
+    frames = sliding_window_view(padded, GATE_FFT)[::GATE_HOP] * window
+    spectrum = np.fft.rfft(frames, axis=1)
+    magnitude = np.abs(spectrum)
+    if noise is None:
+        noise = _quiet_mean(magnitude, GATE_NOISE_QUANTILE)
+    signal = magnitude > noise * 10 ** (threshold_db / 20)
+    mask = np.where(signal, 1.0, 10 ** (-reduction_db / 20)).astype(np.float32)
+    # Smooth over neighbouring bins and frames so isolated bins don't flicker on and off
+    m = np.pad(mask, 1, mode="edge")
+    m = 0.25 * m[:, :-2] + 0.5 * m[:, 1:-1] + 0.25 * m[:, 2:]
+    mask = 0.25 * m[:-2] + 0.5 * m[1:-1] + 0.25 * m[2:]
+    cleaned = (np.fft.irfft(spectrum * mask, n=GATE_FFT, axis=1) * window).astype(np.float32)
+    # Overlap-add at 50% overlap: each hop is one frame's first half plus the previous frame's second half
+    out = cleaned[:, :GATE_HOP].copy()
+    out[1:] += cleaned[:-1, GATE_HOP:]
+    weight = window[:GATE_HOP] ** 2 + window[GATE_HOP:] ** 2
+    out = (out / np.maximum(weight, 1e-3)).ravel()
+    start = GATE_FFT - GATE_HOP
+    return out[start:start + len(x)]
+
+
+class Preprocessor:
+    """The enabled stages, applied in a fixed order: resample, dc, agc, gate"""
+
+    def __init__(self, stages: Iterable[str] = ("resample", "dc"), target_rate: int = TARGET_RATE):
+        stages = set(stages)
+        for unknown in sorted(stages - set(PREPROCESS_STAGES)):
+            logger.warning(f"Unknown preprocessing stage {unknown!r} ignored")
+        self.stages = [stage for stage in PREPROCESS_STAGES if stage in stages]
+        self.target_rate = target_rate
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.stages)
+
+    @property
+    def utterance_level(self) -> bool:
+        """True if a stage needs the complete utterance, so chunks can't be streamed to STT raw"""
+        return "agc" in self.stages or "gate" in self.stages
+
+    def process(self, samples: np.ndarray, sample_rate: int,
+                noise: Optional[np.ndarray] = None) -> Tuple[np.ndarray, int]:
+        """Return (int16 samples, rate) after every enabled stage.
+
+        ``noise`` is an optional ``noise_spectrum`` for the gate, taken at
+        the output rate; otherwise the quietest frames stand in for it.
+        """
+        if not self.stages:
+            return samples, sample_rate
+        x = samples.astype(np.float32) / 32768.0
+        for stage in self.stages:
+            if stage == "resample":
+                x = resample(x, sample_rate, self.target_rate)
+                sample_rate = self.target_rate
+            elif stage == "dc":
+                x = remove_dc(x)
+            elif stage == "agc":
+                x = auto_gain(x, sample_rate)
+            elif stage == "gate":
+                x = spectral_gate(x, noise)
+        return (np.clip(x, -1.0, 32767 / 32768.0) * 32768.0).astype(np.int16), sample_rate
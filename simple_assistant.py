@@ -21,10 +21,10 @@ def assistant(command):
     else:
         print("Sorry, I don't know how to do that yet.")
 
-# Function to listen for commands
-def listen():
+# Function to listen for commands (from the microphone unless given an audio_source.AudioSource)
+def listen(audio_source=None):
     r = sr.Recognizer()
-    with sr.Microphone() as source:
+    with (audio_source.as_sr_source() if audio_source else sr.Microphone()) as source:
         print("Listening...")
         # Light ambient noise calibration for better results
         try:
@@ -0,0 +1,253 @@
+import re
+from typing import Optional, Tuple
+
+from utils import match_intent_scored, PREFIX_ROUTER, COMMANDS
+
+# Words that never belong to an app name or search query
+FILLER_WORDS = {"to", "the", "a", "an", "my", "please", "app", "application", "for", "me"}
+
+# Spoken app names mapped onto the names open_app knows how to launch
+APP_ALIASES = {
+    "google chrome": "chrome",
+    "google": "chrome",
+    "chrome": "chrome",
+    "microsoft edge": "edge",
+    "edge": "edge",
+    "firefox": "firefox",
+    "notepad": "notepad",
+    "calculator": "calc",
+    "calc": "calc",
+    "command prompt": "cmd",
+    "paint": "mspaint",
+}
+
+# Leading verbs stripped from app commands when the prefix router didn't split them off
+APP_VERBS = {"open", "launch", "start", "run", "close", "exit", "quit", "terminate"}
+
+PLAY_FILLERS = {"song", "video", "music"}
+
+SPOKEN_NUMBERS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+    "thirteen": 13, "fourteen": 14, "fifteen": 15, "sixteen": 16, "seventeen": 17,
+    "eighteen": 18, "nineteen": 19, "twenty": 20, "thirty": 30, "forty": 40,
+    "fifty": 50, "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90,
+    "hundred": 100, "couple": 2,
+}
+
+# Words that can make up a spoken quantity, besides digits
+QUANTITY_WORDS = set(SPOKEN_NUMBERS) | {"a", "an", "half", "and", "of"}
+
+DURATION_UNITS = {
+    "s": 1, "sec": 1, "secs": 1, "second": 1, "seconds": 1,
+    "m": 60, "min": 60, "mins": 60, "minute": 60, "minutes": 60,
+    "h": 3600, "hr": 3600, "hrs": 3600, "hour": 3600, "hours": 3600,
+}
+
+PROGRAMMING_LANGUAGES = {
+    "python": "Python", "javascript": "JavaScript", "typescript": "TypeScript",
+    "java": "Java", "c#": "C#", "c sharp": "C#", "csharp": "C#", "c++": "C++",
+    "cpp": "C++", "go": "Go", "golang": "Go", "rust": "Rust",
+}
+
+DEFAULT_TIMER_SECONDS = 60
+
+_TOKEN_RE = re.compile(r"\d+(?:\.\d+)?|[a-z#+]+")
+_LANGUAGE_RE = re.compile(
+    r"\b(?:in|using|with)\s+(" + "|".join(
+        re.escape(name) for name in sorted(PROGRAMMING_LANGUAGES, key=len, reverse=True)
+    ) + r")(?=\s|$|[.,])"
+)
+# Looser phrasing of code requests: "generate a code for X", "write some program that X"
+_CODE_REQUEST_RE = re.compile(
+    r"\b(?:generate|write|create|make)\s+(?:a\s+|an\s+|some\s+)?(?:code|script|program)\s+"
+    r"(?:for|to|that)\s+(.*)$"
+)
+_APP_ALIAS_RE = re.compile(
+    r"\b(" + "|".join(re.escape(name) for name in sorted(APP_ALIASES, key=len, reverse=True)) + r")\b"
+)
+
+
+class Intent:
+    """A matched action plus the typed slots extracted from the utterance"""
+
+    def __init__(self, action: Optional[str], text: str, score: float = 0.0,
+                 argument: str = ""):
+        self.action = action
+        self.text = text
+        self.score = score
+        # Raw text following the command prefix, e.g. "notepad" in "open notepad"
+        self.argument = argument
+        self.app_name: Optional[str] = None
+        self.duration_seconds: Optional[float] = None
+        self.query: Optional[str] = None
+        self.language: Optional[str] = None
+
+    def slots(self) -> dict:
+        """Return the filled slots as a plain dict"""
+        return {
+            name: value for name, value in (
+                ("app_name", self.app_name),
+                ("duration_seconds", self.duration_seconds),
+                ("query", self.query),
+                ("language", self.language),
+            ) if value is not None
+        }
+
+    def __repr__(self):
+        return f"Intent(action={self.action!r}, slots={self.slots()!r})"
+
+
+def _tokens(text: str):
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _strip_words(text: str, words) -> str:
+    """Drop whole words (never substrings) from ``text``"""
+    return " ".join(token for token in text.split() if token not in words)
+
+
+def _quantity(words) -> Tuple[Optional[float], bool]:
+    """Value of a spoken quantity like "two and a half", "a couple of" or "half an".
+
+    Returns ``(value, numeric)``; a lone article is ``(1, False)`` since "an"
+    only means one in front of a unit, and words with no number give None.
+    """
+    value, numeric = None, False
+    for word in words:
+        if word == "half":
+            # "two and a half" adds; "half", "a half" and "half an" are 0.5
+            value = (value if numeric else 0.0) + 0.5
+            numeric = True
+        elif word == "hundred":
+            # "two hundred" multiplies; a bare "hundred" or "a hundred" is 100
+            value = (value if numeric else 1) * 100
+            numeric = True
+        elif word[0].isdigit() or word in SPOKEN_NUMBERS:
+            number = float(word) if word[0].isdigit() else SPOKEN_NUMBERS[word]
+            # "twenty five" adds up; "a couple" replaces the article
+            value = value + number if numeric else number
+            numeric = True
+        elif word in ("a", "an") and value is None:
+            value = 1
+    return value, numeric
+
+
+def parse_duration(text: str) -> Optional[float]:
+    """Parse durations like "5 minutes", "two and a half minutes" or "90" into seconds.
+
+    Only quantities directly in front of a unit count ("an hour", "1 minute
+    30 seconds"), plus a trailing "and a half" after one, so other numbers
+    in the sentence are ignored. A bare number is read as seconds, matching
+    the old behaviour, but only when the text names no unit at all.
+    Returns None when the text holds no duration.
+    """
+    total, found, bare = 0.0, False, None
+    run = []
+    # Unit of the previous token, so "and a half" right after it can refer to it
+    previous_unit = None
+    for token in _tokens(text) + [None]:
+        if token is not None and (token in QUANTITY_WORDS or token[0].isdigit()):
+            run.append(token)
+            continue
+        value, numeric = _quantity(run)
+        if token in DURATION_UNITS:
+            if value is not None:
+                total += value * DURATION_UNITS[token]
+                found = True
+        elif numeric:
+            if previous_unit and run[0] == "and" and value < 1:
+                # "an hour and a half": a fraction of the unit just spoken
+                total += value * previous_unit
+            elif bare is None:
+                bare = value
+        previous_unit = DURATION_UNITS.get(token)
+        run = []
+    return total if found else bare
+
+
+def parse_app_name(text: str) -> str:
+    """Turn "open the google chrome please" into a launchable name like "chrome"."""
+    lowered = text.lower().strip()
+    alias = _APP_ALIAS_RE.search(lowered)
+    if alias:
+        return APP_ALIASES[alias.group(1)]
+    words = lowered.split()
+    while words and words[0] in APP_VERBS:
+        words.pop(0)
+    return _strip_words(" ".join(words), FILLER_WORDS).strip(" .,!?]")
+
+
+def parse_language(text: str) -> Optional[str]:
+    """Return the programming language named by "in python", "using rust", ..."""
+    m = _LANGUAGE_RE.search(text.lower())
+    return PROGRAMMING_LANGUAGES[m.group(1)] if m else None
+
+
+def _code_prompt(text: str) -> str:
+    for prefix in COMMANDS["generate_code"]:
+        if prefix in text:
+            return text.split(prefix, 1)[1].strip()
+    m = _CODE_REQUEST_RE.search(text)
+    return m.group(1).strip() if m else ""
+
+
+def _fill_app(intent: Intent):
+    intent.app_name = parse_app_name(intent.argument or intent.text)
+
+
+def _fill_timer(intent: Intent):
+    seconds = parse_duration(intent.argument or intent.text)
+    intent.duration_seconds = seconds if seconds else DEFAULT_TIMER_SECONDS
+
+
+def _fill_code_request(intent: Intent):
+    prompt = intent.argument or _code_prompt(intent.text)
+    intent.language = parse_language(prompt)
+    if intent.language:
+        prompt = " ".join(_LANGUAGE_RE.sub("", prompt).split())
+    intent.query = prompt or None
+
+
+def _fill_play_query(intent: Intent):
+    query = intent.argument or intent.text
+    if not intent.argument and query.startswith("play"):
+        query = query[len("play"):]
+    query = re.sub(r"\bon youtube\b", "", query)
+    intent.query = _strip_words(query, PLAY_FILLERS).strip() or None
+
+
+def _fill_full_text(intent: Intent):
+    intent.query = intent.text
+
+
+# Slot grammar: which filler runs for each action. Actions not listed take no slots.
+SLOT_FILLERS = {
+    "open_app": _fill_app,
+    "close_app": _fill_app,
+    "set_timer": _fill_timer,
+    "generate_code": _fill_code_request,
+    "play_youtube": _fill_play_query,
+    "ask_ai": _fill_full_text,
+    "system_stats": _fill_full_text,
+}
+
+
+def extract_slots(action: Optional[str], command: str, score: float = 0.0) -> Intent:
+    """Build an Intent for an already-matched ``action`` and fill its slots once."""
+    text = (command or "").lower().strip()
+    argument = ""
+    routed = PREFIX_ROUTER.route(text)
+    if routed and routed[0] == action:
+        argument = routed[1]
+    intent = Intent(action, text, score=score, argument=argument)
+    filler = SLOT_FILLERS.get(action)
+    if filler:
+        filler(intent)
+    return intent
+
+
+def extract_intent(command: str) -> Intent:
+    """Match ``command`` to an action and extract its slots in one pass."""
+    match = match_intent_scored(command or "")
+    return extract_slots(match.action, command, score=match.score)
@@ -4,15 +4,37 @@ import threading
 import time
 import os
 import json
-from typing import Optional, List, Dict, Any, Callable
+from typing import Optional, List, Dict, Any, Callable, Tuple
 from pathlib import Path
 import logging
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import partial
+import numpy as np
 
 # Import configuration
 from config import (
-    get_stt_engine, get_wake_word_enabled, 
-    get_listening_timeout, get_phrase_time_limit
+    get_stt_engine, get_wake_word_enabled, get_wake_pre_roll_seconds,
+    get_listening_timeout, get_phrase_time_limit,
+    get_faster_whisper_model, get_faster_whisper_compute_type,
+    get_faster_whisper_threads, get_dictation_beam_size, get_whisper_language,
+    get_vosk_grammar, get_vosk_grammar_confidence,
+    get_persistent_capture, get_pre_roll_seconds, get_vad_profile, get_preprocess_stages,
+    get_hedge_local_engine, get_hedge_budget_seconds, get_hedge_min_confidence,
+    get_hedge_breaker_failures, get_hedge_breaker_seconds
 )
+from audio_capture import (
+    get_capture_service, stop_capture_services, audio_data_to_float32, capture_from_source, RingSource,
+    audio_data_to_int16, pcm16_audio_data
+)
+from vad import VoiceActivityDetector
+from preprocess import Preprocessor
+from noise_profile import get_noise_profiles, track_noise
+from mic_quality import score_microphones
+from device_registry import DeviceInfo, DeviceRegistry, get_registry
+from utils import COMMANDS, add_phrase_listener
+from phonetic import KNOWN_APPS
+from slots import APP_ALIASES, APP_VERBS, DURATION_UNITS, SPOKEN_NUMBERS
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -25,12 +47,25 @@ _selected_mic_index = None
 _mic_quality_scores = {}
 _recognition_models = {}
 _status_callback = None
+# Reference point for the startup timings in the log
+_STARTED_AT = time.monotonic()
+_first_command_logged = False
+_preload_future = None
+_preload_lock = threading.Lock()
 
 
 # STT Engine implementations
 class STTEngine:
     """Base class for Speech-to-Text engines"""
     
+    # Engines that can decode while audio is still being captured set this and implement stream()
+    supports_streaming = False
+    # Whether recognize() may run for two utterances at once; local models keep per-engine
+    # decoder state (Vosk's cached KaldiRecognizers, the Whisper model) and may not
+    thread_safe = False
+    # Rate the model works at; captured audio is resampled to it before recognize()
+    sample_rate = 16000
+    
     def __init__(self, name: str):
         self.name = name
         self.model = None
@@ -39,10 +74,14 @@ class STTEngine:
         """Load the recognition model"""
         pass
         
-    def recognize(self, audio_data) -> Optional[str]:
-        """Recognize speech from audio data"""
+    def recognize(self, audio_data, profile: str = "command") -> Optional[str]:
+        """Recognize speech from audio data; ``profile`` names a DECODING_PROFILES entry"""
         pass
         
+    def recognize_scored(self, audio_data, profile: str = "command") -> Tuple[Optional[str], Optional[float]]:
+        """(text, confidence 0..1); confidence is None for engines that don't report one"""
+        return self.recognize(audio_data, profile), None
+        
     def is_available(self) -> bool:
         """Check if the engine is available"""
         return True
@@ -51,11 +90,14 @@ class STTEngine:
 class GoogleSTT(STTEngine):
     """Google Speech Recognition engine"""
     
+    # Each request is an independent HTTP call
+    thread_safe = True
+    
     def __init__(self):
         super().__init__("google")
         self.recognizer = sr.Recognizer()
         
-    def recognize(self, audio_data) -> Optional[str]:
+    def recognize(self, audio_data, profile: str = "command") -> Optional[str]:
         try:
             return self.recognizer.recognize_google(audio_data)
         except sr.UnknownValueError:
@@ -63,15 +105,171 @@ class GoogleSTT(STTEngine):
         except sr.RequestError as e:
             logger.error(f"Google STT error: {e}")
             return None
+            
+    def recognize_scored(self, audio_data, profile: str = "command") -> Tuple[Optional[str], Optional[float]]:
+        """Top alternative and its confidence; ``sr.RequestError`` propagates so callers see outages"""
+        result = self.recognizer.recognize_google(audio_data, show_all=True)
+        alternatives = result.get("alternative", []) if isinstance(result, dict) else []
+        if not alternatives:
+            return None, None
+        return alternatives[0].get("transcript"), alternatives[0].get("confidence")
+
+
+_vosk_grammar = None
+
+
+def vosk_grammar() -> List[str]:
+    """Phrase list for grammar-mode Vosk, rebuilt when COMMANDS changes.
+
+    Covers every command phrase (plugin phrases included), each app verb with
+    each known app name, and spoken timer durations. Free-text commands
+    ("what is ...") can't be listed; they come out as "[unk]" and fall back to
+    the free-form model.
+    """
+    global _vosk_grammar
+    if _vosk_grammar is None:
+        apps = sorted(set(KNOWN_APPS) | set(APP_ALIASES))
+        units = [unit for unit in DURATION_UNITS if len(unit) > 3]
+        phrases = [phrase for phrases in COMMANDS.values() for phrase in phrases]
+        phrases += apps
+        phrases += [f"{verb} {app}" for verb in sorted(APP_VERBS) for app in apps]
+        phrases += [f"{prefix}{joiner} {number} {unit}" for prefix in COMMANDS.get("set_timer", [])
+                    for joiner in ("", " for") for number in SPOKEN_NUMBERS for unit in units]
+        _vosk_grammar = sorted(set(phrase.lower() for phrase in phrases)) + ["[unk]"]
+    return _vosk_grammar
+
+
+class VoskStream:
+    """One utterance of streaming Vosk recognition on raw 16-bit PCM"""
+    
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self.partial = ""
+        self.failed = False
+        self._segments = []
+        # Per-word confidences of the closed segments; "[unk]" counts as 0
+        self._confidences = []
+        
+    def accept(self, samples) -> Optional[str]:
+        """Feed int16 samples; returns the new partial hypothesis when it changes"""
+        if self.failed:
+            return None
+        try:
+            if self.recognizer.AcceptWaveform(samples.tobytes()):
+                # Vosk closed a segment on its own (a pause mid-command); keep it
+                text = self._collect(self.recognizer.Result())
+                if text:
+                    self._segments.append(text)
+                self.partial = ""
+                return None
+            partial = json.loads(self.recognizer.PartialResult()).get('partial', '')
+        except Exception as e:
+            logger.error(f"Vosk streaming error: {e}")
+            self.failed = True
+            return None
+        if partial and partial != self.partial:
+            self.partial = partial
+            return " ".join(self._segments + [partial])
+        return None
+        
+    def finish(self) -> Optional[str]:
+        """Flush the decoder and return the utterance text (None if streaming failed)"""
+        if self.failed:
+            return None
+        try:
+            text = self._collect(self.recognizer.FinalResult())
+        except Exception as e:
+            logger.error(f"Vosk streaming error: {e}")
+            return None
+        return " ".join(self._segments + ([text] if text else [])).strip()
+        
+    @property
+    def confidence(self) -> float:
+        """Mean word confidence of the finished utterance (0 if empty or partly unknown)"""
+        if not self._confidences or min(self._confidences) == 0.0:
+            return 0.0
+        return float(np.mean(self._confidences))
+        
+    def _collect(self, result_json: str) -> str:
+        result = json.loads(result_json)
+        words = result.get('result', [])
+        self._confidences.extend(0.0 if w.get('word') == '[unk]' else w.get('conf', 1.0) for w in words)
+        return " ".join(w for w in result.get('text', '').split() if w != '[unk]')
+
+
+class GrammarVoskStream:
+    """Grammar-constrained Vosk with the free-form model decoding the same audio alongside.
+
+    The free-form recognizer is fed on the engine's worker thread (Vosk
+    releases the GIL while decoding), so it costs no latency. Its result is
+    only used when the grammar result is below ``min_confidence``.
+    """
+    
+    def __init__(self, grammar: VoskStream, free: VoskStream, worker: ThreadPoolExecutor,
+                 min_confidence: float):
+        self.grammar = grammar
+        self.free = free
+        self.worker = worker
+        self.min_confidence = min_confidence
+        self.used_fallback = False
+        self._pending = None
+        
+    @property
+    def failed(self) -> bool:
+        return self.grammar.failed and self.free.failed
+        
+    @property
+    def confidence(self) -> float:
+        return self.free.confidence if self.used_fallback else self.grammar.confidence
+        
+    def accept(self, samples) -> Optional[str]:
+        # A single worker keeps the free-form chunks in order
+        self._pending = self.worker.submit(self.free.accept, samples)
+        return self.grammar.accept(samples)
+        
+    def finish(self) -> Optional[str]:
+        text = self.grammar.finish()
+        if text and self.grammar.confidence >= self.min_confidence:
+            if self._pending is not None:
+                # The free-form recognizer is reused next utterance; let it drain first
+                self._pending.result()
+            return text
+        self.used_fallback = True
+        free_text = self.worker.submit(self.free.finish).result()
+        logger.info(f"Vosk grammar result {text!r} (confidence {self.grammar.confidence:.2f}) "
+                    f"replaced by free-form {free_text!r}")
+        return free_text if free_text is not None else text
+
+
+def _vosk_model_rate(model_path: str, default: int = 16000) -> int:
+    """Sample rate a Vosk model was trained at, from its feature config (8 kHz models exist)"""
+    try:
+        with open(os.path.join(model_path, "conf", "mfcc.conf"), "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("--sample-frequency="):
+                    return int(float(line.split("=", 1)[1]))
+    except (OSError, ValueError):
+        pass
+    return default
 
 
 class VoskSTT(STTEngine):
     """Vosk offline Speech Recognition engine"""
     
-    def __init__(self):
+    supports_streaming = True
+    
+    def __init__(self, grammar: Optional[bool] = None):
         super().__init__("vosk")
         self.model = None
-        self.recognizer = None
+        self.grammar = get_vosk_grammar() if grammar is None else grammar
+        self.min_confidence = get_vosk_grammar_confidence()
+        # One KaldiRecognizer per sample rate, reset before every utterance
+        self._recognizers = {}
+        self._grammar_recognizers = {}
+        self._lock = threading.Lock()
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vosk-free") if self.grammar else None
+        if self.grammar:
+            add_phrase_listener(self._drop_grammar_recognizers)
         
     def load_model(self):
         try:
@@ -80,8 +278,14 @@ class VoskSTT(STTEngine):
             model_paths = [
                 "models/vosk-model-en-us-0.22",
                 "vosk-model-en-us-0.22",
-                os.path.expanduser("~/vosk-model-en-us-0.22")
+                os.path.expanduser("~/vosk-model-en-us-0.22"),
+                # Small models have a dynamic graph, which grammar mode needs
+                "models/vosk-model-small-en-us-0.15",
+                "vosk-model-small-en-us-0.15",
+                os.path.expanduser("~/vosk-model-small-en-us-0.15"),
             ]
+            if self.grammar:
+                model_paths = model_paths[3:] + model_paths[:3]
             
             model_path = None
             for path in model_paths:
@@ -94,8 +298,8 @@ class VoskSTT(STTEngine):
                 return False
                 
             self.model = vosk.Model(model_path)
-            self.recognizer = vosk.KaldiRecognizer(self.model, 16000)
-            logger.info("Vosk model loaded successfully")
+            self.sample_rate = _vosk_model_rate(model_path)
+            logger.info(f"Vosk model loaded successfully ({self.sample_rate} Hz)")
             return True
             
         except ImportError:
@@ -105,36 +309,57 @@ class VoskSTT(STTEngine):
             logger.error(f"Error loading Vosk model: {e}")
             return False
             
-    def recognize(self, audio_data) -> Optional[str]:
-        if not self.recognizer:
+    def stream(self, sample_rate: Optional[int] = None):
+        """Start a streaming session for one utterance at ``sample_rate`` (the model's rate by default)"""
+        sample_rate = sample_rate or self.sample_rate
+        if not self.model:
             return None
-            
-        try:
-            # Convert audio data for Vosk
-            import wave
-            import io
-            
-            # Create a temporary WAV file in memory
-            wav_buffer = io.BytesIO()
-            with wave.open(wav_buffer, 'wb') as wav_file:
-                wav_file.setnchannels(1)
-                wav_file.setsampwidth(2)
-                wav_file.setframerate(16000)
-                wav_file.writeframes(audio_data.get_wav_data())
-                
-            wav_buffer.seek(0)
-            audio_bytes = wav_buffer.read()
-            
-            if self.recognizer.AcceptWaveform(audio_bytes):
-                result = json.loads(self.recognizer.Result())
-                return result.get('text', '').strip()
+        if not self.grammar:
+            return self._free_stream(sample_rate)
+        import vosk
+        with self._lock:
+            recognizer = self._grammar_recognizers.get(sample_rate)
+            if recognizer is None:
+                recognizer = vosk.KaldiRecognizer(self.model, sample_rate, json.dumps(vosk_grammar()))
+                recognizer.SetWords(True)
+                self._grammar_recognizers[sample_rate] = recognizer
             else:
-                partial = json.loads(self.recognizer.PartialResult())
-                return partial.get('partial', '').strip()
-                
-        except Exception as e:
-            logger.error(f"Vosk recognition error: {e}")
-            return None
+                recognizer.Reset()
+        # Reset the free-form recognizer on the worker, after any chunks still queued for it
+        free = self._worker.submit(self._free_stream, sample_rate).result()
+        return GrammarVoskStream(VoskStream(recognizer), free, self._worker, self.min_confidence)
+        
+    def _free_stream(self, sample_rate: int) -> VoskStream:
+        import vosk
+        with self._lock:
+            recognizer = self._recognizers.get(sample_rate)
+            if recognizer is None:
+                recognizer = vosk.KaldiRecognizer(self.model, sample_rate)
+                recognizer.SetWords(True)
+                self._recognizers[sample_rate] = recognizer
+            else:
+                # Drop any state left over from the previous utterance
+                recognizer.Reset()
+        return VoskStream(recognizer)
+        
+    def _drop_grammar_recognizers(self):
+        """Phrase table changed: build grammar recognizers from the new vocabulary on next use"""
+        with self._lock:
+            self._grammar_recognizers = {}
+            
+    def recognize(self, audio_data, profile: str = "command") -> Optional[str]:
+        return self.recognize_scored(audio_data, profile)[0]
+        
+    def recognize_scored(self, audio_data, profile: str = "command") -> Tuple[Optional[str], Optional[float]]:
+        """Decode a complete utterance by streaming its raw PCM in one go"""
+        session = self.stream(audio_data.sample_rate)
+        if session is None:
+            return None, None
+        # Raw frames only: get_wav_data() would feed the RIFF header to the decoder
+        samples = audio_data_to_int16(audio_data)
+        session.accept(samples)
+        text = session.finish()
+        return text, session.confidence if text else None
             
     def is_available(self) -> bool:
         try:
@@ -144,18 +369,112 @@ class VoskSTT(STTEngine):
             return False
 
 
-class WhisperSTT(STTEngine):
+def strip_wake_word(text: Optional[str], keyword: str) -> Optional[str]:
+    """Drop a leading wake word, e.g. from "jarvis, open chrome" keep "open chrome"."""
+    if not text:
+        return text
+    words = text.split()
+    if words and words[0].strip(",.!?").lower() == keyword.lower():
+        words = words[1:]
+    return " ".join(words) or None
+
+
+# Whisper decoding settings per listening context
+DECODING_PROFILES = {
+    # 1-3 s commands from a closed vocabulary: one greedy pass, no temperature
+    # fallback, language fixed or detected once, prompt biased towards COMMANDS
+    "command": {"beam_size": 1, "temperature": 0.0, "command_prompt": True,
+                "fixed_language": True, "condition_on_previous_text": False, "without_timestamps": True},
+    # Free-form answers: beam search, the usual fallback ladder, language detected per utterance
+    "dictation": {"beam_size": None, "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0), "command_prompt": False,
+                  "fixed_language": False, "condition_on_previous_text": True, "without_timestamps": False},
+}
+# Whisper keeps at most 223 prompt tokens; stay well inside that
+PROMPT_MAX_CHARS = 600
+
+_command_prompt = None
+
+
+def command_prompt() -> str:
+    """Whisper ``initial_prompt`` listing command phrases and app names.
+
+    The first phrase of every action comes first, then app names, then the
+    remaining phrases, until PROMPT_MAX_CHARS. Rebuilt when COMMANDS changes.
+    """
+    global _command_prompt
+    if _command_prompt is None:
+        primary = [phrases[0] for phrases in COMMANDS.values() if phrases]
+        rest = [phrase for phrases in COMMANDS.values() for phrase in phrases[1:]]
+        words, seen, length = [], set(), len("Jarvis, .")
+        for phrase in primary + KNOWN_APPS + rest:
+            if phrase in seen:
+                continue
+            if length + len(phrase) + 2 > PROMPT_MAX_CHARS:
+                break
+            seen.add(phrase)
+            words.append(phrase)
+            length += len(phrase) + 2
+        _command_prompt = "Jarvis, " + ", ".join(words) + "."
+    return _command_prompt
+
+
+def _reset_phrase_vocabulary():
+    global _command_prompt, _vosk_grammar
+    _command_prompt = None
+    _vosk_grammar = None
+
+
+add_phrase_listener(_reset_phrase_vocabulary)
+
+
+class WhisperEngine(STTEngine):
+    """Shared decoding-profile handling for the Whisper engines"""
+    
+    def __init__(self, name: str):
+        super().__init__(name)
+        # Configured language, or the one detected on the first command
+        self.language = get_whisper_language() or None
+        
+    def decode_options(self, profile: str) -> Dict[str, Any]:
+        """Engine-neutral options for ``profile``; beam_size None means the dictation beam"""
+        settings = DECODING_PROFILES.get(profile, DECODING_PROFILES["command"])
+        return {
+            "beam_size": settings["beam_size"] or get_dictation_beam_size(),
+            "temperature": settings["temperature"],
+            "initial_prompt": command_prompt() if settings["command_prompt"] else None,
+            "language": self.language if settings["fixed_language"] else None,
+            "condition_on_previous_text": settings["condition_on_previous_text"],
+            "without_timestamps": settings["without_timestamps"],
+        }
+        
+    @staticmethod
+    def segment_confidence(avg_logprobs: List[float]) -> Optional[float]:
+        """Probability-scale confidence from the segments' mean token log-probabilities"""
+        return float(np.exp(np.mean(avg_logprobs))) if avg_logprobs else None
+        
+    def recognize(self, audio_data, profile: str = "command") -> Optional[str]:
+        return self.recognize_scored(audio_data, profile)[0]
+        
+    def remember_language(self, language: Optional[str], text: Optional[str]):
+        """Pin the language detected on the first utterance that produced text"""
+        if self.language is None and language and text:
+            self.language = language
+            logger.info(f"Whisper language detected: {language}")
+
+
+class WhisperSTT(WhisperEngine):
     """Whisper offline Speech Recognition engine"""
     
     def __init__(self):
         super().__init__("whisper")
         self.model = None
+        # Base model (smaller, faster)
+        self.model_size = "base"
         
     def load_model(self):
         try:
             import whisper
-            # Load base model (smaller, faster)
-            self.model = whisper.load_model("base")
+            self.model = whisper.load_model(self.model_size)
             logger.info("Whisper model loaded successfully")
             return True
             
@@ -166,32 +485,25 @@ class WhisperSTT(STTEngine):
             logger.error(f"Error loading Whisper model: {e}")
             return False
             
-    def recognize(self, audio_data) -> Optional[str]:
+    def recognize_scored(self, audio_data, profile: str = "command") -> Tuple[Optional[str], Optional[float]]:
         if not self.model:
-            return None
+            return None, None
             
         try:
-            import whisper
-            import tempfile
-            import wave
-            
-            # Save audio to temporary file
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                with wave.open(temp_file.name, 'wb') as wav_file:
-                    wav_file.setnchannels(1)
-                    wav_file.setsampwidth(2)
-                    wav_file.setframerate(16000)
-                    wav_file.writeframes(audio_data.get_wav_data())
-                
-                # Transcribe with Whisper
-                result = self.model.transcribe(temp_file.name)
-                os.unlink(temp_file.name)
-                
-                return result["text"].strip()
+            options = self.decode_options(profile)
+            beam_size = options.pop("beam_size")
+            if beam_size > 1:
+                options.update(beam_size=beam_size, best_of=beam_size)
+            # Hand Whisper the samples directly: no WAV encode, temp file or ffmpeg decode
+            result = self.model.transcribe(audio_data_to_float32(audio_data, self.sample_rate), fp16=False, **options)
+            text = result["text"].strip()
+            self.remember_language(result.get("language"), text)
+            return text, self.segment_confidence([seg["avg_logprob"] for seg in result.get("segments", [])
+                                                  if "avg_logprob" in seg])
                 
         except Exception as e:
             logger.error(f"Whisper recognition error: {e}")
-            return None
+            return None, None
             
     def is_available(self) -> bool:
         try:
@@ -201,6 +513,267 @@ class WhisperSTT(STTEngine):
             return False
 
 
+class FasterWhisperSTT(WhisperEngine):
+    """Whisper on CTranslate2 (faster-whisper) with int8 weights, tuned for CPU-only machines"""
+    
+    def __init__(self, model_size: Optional[str] = None, compute_type: Optional[str] = None,
+                 cpu_threads: Optional[int] = None):
+        super().__init__("faster_whisper")
+        self.model = None
+        self.model_size = model_size or get_faster_whisper_model()
+        self.compute_type = compute_type or get_faster_whisper_compute_type()
+        self.cpu_threads = get_faster_whisper_threads() if cpu_threads is None else cpu_threads
+        
+    def load_model(self):
+        try:
+            from faster_whisper import WhisperModel
+            self.model = WhisperModel(
+                self.model_size,
+                device="cpu",
+                compute_type=self.compute_type,
+                cpu_threads=self.cpu_threads,
+            )
+            logger.info(f"faster-whisper model loaded: {self.model_size} ({self.compute_type}, "
+                        f"{self.cpu_threads or 'auto'} threads)")
+            return True
+            
+        except ImportError:
+            logger.error("faster-whisper not installed. Install with: pip install faster-whisper")
+            return False
+        except Exception as e:
+            logger.error(f"Error loading faster-whisper model: {e}")
+            return False
+            
+    def recognize_scored(self, audio_data, profile: str = "command") -> Tuple[Optional[str], Optional[float]]:
+        if not self.model:
+            return None, None
+            
+        try:
+            options = self.decode_options(profile)
+            segments, info = self.model.transcribe(audio_data_to_float32(audio_data, self.sample_rate),
+                                                   best_of=options["beam_size"], **options)
+            # Segments are decoded lazily as the generator is consumed
+            segments = list(segments)
+            text = " ".join(segment.text.strip() for segment in segments).strip()
+            self.remember_language(info.language, text)
+            return text, self.segment_confidence([segment.avg_logprob for segment in segments])
+                
+        except Exception as e:
+            logger.error(f"faster-whisper recognition error: {e}")
+            return None, None
+            
+    def is_available(self) -> bool:
+        try:
+            import faster_whisper
+            return True
+        except ImportError:
+            return False
+
+
+class CircuitBreaker:
+    """Stops using an engine after ``max_failures`` failures in a row.
+
+    Once open, the engine is skipped for ``cooldown`` seconds; then one
+    request is let through, and its outcome closes the breaker or re-opens it.
+    """
+    
+    def __init__(self, max_failures: int, cooldown: float):
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+        
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+        
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.cooldown:
+                # Half-open: the next outcome decides; until then keep the gate shut
+                self.opened_at = time.monotonic()
+                return True
+            return False
+            
+    def record(self, ok: bool):
+        with self._lock:
+            if ok:
+                self.failures = 0
+                self.opened_at = None
+            else:
+                self.failures += 1
+                if self.failures >= self.max_failures:
+                    self.opened_at = time.monotonic()
+
+
+class EngineStats:
+    """Win count, failures and recent latencies of one engine in a hedged race"""
+    
+    def __init__(self, window: int = 200):
+        self.attempts = 0
+        self.wins = 0
+        self.failures = 0
+        self.latencies = deque(maxlen=window)
+        
+    def summary(self) -> Dict[str, Any]:
+        latencies = np.array(self.latencies) if self.latencies else None
+        return {
+            "attempts": self.attempts,
+            "wins": self.wins,
+            "win_rate": round(self.wins / self.attempts, 3) if self.attempts else 0.0,
+            "failures": self.failures,
+            "p50_ms": round(float(np.percentile(latencies, 50)) * 1000) if latencies is not None else None,
+            "p95_ms": round(float(np.percentile(latencies, 95)) * 1000) if latencies is not None else None,
+        }
+
+
+class HedgedSTT(STTEngine):
+    """Google and a local engine decoding the same audio at once; the first good answer wins.
+
+    A result wins when it has text and a confidence of at least
+    ``min_confidence`` (engines that report none always qualify). Once the
+    latency budget is spent, the most confident result so far is used, or
+    else whichever engine finishes next. The losing request is cancelled if
+    it hasn't started; one already running can't be interrupted, so its
+    result is dropped when it arrives but still counts towards the
+    statistics and the circuit breaker. An engine that errors or overruns
+    the budget ``max_failures`` times in a row is skipped for a cooldown.
+
+    Each engine has its own workers. Engines that aren't ``thread_safe``
+    get exactly one, so the next command's decode waits for a still-running
+    loser instead of sharing its decoder; Google gets two, so a slow
+    request can't hold up the next one.
+    """
+    
+    def __init__(self, local: Optional[str] = None, budget: Optional[float] = None,
+                 min_confidence: Optional[float] = None):
+        super().__init__("hedged")
+        local_name = (local or get_hedge_local_engine()).lower()
+        if local_name not in STT_ENGINES or local_name in ("google", "hedged"):
+            logger.warning(f"Unknown local engine for hedged STT: {local_name}, using vosk")
+            local_name = "vosk"
+        self.google = GoogleSTT()
+        self.local = STT_ENGINES[local_name]()
+        self.engines = [self.google, self.local]
+        self.budget = get_hedge_budget_seconds() if budget is None else budget
+        self.min_confidence = get_hedge_min_confidence() if min_confidence is None else min_confidence
+        # A hung request must not tie up a worker for good
+        self.google.recognizer.operation_timeout = max(self.budget * 2, 5)
+        self.sample_rate = self.local.sample_rate
+        self.stats = {engine.name: EngineStats() for engine in self.engines}
+        self.breakers = {engine.name: CircuitBreaker(get_hedge_breaker_failures(), get_hedge_breaker_seconds())
+                         for engine in self.engines}
+        self._stats_lock = threading.Lock()
+        self._pools = {engine.name: ThreadPoolExecutor(max_workers=2 if engine.thread_safe else 1,
+                                                       thread_name_prefix=f"stt-hedge-{engine.name}")
+                       for engine in self.engines}
+        
+    def load_model(self):
+        loaded = self.local.load_model()
+        self.sample_rate = self.local.sample_rate
+        if not loaded:
+            logger.warning(f"Hedged STT: {self.local.name} unavailable, Google only")
+        return True
+        
+    def recognize(self, audio_data, profile: str = "command") -> Optional[str]:
+        return self.recognize_scored(audio_data, profile)[0]
+        
+    def recognize_scored(self, audio_data, profile: str = "command") -> Tuple[Optional[str], Optional[float]]:
+        engines = [engine for engine in self.engines
+                   if engine.model is not None or isinstance(engine, GoogleSTT)]
+        allowed = [engine for engine in engines if self.breakers[engine.name].allow()]
+        # With every breaker open, trying anyway beats certainly returning nothing
+        engines = allowed or engines
+        start = time.monotonic()
+        futures = {}
+        for engine in engines:
+            future = self._pools[engine.name].submit(engine.recognize_scored, audio_data, profile)
+            future.add_done_callback(partial(self._record, engine.name, start))
+            futures[future] = engine
+        pending = set(futures)
+        best = None
+        while pending:
+            remaining = start + self.budget - time.monotonic()
+            # Past the budget: settle for the best so far, or else the next engine to finish
+            if remaining <= 0 and best is not None:
+                break
+            done, pending = wait(pending, timeout=remaining if remaining > 0 else None,
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    continue
+                text, confidence = future.result()
+                if not text:
+                    continue
+                if confidence is None or confidence >= self.min_confidence:
+                    best = (text, confidence, futures[future])
+                    pending = set()
+                    break
+                if best is None or confidence > best[1]:
+                    best = (text, confidence, futures[future])
+        for future in futures:
+            future.cancel()
+        if best is None:
+            return None, None
+        text, confidence, winner = best
+        with self._stats_lock:
+            self.stats[winner.name].wins += 1
+        conf = f"{confidence:.2f}" if confidence is not None else "n/a"
+        logger.info(f"Hedged STT: {winner.name} won in {time.monotonic() - start:.2f} s (confidence {conf})")
+        return text, confidence
+        
+    def _record(self, name: str, start: float, future: Future):
+        """Latency, failures and breaker state for every request, including the ones that lost"""
+        elapsed = time.monotonic() - start
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logger.warning(f"Hedged STT: {name} failed: {error}")
+        failed = error is not None or elapsed > self.budget
+        with self._stats_lock:
+            stats = self.stats[name]
+            stats.attempts += 1
+            stats.latencies.append(elapsed)
+            stats.failures += failed
+        was_open = self.breakers[name].is_open
+        self.breakers[name].record(not failed)
+        if self.breakers[name].is_open and not was_open:
+            logger.warning(f"Hedged STT: {name} failed {self.breakers[name].failures} times in a row; "
+                           f"pausing it for {self.breakers[name].cooldown:.0f} s")
+            
+    def statistics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-engine win rate, failures and latency percentiles since startup"""
+        with self._stats_lock:
+            return {name: dict(stats.summary(), breaker_open=self.breakers[name].is_open)
+                    for name, stats in self.stats.items()}
+            
+    def is_available(self) -> bool:
+        return True
+
+
+# Engines selectable through STT_ENGINE
+STT_ENGINES = {
+    "google": GoogleSTT,
+    "vosk": VoskSTT,
+    "whisper": WhisperSTT,
+    "faster_whisper": FasterWhisperSTT,
+    "hedged": HedgedSTT,
+}
+
+
+def create_stt_engine(name: str) -> STTEngine:
+    """Instantiate the engine registered as ``name`` (model not loaded yet)"""
+    engine_class = STT_ENGINES.get(name.lower())
+    if engine_class is None:
+        logger.warning(f"Unknown STT engine: {name}, falling back to Google")
+        engine_class = GoogleSTT
+    return engine_class()
+
+
 def _get_tts_engine():
     """Get thread-safe TTS engine singleton"""
     global _engine_singleton
@@ -217,83 +790,103 @@ def _get_tts_engine():
 
 
 class MicrophoneManager:
-    """Manages microphone selection and quality assessment"""
+    """Microphone selection and quality assessment on top of the shared device registry"""
     
-    def __init__(self):
-        self.microphones = []
+    def __init__(self, registry: Optional[DeviceRegistry] = None):
+        self.registry = registry or get_registry()
         self.quality_scores = {}
         self.selected_index = None
+        self._selected_key = None
+        # Best device by measured quality, kept until the device set changes
+        self._best_index = None
+        self._best_key = None
+        self.registry.add_listener(self._on_devices_changed)
+        
+    @property
+    def microphones(self) -> List[str]:
+        return self.registry.names()
         
     def discover_microphones(self) -> List[str]:
-        """Discover and assess available microphones"""
-        try:
-            # Try using sounddevice first (compatible with Python 3.14)
-            try:
-                import sounddevice as sd
-                devices = sd.query_devices()
-                self.microphones = []
-                
-                for i, device in enumerate(devices):
-                    # Only include input devices (microphones)
-                    if device['max_input_channels'] > 0:
-                        self.microphones.append(device['name'])
-                
-                logger.info(f"Found {len(self.microphones)} microphones using sounddevice")
-                return self.microphones
-                
-            except ImportError:
-                logger.warning("sounddevice not available, falling back to PyAudio")
-                # Fallback to PyAudio if sounddevice is not available
-                self.microphones = sr.Microphone.list_microphone_names()
-                logger.info(f"Found {len(self.microphones)} microphones using PyAudio")
-                return self.microphones
-                
-        except Exception as e:
-            logger.error(f"Error discovering microphones: {e}")
-            return []
-            
-    def assess_microphone_quality(self, index: int) -> float:
-        """Assess microphone quality by testing audio levels"""
-        try:
-            # Simplified: just check if microphone exists
-            mic = sr.Microphone(device_index=index)
-            # Return default score without testing
-            return 0.5
-        except Exception as e:
-            logger.error(f"Error assessing microphone {index}: {e}")
-            return 0.0
+        """Names of the available input devices (cached by the registry)"""
+        return self.registry.names()
             
-    def get_best_microphone(self) -> int:
-        """Get the index of the best available microphone"""
-        if not self.microphones:
-            self.discover_microphones()
+    def assess_microphone_quality(self, index: int, force: bool = False) -> float:
+        """Measured quality score (0..1) for one microphone, from the saved scores when known"""
+        score = score_microphones([index], force=force).get(index, 0.0)
+        self.quality_scores[index] = score
+        return score
             
-        if not self.microphones:
+    def get_best_microphone(self) -> Optional[int]:
+        """Get the device index of the best available microphone"""
+        devices = self.registry.devices()
+        if not devices:
             return None
             
-        best_index = 0
-        best_score = 0
+        # Skip output devices (they usually contain "output" in the name)
+        candidates = [d for d in devices
+                      if "output" not in d.name.lower() and "speaker" not in d.name.lower()] or devices
+        # New devices are probed together in one short capture; known ones reuse their saved score
+        self.quality_scores.update(score_microphones([d.index for d in candidates]))
+        best = max(candidates, key=lambda d: self.quality_scores.get(d.index, 0.0))
+        logger.info(f"Selected microphone {best.index}: {best.name} "
+                    f"(score: {self.quality_scores.get(best.index, 0.0):.2f})")
+        return best.index
         
-        for i, mic_name in enumerate(self.microphones):
-            # Skip output devices (they usually contain "output" in the name)
-            if "output" in mic_name.lower() or "speaker" in mic_name.lower():
-                continue
-                
-            score = self.assess_microphone_quality(i)
-            if score > best_score:
-                best_score = score
-                best_index = i
-                
-        logger.info(f"Selected microphone {best_index}: {self.microphones[best_index]} (score: {best_score:.2f})")
-        return best_index
+    def current_index(self) -> Optional[int]:
+        """The selected microphone, else the best one (chosen once, until the devices change)"""
+        if self.selected_index is None and _selected_mic_index is not None:
+            # Chosen with set_mic_index while this recognizer was still being built
+            self.set_microphone(_selected_mic_index)
+        if self.selected_index is not None:
+            return self.selected_index
+        if self._best_index is None:
+            self._best_index = self.get_best_microphone()
+            device = self.registry.get(self._best_index) if self._best_index is not None else None
+            self._best_key = device.key if device is not None else None
+        return self._best_index
+        
+    def _active(self) -> tuple:
+        """(index, key) of the microphone capture is using, (None, None) before one is chosen"""
+        if self.selected_index is not None:
+            return self.selected_index, self._selected_key
+        return self._best_index, self._best_key
         
     def set_microphone(self, index: int):
-        """Set the selected microphone"""
-        if 0 <= index < len(self.microphones):
-            self.selected_index = index
-            global _selected_mic_index
-            _selected_mic_index = index
-            logger.info(f"Microphone set to index {index}: {self.microphones[index]}")
+        """Set the selected microphone by device index"""
+        device = self.registry.get(index)
+        if device is None:
+            logger.warning(f"No input device with index {index}")
+            return
+        previous = self._active()
+        self.selected_index = index
+        self._selected_key = device.key
+        if previous != (index, device.key):
+            # Release the old device's persistent stream; the next listen opens the new one
+            stop_capture_services()
+        global _selected_mic_index
+        _selected_mic_index = index
+        logger.info(f"Microphone set to index {index}: {device.name}")
+        
+    def _on_devices_changed(self, devices):
+        """Re-resolve the selection by name, since indices shift when devices come and go"""
+        global _selected_mic_index
+        previous = self._active()
+        self._best_index = self._best_key = None
+        if self._selected_key is not None:
+            match = next((d for d in devices if d.key == self._selected_key), None)
+            if match is None:
+                logger.warning(f"Selected microphone {self._selected_key} is gone; picking the best available")
+                self.selected_index = self._selected_key = None
+            else:
+                self.selected_index = match.index
+            _selected_mic_index = self.selected_index
+        if previous == (None, None):
+            return
+        if self.selected_index is None:
+            self.current_index()
+        # Streams on a microphone that is still there, at the same index, keep running
+        if self._active() != previous:
+            stop_capture_services()
 
 
 class SpeechRecognizer:
@@ -305,6 +898,10 @@ class SpeechRecognizer:
         self.wake_word_detector = None
         self.is_listening = False
         self.status_callback = None
+        # An audio_source.AudioSource to listen to instead of the microphone
+        self.source = None
+        # Device key of the microphone the audio being transcribed came from, for its noise profile
+        self._noise_key = None
         
         # Load STT engine
         self._load_stt_engine()
@@ -315,33 +912,42 @@ class SpeechRecognizer:
             
     def _load_stt_engine(self):
         """Load the configured STT engine"""
-        engine_name = get_stt_engine().lower()
-        
-        if engine_name == "google":
-            self.stt_engine = GoogleSTT()
-        elif engine_name == "vosk":
-            self.stt_engine = VoskSTT()
-        elif engine_name == "whisper":
-            self.stt_engine = WhisperSTT()
-        else:
-            logger.warning(f"Unknown STT engine: {engine_name}, falling back to Google")
-            self.stt_engine = GoogleSTT()
+        self.stt_engine = create_stt_engine(get_stt_engine())
             
         # Load model if needed
         if hasattr(self.stt_engine, 'load_model'):
             self.stt_engine.load_model()
             
-        logger.info(f"STT engine loaded: {self.stt_engine.name}")
+        # Built after load_model(): a Vosk model only reports its rate once loaded
+        self.preprocessor = Preprocessor(get_preprocess_stages(), self.stt_engine.sample_rate)
+        # One recognizer for the per-command microphone path, so what it learns carries over
+        self._recognizer = self.stt_engine.recognizer if isinstance(self.stt_engine, GoogleSTT) else sr.Recognizer()
+        self._configure_recognizer(self._recognizer)
+        logger.info(f"STT engine loaded: {self.stt_engine.name}"
+                    f" (preprocessing: {', '.join(self.preprocessor.stages) or 'off'})")
+        
+    def warm_up(self, seconds: float = 0.5):
+        """Run one inference on silence so the first real command doesn't pay one-off costs"""
+        # Only the local half of a hedged pair; warming up Google would just send a request
+        engine = self.stt_engine.local if isinstance(self.stt_engine, HedgedSTT) else self.stt_engine
+        if engine is None or isinstance(engine, GoogleSTT):
+            return
+        start = time.perf_counter()
+        # Whatever the model makes of silence must not pin the command language
+        language = getattr(engine, "language", None)
+        try:
+            rate = engine.sample_rate
+            engine.recognize(sr.AudioData(bytes(int(rate * seconds) * 2), rate, 2))
+        except Exception as e:
+            logger.warning(f"STT warm-up failed: {e}")
+        if hasattr(engine, "language"):
+            engine.language = language
+        logger.info(f"STT warm-up on {engine.name} took {time.perf_counter() - start:.2f} s")
         
     def _init_wake_word_detection(self):
         """Initialize wake word detection"""
         try:
-            from wake_word import WakeWordDetector
-            self.wake_word_detector = WakeWordDetector(
-                keyword="jarvis",
-                sensitivity=0.7,
-                callback=self._on_wake_word_detected
-            )
+            self.wake_word_detector = self.create_wake_word_detector(self._on_wake_word_detected)
             logger.info("Wake word detection initialized")
         except Exception as e:
             logger.error(f"Error initializing wake word detection: {e}")
@@ -353,7 +959,7 @@ class SpeechRecognizer:
         self._update_status("Wake word detected! Listening...")
         
         # Start listening for command
-        command = self.listen_for_command()
+        command = self.listen_after_wake_word(self.wake_word_detector)
         if command:
             self._update_status("Command received")
             return command
@@ -361,6 +967,63 @@ class SpeechRecognizer:
             self._update_status("No command detected")
             return None
             
+    def create_wake_word_detector(self, callback: Callable, keyword: str = "jarvis", sensitivity: float = 0.7):
+        """A wake word detector on the same capture stream that command listening reads.
+
+        Falls back to the detector opening the microphone itself when there is
+        no persistent stream, or when it runs at a rate Porcupine can't take.
+        """
+        from wake_word import WakeWordDetector
+        mic_index = self.mic_manager.current_index()
+        service = self._wake_capture_service() if get_persistent_capture() and mic_index is not None else None
+        if service is not None:
+            source = service.source(reopen=self._wake_capture_service)
+            try:
+                return WakeWordDetector(keyword=keyword, sensitivity=sensitivity, callback=callback,
+                                        source=source)
+            except ValueError as e:
+                source.stop()
+                logger.warning(f"Wake word detector can't share the capture stream ({e}); opening its own")
+        return WakeWordDetector(keyword=keyword, sensitivity=sensitivity, callback=callback, device_index=mic_index)
+        
+    def _wake_capture_service(self):
+        """Capture service for the current microphone, also used to reopen the wake word stream.
+
+        Its stream closes when another microphone is selected or a device
+        rescan releases it; asking the registry first waits out a rescan in
+        progress, and re-resolves the microphone, before opening the new one.
+        """
+        self.mic_manager.registry.devices()
+        mic_index = self.mic_manager.current_index()
+        service = get_capture_service(mic_index) if mic_index is not None else None
+        if service is not None:
+            track_noise(service, self._device_key(mic_index))
+        return service
+        
+    def listen_after_wake_word(self, detector) -> Optional[str]:
+        """The command spoken after the wake word, in the same breath or after a pause.
+
+        With a shared stream, capture starts WAKE_PRE_ROLL_SECONDS before the
+        point where the keyword was detected, so words spoken while Porcupine
+        was still deciding are kept; a keyword caught by that pre-roll is
+        dropped from the transcript.
+        """
+        source = detector.source if detector is not None else None
+        if not isinstance(source, RingSource) or not source.service.running:
+            return self.listen_for_command()
+        service = source.service
+        self._noise_key = self._device_key(service.device_index)
+        noise = track_noise(service, self._noise_key)
+        command = self._listen_from(partial(service.capture_utterance, start=source.position),
+                                    service.sample_rate, get_listening_timeout(), get_phrase_time_limit(),
+                                    noise_db=noise.noise_db, pre_roll=get_wake_pre_roll_seconds())
+        return strip_wake_word(command, detector.keyword)
+        
+    def _device_key(self, index: int) -> str:
+        """Stable key of input device ``index`` for its noise profile"""
+        device = self.mic_manager.registry.get(index)
+        return device.key if device is not None else f"device {index}"
+        
     def _update_status(self, status: str):
         """Update status and notify callback"""
         logger.info(f"Status: {status}")
@@ -371,19 +1034,41 @@ class SpeechRecognizer:
         """Set status update callback"""
         self.status_callback = callback
         
-    def listen_for_command(self, timeout: Optional[int] = None, phrase_time_limit: Optional[int] = None) -> Optional[str]:
-        """Listen for a voice command and return transcribed text"""
+    def listen_for_command(self, timeout: Optional[int] = None, phrase_time_limit: Optional[int] = None,
+                           profile: str = "command", source=None) -> Optional[str]:
+        """Listen for a voice command and return transcribed text.
+
+        ``profile`` picks the Whisper decoding settings: "command" for short
+        commands, "dictation" for free-form answers. ``source`` (an
+        ``audio_source.AudioSource``, defaulting to the one set with
+        ``set_audio_source``) replaces the microphone.
+        """
         if timeout is None:
             timeout = get_listening_timeout()
         if phrase_time_limit is None:
             phrase_time_limit = get_phrase_time_limit()
             
+        source = source or self.source
+        if source is not None:
+            self._noise_key = None
+            return self._listen_from(partial(capture_from_source, source), source.sample_rate,
+                                     timeout, phrase_time_limit, profile)
+            
         # Get microphone
-        mic_index = self.mic_manager.selected_index or self.mic_manager.get_best_microphone()
+        mic_index = self.mic_manager.current_index()
         if mic_index is None:
             self._update_status("No microphone available")
             return None
             
+        self._noise_key = self._device_key(mic_index)
+        if get_persistent_capture():
+            service = get_capture_service(mic_index)
+            if service is not None:
+                noise = track_noise(service, self._noise_key)
+                return self._listen_from(service.capture_utterance, service.sample_rate,
+                                         timeout, phrase_time_limit, profile, noise.noise_db)
+            logger.warning("Persistent capture unavailable, opening the microphone per command")
+
         try:
             mic = sr.Microphone(device_index=mic_index)
         except Exception as e:
@@ -391,16 +1076,10 @@ class SpeechRecognizer:
             self._update_status("Microphone error")
             return None
             
-        # Use appropriate recognizer based on engine
-        if isinstance(self.stt_engine, GoogleSTT):
-            recognizer = self.stt_engine.recognizer
-        else:
-            recognizer = sr.Recognizer()
-            
+        recognizer = self._recognizer
         with mic as source:
             try:
-                # Dynamic threshold adjustment
-                self._adjust_thresholds(recognizer, source)
+                self._apply_noise_profile(recognizer, source)
                 
                 self._update_status("Listening...")
                 self.is_listening = True
@@ -411,69 +1090,137 @@ class SpeechRecognizer:
                     timeout=timeout, 
                     phrase_time_limit=phrase_time_limit
                 )
-                
-                self._update_status("Processing...")
-                self.is_listening = False
-                
-                # Recognize speech
-                if isinstance(self.stt_engine, GoogleSTT):
-                    command = recognizer.recognize_google(audio)
-                else:
-                    command = self.stt_engine.recognize(audio)
-                    
-                if command:
-                    command = command.lower().strip()
-                    logger.info(f"Recognized: {command}")
-                    self._update_status("Command recognized")
-                    return command
-                else:
-                    self._update_status("No speech detected")
-                    return None
-                    
             except sr.WaitTimeoutError:
                 self.is_listening = False
                 self._update_status("Listening timeout")
                 return None
-            except sr.UnknownValueError:
-                self.is_listening = False
-                self._update_status("Speech not understood")
-                return None
-            except sr.RequestError as e:
-                self.is_listening = False
-                logger.error(f"STT service error: {e}")
-                self._update_status("STT service unavailable")
-                return None
             except Exception as e:
                 self.is_listening = False
                 logger.error(f"Recognition error: {e}")
                 self._update_status("Recognition error")
                 return None
                 
-    def _adjust_thresholds(self, recognizer: sr.Recognizer, source: sr.Microphone):
-        """Dynamically adjust recognition thresholds based on ambient noise"""
+        self.is_listening = False
+        # The silence around the command keeps the profile current without a background stream
+        get_noise_profiles().update(self._noise_key, audio_data_to_int16(audio), audio.sample_rate)
+        return self._transcribe(audio, profile)
+
+    def _listen_from(self, capture: Callable, sample_rate: int, timeout: int, phrase_time_limit: int,
+                     profile: str = "command", noise_db: Optional[float] = None,
+                     pre_roll: Optional[float] = None) -> Optional[str]:
+        """VAD-endpointed capture (always-open stream or an AudioSource), then STT.
+
+        ``capture`` is ``CaptureService.capture_utterance`` or
+        ``capture_from_source`` bound to a source; ``noise_db`` is the
+        device's tracked noise floor, if any, and ``pre_roll`` defaults to
+        PRE_ROLL_SECONDS.
+        """
+        self._update_status("Listening...")
+        self.is_listening = True
+        vad = VoiceActivityDetector.from_profile(get_vad_profile(), sample_rate=sample_rate)
+        # Gain and gating need the whole utterance, so with them on the engine decodes it afterwards
+        streaming = self.stt_engine.supports_streaming and not self.preprocessor.utterance_level
+        session = self.stt_engine.stream(sample_rate) if streaming else None
+        on_chunk = None
+        if session is not None:
+            def on_chunk(chunk):
+                partial = session.accept(chunk)
+                if partial:
+                    self._update_status(f"Hearing: {partial}")
         try:
-            # Adjust for ambient noise
-            recognizer.adjust_for_ambient_noise(source, duration=0.5)
-            
-            # Set dynamic thresholds
-            recognizer.energy_threshold = max(300, recognizer.energy_threshold * 0.8)
-            recognizer.dynamic_energy_threshold = True
-            recognizer.dynamic_energy_adjustment_damping = 0.15
-            recognizer.dynamic_energy_ratio = 1.5
-            recognizer.pause_threshold = 0.8
-            
-            logger.debug(f"Adjusted thresholds - Energy: {recognizer.energy_threshold}, Pause: {recognizer.pause_threshold}")
-            
+            samples = capture(timeout=timeout, phrase_time_limit=phrase_time_limit,
+                              pre_roll=get_pre_roll_seconds() if pre_roll is None else pre_roll,
+                              vad=vad, on_chunk=on_chunk, noise_db=noise_db)
+        except Exception as e:
+            logger.error(f"Capture error: {e}")
+            self._update_status("Recognition error")
+            return None
+        finally:
+            self.is_listening = False
+        if samples is None:
+            self._update_status("Listening timeout")
+            return None
+        if session is not None:
+            # The decoder has already seen every frame; only the final flush is left
+            command = session.finish()
+            if command is not None:
+                return self._accept_transcript(command)
+        return self._transcribe(pcm16_audio_data(samples, sample_rate), profile)
+
+    def _transcribe(self, audio: sr.AudioData, profile: str = "command") -> Optional[str]:
+        """Run the configured STT engine on captured audio"""
+        self._update_status("Processing...")
+        try:
+            audio = self._preprocess(audio)
+            if isinstance(self.stt_engine, GoogleSTT):
+                command = self.stt_engine.recognizer.recognize_google(audio)
+            else:
+                command = self.stt_engine.recognize(audio, profile)
+            return self._accept_transcript(command)
+        except sr.UnknownValueError:
+            self._update_status("Speech not understood")
+            return None
+        except sr.RequestError as e:
+            logger.error(f"STT service error: {e}")
+            self._update_status("STT service unavailable")
+            return None
+        except Exception as e:
+            logger.error(f"Recognition error: {e}")
+            self._update_status("Recognition error")
+            return None
+                
+    def _preprocess(self, audio: sr.AudioData) -> sr.AudioData:
+        """Apply the enabled preprocessing stages, resampling to the engine's rate"""
+        if not self.preprocessor.enabled:
+            return audio
+        samples = audio_data_to_int16(audio)
+        noise = None
+        if self._noise_key is not None and "gate" in self.preprocessor.stages:
+            rate = self.preprocessor.target_rate if "resample" in self.preprocessor.stages else audio.sample_rate
+            noise = get_noise_profiles().get(self._noise_key).spectrum_at(rate)
+        samples, rate = self.preprocessor.process(samples, audio.sample_rate, noise)
+        return pcm16_audio_data(samples, rate)
+        
+    def _accept_transcript(self, command: Optional[str]) -> Optional[str]:
+        global _first_command_logged
+        if command:
+            command = command.lower().strip()
+            logger.info(f"Recognized: {command}")
+            if not _first_command_logged:
+                _first_command_logged = True
+                logger.info(f"Time to first command: {time.monotonic() - _STARTED_AT:.2f} s after startup")
+            self._update_status("Command recognized")
+            return command
+        self._update_status("No speech detected")
+        return None
+                
+    def _configure_recognizer(self, recognizer: sr.Recognizer):
+        """Endpointing settings for the per-command microphone path, set once"""
+        recognizer.dynamic_energy_threshold = True
+        recognizer.dynamic_energy_adjustment_damping = 0.15
+        recognizer.dynamic_energy_ratio = 1.5
+        recognizer.pause_threshold = 0.8
+        
+    def _apply_noise_profile(self, recognizer: sr.Recognizer, source: sr.Microphone):
+        """Start from the device's tracked noise floor; calibrate only the first time a device is used"""
+        noise = get_noise_profiles().get(self._noise_key)
+        try:
+            if noise.known:
+                recognizer.energy_threshold = noise.energy_threshold()
+            else:
+                recognizer.adjust_for_ambient_noise(source, duration=0.5)
+                recognizer.energy_threshold = max(300, recognizer.energy_threshold * 0.8)
+            logger.debug(f"Energy threshold for {self._noise_key}: {recognizer.energy_threshold:.0f}")
         except Exception as e:
             logger.error(f"Error adjusting thresholds: {e}")
             
-    def start_wake_word_listening(self):
-        """Start listening for wake word"""
+    def start_wake_word_listening(self) -> Optional[str]:
+        """Listen for the wake word; returns the command spoken after it"""
         if self.wake_word_detector:
             self._update_status("Listening for wake word 'Jarvis'...")
-            self.wake_word_detector.listen()
-        else:
-            logger.warning("Wake word detection not available")
+            return self.wake_word_detector.listen()
+        logger.warning("Wake word detection not available")
+        return None
             
     def stop_wake_word_listening(self):
         """Stop wake word listening"""
@@ -496,16 +1243,57 @@ def _get_recognizer():
         return _recognizer_instance
 
 
+def preload_speech() -> Future:
+    """Load and warm up the STT engine on a background thread, once.
+
+    The returned future resolves to the recognizer when it can take a
+    command; callers can wait on it or attach a done callback.
+    """
+    global _preload_future
+    with _preload_lock:
+        if _preload_future is None:
+            _preload_future = Future()
+            threading.Thread(target=_preload, args=(_preload_future,), name="stt-preload", daemon=True).start()
+        return _preload_future
+
+
+def _preload(future: Future):
+    start = time.monotonic()
+    try:
+        recognizer = _get_recognizer()
+        recognizer.warm_up()
+    except Exception as e:
+        logger.error(f"Error preloading speech engine: {e}")
+        future.set_exception(e)
+        return
+    logger.info(f"Speech engine {recognizer.stt_engine.name} ready in {time.monotonic() - start:.2f} s "
+                f"({time.monotonic() - _STARTED_AT:.2f} s after startup)")
+    future.set_result(recognizer)
+
+
+def speech_ready() -> bool:
+    """Whether a preload has finished (successfully or not)"""
+    return _preload_future is not None and _preload_future.done()
+
+
 def list_microphones() -> List[str]:
-    """List available microphones"""
-    recognizer = _get_recognizer()
-    return recognizer.mic_manager.discover_microphones()
+    """Names of the available microphones; doesn't load the STT engine"""
+    return get_registry().names()
+
+
+def list_input_devices(refresh: bool = False) -> List[DeviceInfo]:
+    """Available microphones with their device indices; ``refresh`` re-scans now"""
+    return get_registry().devices(refresh=refresh)
 
 
 def set_mic_index(index: int):
-    """Set microphone index"""
-    recognizer = _get_recognizer()
-    recognizer.mic_manager.set_microphone(index)
+    """Select the microphone by device index, now or for when the recognizer is created"""
+    global _selected_mic_index
+    _selected_mic_index = index
+    # Don't build (and load STT for) a recognizer just to record the choice
+    recognizer = _recognizer_instance
+    if recognizer is not None:
+        recognizer.mic_manager.set_microphone(index)
 
 
 def listen() -> Optional[str]:
@@ -526,12 +1314,34 @@ def listen_with_wake_word() -> Optional[str]:
     return recognizer.start_wake_word_listening()
 
 
+def create_wake_word_detector(callback: Callable, keyword: str = "jarvis", sensitivity: float = 0.7):
+    """Wake word detector sharing the recognizer's capture stream (see SpeechRecognizer)"""
+    return _get_recognizer().create_wake_word_detector(callback, keyword, sensitivity)
+
+
+def listen_after_wake_word(detector) -> Optional[str]:
+    """Listen for the command that follows a detection by ``detector``"""
+    return _get_recognizer().listen_after_wake_word(detector)
+
+
 def listen_direct() -> Optional[str]:
     """Listen directly without wake word"""
     recognizer = _get_recognizer()
     return recognizer.listen_for_command()
 
 
+def set_audio_source(source):
+    """Listen to ``source`` (an ``audio_source.AudioSource``) instead of the microphone; None restores it"""
+    recognizer = _get_recognizer()
+    recognizer.source = source
+
+
+def listen_dictation() -> Optional[str]:
+    """Listen directly for a free-form answer, decoded with the dictation profile"""
+    recognizer = _get_recognizer()
+    return recognizer.listen_for_command(profile="dictation")
+
+
 def speak(text: str):
     """Speak text using TTS"""
     if not text:
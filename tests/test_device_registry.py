@@ -0,0 +1,39 @@
+from device_registry import DeviceInfo, DeviceRegistry
+
+
+def make_registry(monkeypatch, lists):
+    registry = DeviceRegistry(max_age=0.0)
+    calls = []
+
+    def enumerate_devices():
+        calls.append(1)
+        return lists[min(len(calls), len(lists)) - 1]
+
+    monkeypatch.setattr(registry, "_enumerate", enumerate_devices)
+    return registry, calls
+
+
+def test_stale_cache_is_kept_while_a_stream_holds_portaudio(monkeypatch):
+    mic = DeviceInfo(0, "Mic", "MME", 1, 16000)
+    registry, calls = make_registry(monkeypatch, [[mic]])
+    registry.devices()
+    registry.hold()
+    registry.devices()
+    assert len(calls) == 1
+    registry.release()
+    registry.devices()
+    assert len(calls) == 2
+
+
+def test_refresh_releases_held_streams_before_rescanning(monkeypatch):
+    old = [DeviceInfo(0, "Mic", "MME", 1, 16000)]
+    new = old + [DeviceInfo(1, "USB Mic", "MME", 1, 48000)]
+    registry, calls = make_registry(monkeypatch, [old, new])
+    released, changed = [], []
+    registry.add_release_hook(lambda: (released.append(1), registry.release()))
+    registry.add_listener(changed.append)
+    registry.devices()
+    registry.hold()
+    assert [d.name for d in registry.devices(refresh=True)] == ["Mic", "USB Mic"]
+    assert released == [1]
+    assert changed == [new]
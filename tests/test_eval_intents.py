@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+from eval_intents import NO_INTENT, evaluate, load_labelled
+
+
+def test_metrics_from_a_known_confusion():
+    records = [{"text": "a", "label": "x"}, {"text": "b", "label": "x"},
+               {"text": "c", "label": "y"}, {"text": "d", "label": NO_INTENT}]
+    predictions = {"a": "x", "b": "y", "c": "y", "d": NO_INTENT}
+    report = evaluate(records, predictions.get)
+    assert report["count"] == 4
+    assert report["accuracy"] == 0.75
+    assert report["per_intent"]["x"] == {"precision": 1.0, "recall": 0.5, "f1": 0.6667, "support": 2}
+    assert report["per_intent"]["y"]["precision"] == 0.5
+    assert report["confusion"]["labels"] == [NO_INTENT, "x", "y"]
+    assert report["confusion"]["matrix"] == [[1, 0, 0], [0, 1, 1], [0, 0, 1]]
+    assert report["errors"] == [{"text": "b", "label": "x", "predicted": "y"}]
+    assert set(report["latency_ms"]) == {"mean", "p50", "p95", "p99"}
+
+
+def test_load_labelled_defaults_missing_labels_to_none(tmp_path):
+    path = tmp_path / "data.jsonl"
+    path.write_text(json.dumps({"text": "hello"}) + "\n\n" + json.dumps({"text": "mute", "label": "mute_audio"}) + "\n")
+    assert load_labelled(str(path)) == [{"text": "hello", "label": NO_INTENT},
+                                        {"text": "mute", "label": "mute_audio"}]
+    path.write_text(json.dumps({"label": "mute_audio"}) + "\n")
+    with pytest.raises(ValueError):
+        load_labelled(str(path))
@@ -0,0 +1,51 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("pyttsx3")
+
+import speech
+from speech import GoogleSTT, HedgedSTT, STTEngine
+
+
+class SlowLocal(STTEngine):
+    """A local engine that records how many decodes overlap"""
+
+    def __init__(self):
+        super().__init__("slow_local")
+        self.model = object()
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def recognize_scored(self, audio_data, profile="command"):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.1)
+        with self._lock:
+            self.active -= 1
+        return "volume up", 0.9
+
+
+def test_local_engine_never_decodes_two_utterances_at_once(monkeypatch):
+    monkeypatch.setitem(speech.STT_ENGINES, "slow_local", SlowLocal)
+    # Google hears nothing, so every command waits for the local engine
+    monkeypatch.setattr(GoogleSTT, "recognize_scored", lambda self, audio, profile="command": (None, None))
+    hedged = HedgedSTT(local="slow_local", budget=1.0, min_confidence=0.5)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(hedged.recognize_scored(None)))
+               for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [("volume up", 0.9)] * 3
+    assert hedged.local.max_active == 1
+
+
+def test_google_requests_may_overlap():
+    hedged = HedgedSTT(local="vosk", budget=1.0)
+    assert hedged._pools["google"]._max_workers == 2
+    assert hedged._pools["vosk"]._max_workers == 1
@@ -0,0 +1,25 @@
+import numpy as np
+
+from utils import COMMANDS, TIE_BREAK, IntentIndex, match_intent, match_intents
+
+
+def test_shared_phrase_goes_to_tie_break_action():
+    assert match_intent("exit") == "stop_assistant"
+    assert match_intent("quit") == "stop_assistant"
+    actions, scores, margins = match_intents(["exit", "terminate"])
+    assert list(actions) == ["stop_assistant", "stop_assistant"]
+    assert np.all(margins == 0)
+
+
+def test_tie_break_order_is_explicit():
+    commands = {"a": ["same"], "b": ["same"]}
+    assert IntentIndex(commands).match("same").action == "a"
+    assert IntentIndex(commands, tie_break=("b",)).match("same").action == "b"
+    actions, _, _ = IntentIndex(commands, tie_break=("b",)).match_batch(["same"])
+    assert actions[0] == "b"
+
+
+def test_best_score_wins_over_tie_break():
+    index = IntentIndex(COMMANDS, tie_break=TIE_BREAK)
+    assert index.match("close").action == "close_app"
+    assert index.match("volume up").action == "increase_volume"
@@ -0,0 +1,61 @@
+import json
+
+import numpy as np
+
+import eval_intents
+import utils
+from ngram_intent import NO_INTENT, NgramIntentClassifier, load_labelled_pairs
+from utils import COMMANDS
+
+
+def write_jsonl(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+
+
+def test_labelled_pairs_round_trip(tmp_path):
+    path = tmp_path / "train.jsonl"
+    write_jsonl(path, [{"text": "open note pad", "label": "open_app"},
+                       {"text": "cal do jarurat hai", "label": "none"},
+                       {"text": "", "label": "open_app"},
+                       {"text": "what is this"}])
+    assert load_labelled_pairs(str(path)) == [("open note pad", "open_app"),
+                                               ("cal do jarurat hai", NO_INTENT),
+                                               ("what is this", NO_INTENT)]
+    assert load_labelled_pairs(str(tmp_path / "missing.jsonl")) == []
+
+
+def test_training_pairs_are_learned():
+    classifier = NgramIntentClassifier().fit_commands(COMMANDS, [("cal do jarurat hai per", NO_INTENT)])
+    assert classifier.predict("volume up")[0] == "increase_volume"
+    assert classifier.predict("cal do jarurat hai per")[0] is None
+
+
+def test_batch_matches_single_predictions():
+    classifier = NgramIntentClassifier().fit_commands(COMMANDS)
+    texts = ["volume up", "lock the screen", "flip a coin", "xq"]
+    actions, scores, _ = classifier.match_batch(texts)
+    for text, action, score in zip(texts, actions, scores):
+        single = classifier.predict(text)
+        assert single[0] == action
+        assert np.isclose(single[1], score, atol=1e-3)
+
+
+def test_eval_never_trains_on_evaluation_data(tmp_path, monkeypatch):
+    records = [{"text": "cal do jarurat hai per", "label": "open_app"}]
+    path = tmp_path / "train.jsonl"
+    write_jsonl(path, [{"text": "Cal do jarurat hai per", "label": "open_app"}])
+    fitted = []
+    fit_commands = NgramIntentClassifier.fit_commands
+    monkeypatch.setattr(NgramIntentClassifier, "fit_commands",
+                        lambda self, commands, extra=None: fitted.append(extra) or fit_commands(self, commands, extra))
+    eval_intents._ngram_engine(str(path), records)
+    assert fitted == [None]
+
+
+def test_stop_words_resolve_to_stop_assistant():
+    # "exit" and "quit" are phrases of both close_app and stop_assistant
+    for text in ("exit", "quit"):
+        assert eval_intents._ngram_engine()(text) == "stop_assistant"
+    utils._NGRAM_CLASSIFIER = None
+    actions, _, _ = utils.get_ngram_classifier().match_batch(["exit", "quit"])
+    assert list(actions) == ["stop_assistant", "stop_assistant"]
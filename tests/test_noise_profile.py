@@ -0,0 +1,78 @@
+import numpy as np
+
+from audio_source import SyntheticSource
+from noise_profile import MIN_ENERGY_THRESHOLD, NoiseProfile, NoiseProfiles
+from preprocess import GATE_FFT
+
+RATE = 16000
+
+
+def noise(seconds, amplitude, seed=0):
+    return SyntheticSource("noise", seconds=seconds, amplitude=amplitude, seed=seed).read(RATE * 60)
+
+
+def level_db(samples):
+    x = samples.astype(np.float32) / 32768.0
+    return 10 * np.log10(np.mean(x ** 2))
+
+
+def test_first_update_sets_the_floor_from_the_quiet_frames():
+    profile = NoiseProfile()
+    assert not profile.known
+    quiet = noise(2.0, 0.01)
+    # Speech-like bursts in a third of the window must not raise the floor
+    samples = quiet.copy()
+    samples[:RATE // 2] += noise(0.5, 0.5, seed=1)
+    profile.update(samples, RATE)
+    assert profile.known
+    assert abs(profile.noise_db - level_db(quiet)) < 1.5
+    assert profile.spectrum.shape == (GATE_FFT // 2 + 1,)
+
+
+def test_updates_move_slowly_towards_a_new_floor():
+    profile = NoiseProfile()
+    profile.update(noise(1.0, 0.01), RATE)
+    start = profile.noise_db
+    profile.update(noise(1.0, 0.1), RATE)
+    # One window moves the estimate by ADAPT of the 20 dB step
+    assert 1.0 < profile.noise_db - start < 3.0
+
+
+def test_update_ignores_too_little_audio():
+    profile = NoiseProfile()
+    profile.update(noise(0.05, 0.01), RATE)
+    assert not profile.known
+
+
+def test_spectrum_is_only_offered_at_its_own_rate():
+    profile = NoiseProfile()
+    profile.update(noise(1.0, 0.01), 48000)
+    assert profile.spectrum_at(16000) is not None
+    assert profile.spectrum_at(48000) is None
+
+
+def test_energy_threshold_has_a_floor():
+    assert NoiseProfile(noise_db=-90.0).energy_threshold() == MIN_ENERGY_THRESHOLD
+    assert NoiseProfile(noise_db=-20.0).energy_threshold() > MIN_ENERGY_THRESHOLD
+
+
+def test_profiles_round_trip_through_the_file(tmp_path):
+    path = str(tmp_path / "noise.json")
+    profiles = NoiseProfiles(path)
+    profiles.update("Mic|MME", noise(1.0, 0.01), RATE)
+    profiles.get("Unused|MME")
+    profiles.save()
+    loaded = NoiseProfiles(path)
+    original, restored = profiles.get("Mic|MME"), loaded.get("Mic|MME")
+    assert abs(restored.noise_db - original.noise_db) < 0.01
+    np.testing.assert_allclose(restored.spectrum, original.spectrum, atol=1e-5)
+    assert restored.updated == original.updated
+    # Devices never measured are not saved
+    assert not loaded.get("Unused|MME").known
+
+
+def test_missing_or_corrupt_file_starts_empty(tmp_path):
+    path = tmp_path / "noise.json"
+    assert not NoiseProfiles(str(path)).get("Mic|MME").known
+    path.write_text("{not json")
+    assert not NoiseProfiles(str(path)).get("Mic|MME").known
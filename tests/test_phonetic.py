@@ -0,0 +1,51 @@
+import pytest
+
+from phonetic import correct_command, correction_hit_rate, get_corrector
+
+
+@pytest.mark.parametrize("text", [
+    "tell me about rome",
+    "what are the terms of the contract",
+    "who wrote hamlet",
+    "hello world",
+    "What is the capital of Rome?",
+])
+def test_free_form_text_is_left_alone(text):
+    command, intent = correct_command(text)
+    assert command == text
+    assert intent.action in (None, "ask_ai")
+
+
+@pytest.mark.parametrize("text, app", [
+    ("open node pair", "notepad"),
+    ("open Note 3", "notepad"),
+    ("open brve", "brave"),
+])
+def test_misheard_app_names_are_corrected(text, app):
+    command, intent = correct_command(text)
+    assert intent.action == "open_app"
+    assert intent.app_name == app
+
+
+def test_correction_keeps_case_and_punctuation_outside_the_span():
+    corrected, changes = get_corrector().correct_with_changes("Open Goggle Chrome, please!")
+    assert corrected == "Open google Chrome, please!"
+    assert changes == [("goggle", "google")]
+
+
+def test_correction_that_keeps_the_intent_is_dropped():
+    command, intent = correct_command("volum up")
+    assert command == "volum up"
+    assert intent.action == "increase_volume"
+
+
+def test_hit_rate_counts_only_kept_corrections():
+    get_corrector().stats.clear()
+    correct_command("open node pair")
+    # Rewritten by the corrector, but the action stays ask_ai, so it is dropped
+    correct_command("tell me about rome")
+    correct_command("volume up")
+    stats = correction_hit_rate()
+    assert stats["utterances"] == 3
+    assert stats["corrected"] == 1
+    assert stats["hit_rate"] == pytest.approx(1 / 3)
@@ -0,0 +1,38 @@
+import types
+
+import pytest
+
+pytest.importorskip("PyQt6")
+
+from action_registry import REGISTRY, ActionSpec
+from plugin_manager import PluginManager
+from utils import COMMANDS
+
+
+def make_plugin(actions):
+    module = types.ModuleType("fake_plugin")
+    module.register = lambda table: table.update(actions)
+    return module
+
+
+def test_plugin_cannot_replace_a_core_action(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    core = lambda intent: "core"
+    # Swapped in through monkeypatch so the real core spec is back after the test
+    monkeypatch.setitem(REGISTRY._actions, "tell_joke", ActionSpec("tell_joke", core, source="core"))
+    phrases = list(COMMANDS["tell_joke"])
+    manager = PluginManager(str(tmp_path / "plugins"))
+    plugin = make_plugin({
+        "tell_joke": (lambda: "plugin", {"phrases": ["joke please"]}),
+        "plugin_only": (lambda: "mine", {"phrases": ["do the plugin thing"]}),
+    })
+
+    manager._register_plugin_actions("fake", plugin)
+    assert REGISTRY.get("tell_joke").handler is core
+    assert COMMANDS["tell_joke"] == phrases
+    assert REGISTRY.get("plugin_only").source == "fake"
+
+    manager._unregister_plugin_actions("fake")
+    assert REGISTRY.get("tell_joke").handler is core
+    assert COMMANDS["tell_joke"] == phrases
+    assert "plugin_only" not in REGISTRY and "plugin_only" not in COMMANDS
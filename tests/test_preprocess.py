@@ -0,0 +1,87 @@
+import logging
+
+import numpy as np
+import pytest
+
+from preprocess import Preprocessor, auto_gain, noise_spectrum, remove_dc, resample, spectral_gate
+
+
+def sine(freq, rate, seconds=1.0, amplitude=0.5):
+    t = np.arange(int(rate * seconds)) / rate
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+@pytest.mark.parametrize("src_rate", [48000, 44100, 22050])
+def test_resample_keeps_in_band_tones(src_rate):
+    out = resample(sine(1000, src_rate), src_rate, 16000)
+    assert len(out) == 16000
+    expected = sine(1000, 16000)
+    # Skip the filter's edge transient
+    error = out[200:-200] - expected[200:-200]
+    assert np.sqrt(np.mean(error ** 2)) < 0.01
+
+
+def test_resample_removes_tones_above_the_new_nyquist():
+    out = resample(sine(12000, 48000), 48000, 16000)
+    assert np.sqrt(np.mean(out[200:-200] ** 2)) < 0.01
+
+
+def test_resample_same_rate_is_a_no_op():
+    x = sine(440, 16000)
+    assert resample(x, 16000, 16000) is x
+
+
+def test_remove_dc():
+    x = sine(440, 16000) + np.float32(0.2)
+    assert abs(remove_dc(x).mean()) < 1e-6
+    assert remove_dc(np.empty(0, dtype=np.float32)).size == 0
+
+
+def test_auto_gain_reaches_the_target_level():
+    out = auto_gain(sine(440, 16000, amplitude=0.01), 16000, target_db=-20.0)
+    level_db = 10 * np.log10(np.mean(out ** 2))
+    assert abs(level_db - -20.0) < 0.5
+
+
+def test_auto_gain_never_clips():
+    x = sine(440, 16000, amplitude=0.1)
+    x[100] = 0.9
+    assert np.abs(auto_gain(x, 16000, target_db=-3.0)).max() <= 0.95 + 1e-6
+
+
+def test_spectral_gate_without_reduction_reconstructs_the_input():
+    x = np.random.default_rng(0).standard_normal(16000).astype(np.float32) * 0.1
+    np.testing.assert_allclose(spectral_gate(x, reduction_db=0.0), x, atol=1e-5)
+
+
+def test_spectral_gate_attenuates_noise_but_keeps_the_tone():
+    rng = np.random.default_rng(1)
+    noise = rng.standard_normal(32000).astype(np.float32) * 0.01
+    x = noise.copy()
+    x[16000:] += sine(440, 16000, amplitude=0.3)
+    gated = spectral_gate(x, noise_spectrum(noise[:8000]))
+    noise_drop = 10 * np.log10(np.mean(x[2000:14000] ** 2) / np.mean(gated[2000:14000] ** 2))
+    tone_drop = 10 * np.log10(np.mean(x[18000:30000] ** 2) / np.mean(gated[18000:30000] ** 2))
+    assert noise_drop > 6.0
+    assert abs(tone_drop) < 0.5
+
+
+def test_preprocessor_runs_enabled_stages_and_returns_int16(caplog):
+    with caplog.at_level(logging.WARNING):
+        chain = Preprocessor(["dc", "resample", "bogus"])
+    assert chain.stages == ["resample", "dc"]
+    assert "bogus" in caplog.text
+    assert not chain.utterance_level
+    samples = (sine(1000, 48000) * 32767).astype(np.int16) + np.int16(500)
+    out, rate = chain.process(samples, 48000)
+    assert rate == 16000 and out.dtype == np.int16 and len(out) == 16000
+    assert abs(out.mean()) < 5
+
+
+def test_disabled_preprocessor_passes_audio_through():
+    samples = np.arange(100, dtype=np.int16)
+    chain = Preprocessor([])
+    assert not chain.enabled
+    out, rate = chain.process(samples, 44100)
+    assert out is samples and rate == 44100
+    assert Preprocessor(["gate"]).utterance_level
@@ -0,0 +1,114 @@
+import threading
+
+import numpy as np
+
+from audio_capture import CaptureService, RingBuffer, RingReader
+
+
+def ramp(start, n):
+    return np.arange(start, start + n, dtype=np.int16)
+
+
+def test_write_wraps_around_the_end():
+    ring = RingBuffer(10)
+    ring.write(ramp(0, 7))
+    ring.write(ramp(7, 6))
+    assert ring.written == 13
+    assert ring.oldest == 3
+    np.testing.assert_array_equal(ring.read(3, 13), ramp(3, 10))
+    pieces = ring.views(5, 12)
+    assert len(pieces) == 2
+    np.testing.assert_array_equal(np.concatenate(pieces), ramp(5, 7))
+
+
+def test_views_share_memory_with_the_ring():
+    ring = RingBuffer(10)
+    ring.write(ramp(0, 10))
+    (view,) = ring.views(2, 8)
+    assert np.shares_memory(view, ring._data)
+    assert not np.shares_memory(ring.read(2, 8), ring._data)
+
+
+def test_write_larger_than_capacity_keeps_the_newest():
+    ring = RingBuffer(8)
+    ring.write(ramp(0, 20))
+    assert ring.written == 20
+    np.testing.assert_array_equal(ring.read(0), ramp(12, 8))
+
+
+def test_write_accepts_raw_pcm_bytes():
+    ring = RingBuffer(8)
+    ring.write(ramp(0, 4).tobytes())
+    np.testing.assert_array_equal(ring.read(0), ramp(0, 4))
+
+
+def test_reader_overrun_skips_to_the_oldest_sample():
+    ring = RingBuffer(10)
+    reader = RingReader(ring, 0)
+    ring.write(ramp(0, 25))
+    samples = reader.read()
+    np.testing.assert_array_equal(samples, ramp(15, 10))
+    assert reader.position == 25
+    assert reader.available() == 0
+
+
+def test_reader_reads_incrementally_with_a_limit():
+    ring = RingBuffer(16)
+    reader = RingReader(ring, 0)
+    ring.write(ramp(0, 10))
+    np.testing.assert_array_equal(reader.read(4), ramp(0, 4))
+    np.testing.assert_array_equal(reader.read(), ramp(4, 6))
+    assert reader.read().size == 0
+
+
+def test_reader_waits_for_the_writer():
+    ring = RingBuffer(16)
+    reader = RingReader(ring, 0)
+    timer = threading.Timer(0.05, ring.write, args=(ramp(0, 5),))
+    timer.start()
+    np.testing.assert_array_equal(reader.read(timeout=2.0), ramp(0, 5))
+    timer.join()
+
+
+
+def running_service(rate=16000):
+    service = CaptureService(sample_rate=rate, buffer_seconds=1)
+    # Fed by hand instead of a PyAudio stream
+    service.running = True
+    return service
+
+
+def test_ring_source_reads_read_only_views_of_the_ring():
+    service = running_service()
+    source = service.source()
+    service.ring.write(ramp(0, 100))
+    frame = source.read(40)
+    np.testing.assert_array_equal(frame, ramp(0, 40))
+    assert np.shares_memory(frame, service.ring._data)
+    assert not frame.flags.writeable
+    assert source.position == 40
+    source.stop()
+    assert source.read(40).size == 0
+
+
+def test_ring_source_moves_to_the_reopened_stream():
+    old, new = running_service(), running_service()
+    source = old.source(reopen=lambda: new)
+    old.ring.write(ramp(0, 10))
+    old.running = False
+    assert not source.exhausted
+    feeder = threading.Timer(0.05, lambda: new.ring.write(ramp(100, 40)))
+    feeder.start()
+    frame = source.read(40)
+    feeder.join()
+    np.testing.assert_array_equal(frame, ramp(100, 40))
+    assert source.service is new
+
+
+def test_ring_source_without_a_stream_to_reopen_runs_dry():
+    service = running_service()
+    source = service.source(reopen=lambda: None)
+    service.ring.write(ramp(0, 10))
+    service.running = False
+    np.testing.assert_array_equal(source.read(40), ramp(0, 10))
+    assert source.read(40).size == 0
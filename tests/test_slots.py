@@ -0,0 +1,41 @@
+import pytest
+
+from slots import extract_intent, parse_duration
+
+
+@pytest.mark.parametrize("text, seconds", [
+    ("5 minutes", 300),
+    ("twenty five seconds", 25),
+    ("1 minute 30 seconds", 90),
+    ("a couple of minutes", 120),
+    ("half an hour", 1800),
+    ("an hour and a half", 5400),
+    ("two and a half minutes", 150),
+    ("two minutes and a half", 150),
+    ("90", 90),
+    ("one hundred seconds", 100),
+    ("two hundred seconds", 200),
+    ("one hundred twenty seconds", 120),
+    ("a hundred seconds", 100),
+    ("hundred seconds", 100),
+])
+def test_parse_duration(text, seconds):
+    assert parse_duration(text) == seconds
+
+
+def test_and_a_half_adds_to_the_number():
+    assert parse_duration("set a timer for two and a half minutes") == 150
+
+
+def test_numbers_away_from_a_unit_are_ignored():
+    assert parse_duration("remind me in an hour to take a break 2 times") == 3600
+
+
+def test_no_duration():
+    assert parse_duration("set timer") is None
+    assert parse_duration("take a break") is None
+
+
+def test_timer_slot_defaults_to_a_minute():
+    assert extract_intent("set timer").duration_seconds == 60
+    assert extract_intent("set a timer for two and a half minutes").duration_seconds == 150
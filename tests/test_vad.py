@@ -0,0 +1,79 @@
+import numpy as np
+
+from audio_capture import capture_from_source
+from audio_source import ArraySource, SyntheticSource
+from vad import Endpointer, VoiceActivityDetector
+
+RATE = 16000
+FRAME = 480
+
+
+def noise(seconds):
+    return SyntheticSource("noise", seconds=seconds, amplitude=0.003).read(RATE * 60)
+
+
+def speech(seconds):
+    """A loud tone over the background noise; tonal, so the VAD calls it voiced"""
+    return SyntheticSource("tone", seconds=seconds, amplitude=0.3).read(RATE * 60) + noise(seconds)
+
+
+def run(endpointer, samples):
+    for i in range(0, len(samples), FRAME):
+        if endpointer.feed(samples[i:i + FRAME]):
+            return True
+    return False
+
+
+def make_endpointer(**kwargs):
+    return Endpointer(VoiceActivityDetector.from_profile("office"), ambient=noise(0.5), **kwargs)
+
+
+def test_utterance_ends_after_the_minimum_hangover():
+    endpointer = make_endpointer()
+    assert run(endpointer, np.concatenate([noise(0.6), speech(0.6), noise(1.5)]))
+    assert abs(endpointer.speech_start / RATE - 0.6) <= 0.03
+    assert abs(endpointer.speech_end / RATE - 1.2) <= 0.03
+    hangover = endpointer.vad.min_hangover_frames * endpointer.vad.frame_samples
+    assert endpointer.position - endpointer.speech_end - hangover < FRAME
+
+
+def test_short_pause_does_not_split_the_utterance():
+    endpointer = make_endpointer()
+    assert run(endpointer, np.concatenate([noise(0.6), speech(0.6), noise(0.3), speech(0.3), noise(1.5)]))
+    assert abs(endpointer.speech_end / RATE - 1.8) <= 0.03
+
+
+def test_hangover_stretches_to_cover_the_longest_pause():
+    endpointer = make_endpointer()
+    vad = endpointer.vad
+    # A 0.39 s pause fits in the 0.4 s minimum hangover and stretches it
+    assert not run(endpointer, np.concatenate([noise(0.6), speech(0.5), noise(0.39), speech(0.3)]))
+    assert vad.min_hangover_frames < endpointer.hangover_frames <= vad.max_hangover_frames
+    # ... so a following 0.42 s pause no longer ends the utterance
+    assert run(endpointer, np.concatenate([noise(0.42), speech(0.3), noise(1.5)]))
+    assert abs(endpointer.speech_end / RATE - 2.51) <= 0.03
+
+
+def test_silence_never_starts_an_utterance():
+    endpointer = make_endpointer()
+    assert not run(endpointer, noise(3.0))
+    assert endpointer.speech_start is None
+
+
+def test_known_noise_floor_takes_precedence_over_ambient():
+    vad = VoiceActivityDetector.from_profile("office")
+    assert Endpointer(vad, ambient=speech(0.5), noise_db=-60.0).noise_db == -60.0
+    assert Endpointer(vad, ambient=noise(0.5)).noise_db < -50.0
+
+
+def test_capture_from_array_source_keeps_the_pre_roll():
+    samples = np.concatenate([noise(1.0), speech(0.6), noise(1.5)])
+    captured = capture_from_source(ArraySource(samples), timeout=5, phrase_time_limit=10, pre_roll=0.2)
+    # 0.2 s pre-roll + 0.6 s speech + the hangover
+    assert 0.8 <= len(captured) / RATE <= 1.3
+    lead = captured[:int(0.15 * RATE)].astype(np.float32)
+    assert np.sqrt(np.mean(lead ** 2)) < 100
+
+
+def test_capture_from_source_times_out_on_silence():
+    assert capture_from_source(ArraySource(noise(4.0)), timeout=2, phrase_time_limit=10) is None
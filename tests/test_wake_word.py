@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+import wake_word
+from audio_source import ArraySource, SyntheticSource
+from device_registry import DeviceInfo, DeviceRegistry
+from wake_word import WakeWordDetector
+
+
+class FakePorcupine:
+    """Hears the keyword in any loud frame"""
+
+    sample_rate = 16000
+    frame_length = 512
+
+    def process(self, pcm):
+        return 0 if max(abs(sample) for sample in pcm) > 10000 else -1
+
+    def delete(self):
+        pass
+
+
+class FakePorcupineModule:
+    @staticmethod
+    def create(keywords, sensitivities):
+        return FakePorcupine()
+
+
+@pytest.fixture(autouse=True)
+def fake_porcupine(monkeypatch):
+    monkeypatch.setattr(wake_word, "PORCUPINE_AVAILABLE", True)
+    monkeypatch.setattr(wake_word, "pvporcupine", FakePorcupineModule, raising=False)
+
+
+def keyword_then_silence():
+    silence = SyntheticSource("silence", seconds=0.5).read(8000)
+    keyword = SyntheticSource("tone", seconds=0.2, amplitude=0.5).read(3200)
+    return ArraySource(np.concatenate([silence, keyword, silence]))
+
+
+def test_listen_returns_the_command_from_the_callback():
+    heard = []
+    detector = WakeWordDetector(callback=lambda: heard.append(1) or "open notepad",
+                                source=keyword_then_silence())
+    assert detector.listen() == "open notepad"
+    assert heard == [1]
+
+
+def test_listen_ends_with_none_when_the_source_runs_out():
+    detector = WakeWordDetector(callback=lambda: "open notepad", source=SyntheticSource("silence", seconds=1))
+    assert detector.listen() is None
+
+
+def test_listen_with_wake_word_returns_the_command(monkeypatch):
+    pytest.importorskip("pyttsx3")
+    import speech
+    recognizer = object.__new__(speech.SpeechRecognizer)
+    recognizer.status_callback = None
+    recognizer.wake_word_detector = WakeWordDetector(callback=lambda: "volume up", source=keyword_then_silence())
+    monkeypatch.setattr(speech, "_recognizer_instance", recognizer)
+    assert speech.listen_with_wake_word() == "volume up"
+
+
+def test_capture_only_restarts_when_the_microphone_changes(monkeypatch):
+    pytest.importorskip("pyttsx3")
+    import speech
+    mic, usb = DeviceInfo(0, "Mic", "MME", 1, 16000), DeviceInfo(1, "USB Mic", "MME", 1, 48000)
+    devices = [[mic, usb]]
+    registry = DeviceRegistry(max_age=60.0)
+    monkeypatch.setattr(registry, "_enumerate", lambda: devices[0])
+    stops = []
+    monkeypatch.setattr(speech, "stop_capture_services", lambda: stops.append(1))
+    monkeypatch.setattr(speech, "score_microphones", lambda indices, force=False: {i: 0.5 for i in indices})
+    monkeypatch.setattr(speech, "_selected_mic_index", None)
+    manager = speech.MicrophoneManager(registry)
+    manager.set_microphone(1)
+    assert stops == [1]
+    manager.set_microphone(1)
+    assert stops == [1]
+
+    # A new device after the selected one leaves its index alone
+    devices[0] = [mic, usb, DeviceInfo(2, "Headset", "MME", 1, 16000)]
+    registry.devices(refresh=True)
+    assert manager.selected_index == 1 and stops == [1]
+
+    # Unplugging it shifts the selection away from index 1
+    devices[0] = [mic, DeviceInfo(1, "Headset", "MME", 1, 16000)]
+    registry.devices(refresh=True)
+    assert manager.selected_index is None
+    assert stops == [1, 1]
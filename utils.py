@@ -1,6 +1,12 @@
-from rapidfuzz import process
+from rapidfuzz import process, fuzz
 from functools import lru_cache
+from collections import Counter
+from typing import NamedTuple, Optional, Tuple
 import datetime
+import re
+import numpy as np
+from config import get_intent_engine, get_intent_training_file
+from ngram_intent import NgramIntentClassifier, load_labelled_pairs
 
 # Map actions to possible user phrases
 COMMANDS = {
@@ -85,20 +91,284 @@ COMMANDS = {
     ]
 }
 
+# Leading words that pick an action on their own; whatever follows is the argument.
+# Only prefixes that belong to a single action are listed ("exit"/"quit" are shared
+# by close_app and stop_assistant, so they stay with the fuzzy matcher).
+PREFIX_RULES = {
+    "open_app": ["open", "launch"],
+    "close_app": ["close"],
+    "set_timer": ["set timer", "set a timer", "remind me in", "alarm in"],
+    "generate_code": COMMANDS["generate_code"],
+    "play_youtube": ["play"],
+}
+
+# Actions that win a tie between equal fuzzy scores, in order. A bare "exit",
+# "quit" or "terminate" names no app to close, so it means stop the assistant.
+TIE_BREAK = ("stop_assistant",)
+
+# Minimum score for a fuzzy match to count as an intent
+MATCH_THRESHOLD = 75
+# Phrases scoring below this are pruned early by rapidfuzz and reported as 0
+SCORE_FLOOR = 50
+
+
+class IntentMatch(NamedTuple):
+    """Best scoring action for an utterance, plus the runner-up for ambiguity checks"""
+    action: Optional[str]
+    score: float
+    runner_up: Optional[str]
+    runner_up_score: float
+
+
+class IntentIndex:
+    """Flattened phrase index scoring every action in a single rapidfuzz pass.
+
+    Every distinct phrase in ``commands`` is stored once in ``choices``, and
+    ``action_ids``/``phrase_ids`` are parallel arrays with one entry per
+    (action, phrase) pair. One ``cdist`` call scores the whole vocabulary and
+    ``np.maximum.reduceat`` folds it into a best score per action.
+
+    Equal scores go to the action listed first in ``tie_break``, then to the
+    earlier action in ``commands``.
+    """
+
+    def __init__(self, commands, scorer=fuzz.WRatio, threshold: float = MATCH_THRESHOLD,
+                 score_floor: float = SCORE_FLOOR, tie_break=()):
+        self.actions = []
+        self.choices = []
+        phrase_lookup = {}
+        action_ids = []
+        phrase_ids = []
+        for action, phrases in commands.items():
+            if not phrases:
+                continue
+            self.actions.append(action)
+            for phrase in phrases:
+                # Phrases shared by several actions ("exit", "quit") are scored once
+                if phrase not in phrase_lookup:
+                    phrase_lookup[phrase] = len(self.choices)
+                    self.choices.append(phrase)
+                action_ids.append(len(self.actions) - 1)
+                phrase_ids.append(phrase_lookup[phrase])
+        self.action_ids = np.asarray(action_ids, dtype=np.intp)
+        self.phrase_ids = np.asarray(phrase_ids, dtype=np.intp)
+        # Pairs are grouped by action, so each group starts where the id changes
+        self._group_starts = np.flatnonzero(np.diff(self.action_ids, prepend=-1))
+        # Secondary sort key: lower wins a tie
+        preferred = {action: i for i, action in enumerate(tie_break)}
+        self._tie_rank = np.array([preferred.get(action, len(preferred) + i)
+                                   for i, action in enumerate(self.actions)], dtype=np.intp)
+        self.scorer = scorer
+        self.threshold = threshold
+        self.score_floor = score_floor
+
+    def phrase_scores(self, texts, workers: int = 1) -> np.ndarray:
+        """Score each text against every phrase, shape ``(len(texts), len(choices))``"""
+        return process.cdist(texts, self.choices, scorer=self.scorer, dtype=np.float32,
+                             score_cutoff=self.score_floor, workers=workers)
+
+    def action_scores(self, text: str) -> np.ndarray:
+        """Return the best phrase score for every action, in ``self.actions`` order"""
+        return self.batch_action_scores([text])[0]
+
+    def batch_action_scores(self, texts, workers: int = 1) -> np.ndarray:
+        """Return per-action scores for many texts, shape ``(len(texts), len(actions))``"""
+        scores = self.phrase_scores(texts, workers=workers)
+        return np.maximum.reduceat(scores[:, self.phrase_ids], self._group_starts, axis=1)
+
+    def match(self, text: str) -> IntentMatch:
+        """Return the globally best action and the runner-up for ``text``"""
+        scores = self.action_scores(text)
+        order = self._rank(scores)
+        best = int(order[0])
+        action = self.actions[best] if scores[best] >= self.threshold else None
+        if len(order) < 2:
+            return IntentMatch(action, float(scores[best]), None, 0.0)
+        second = int(order[1])
+        return IntentMatch(action, float(scores[best]), self.actions[second], float(scores[second]))
+
+    def _rank(self, scores: np.ndarray) -> np.ndarray:
+        """Action indices from best to worst along the last axis, ties settled by ``tie_break``"""
+        return np.lexsort((np.broadcast_to(self._tie_rank, scores.shape), -scores), axis=-1)
+
+    def match_batch(self, texts, workers: int = -1):
+        """Classify many texts at once.
+
+        Returns ``(actions, scores, margins)`` as NumPy arrays, where ``actions``
+        holds the action name (or None below the threshold) and ``margins`` is
+        the gap between the best and runner-up action scores.
+        """
+        if len(texts) == 0:
+            return np.empty(0, dtype=object), np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32)
+        scores = self.batch_action_scores(texts, workers=workers)
+        rows = np.arange(len(texts))
+        order = self._rank(scores)
+        best_scores = scores[rows, order[:, 0]]
+        second_scores = scores[rows, order[:, 1]] if scores.shape[1] > 1 else np.zeros_like(best_scores)
+        names = np.asarray(self.actions, dtype=object)
+        actions = np.where(best_scores >= self.threshold, names[order[:, 0]], None)
+        return actions, best_scores, best_scores - second_scores
+
+
+class PrefixRouter:
+    """Deterministic first tier: one compiled regex over unambiguous command prefixes.
+
+    ``route`` returns ``(action, argument)`` for utterances like "open X" or
+    "set timer N" and None otherwise, in which case the fuzzy index decides.
+    """
+
+    def __init__(self, rules):
+        alternatives = []
+        self._groups = {}
+        for i, (action, prefixes) in enumerate(rules.items()):
+            # Longest first so "set a timer" wins over a shorter overlapping prefix
+            ordered = sorted(prefixes, key=len, reverse=True)
+            group = f"a{i}"
+            self._groups[group] = action
+            alternatives.append(f"(?P<{group}>{'|'.join(re.escape(p) for p in ordered)})")
+        self.pattern = re.compile(rf"^(?:{'|'.join(alternatives)})\b\s*(?P<arg>.*)$")
+        # Actions that still make sense without an argument ("set timer" -> default)
+        self._arg_optional = {"set_timer"}
+
+    def route(self, text: str) -> Optional[Tuple[str, str]]:
+        """Return ``(action, argument)`` if ``text`` starts with a known prefix"""
+        m = self.pattern.match(text)
+        if not m:
+            return None
+        action = next(action for group, action in self._groups.items() if m.group(group) is not None)
+        argument = m.group("arg").strip()
+        # "open" or "play" on their own aren't unambiguous; let the fuzzy tier decide
+        if not argument and action not in self._arg_optional:
+            return None
+        return action, argument
+
+
+# Built once at import so every utterance is a single vectorized scan
+INTENT_INDEX = IntentIndex(COMMANDS, tie_break=TIE_BREAK)
+PREFIX_ROUTER = PrefixRouter(PREFIX_RULES)
+
+# Second-tier engine: "fuzzy" (INTENT_INDEX) or "ngram" (NgramIntentClassifier)
+INTENT_ENGINES = ("fuzzy", "ngram")
+INTENT_ENGINE = get_intent_engine()
+if INTENT_ENGINE not in INTENT_ENGINES:
+    print(f"Unknown INTENT_ENGINE {INTENT_ENGINE!r}, using fuzzy matching")
+    INTENT_ENGINE = "fuzzy"
+# Trained lazily on first use and dropped whenever the phrase table changes
+_NGRAM_CLASSIFIER = None
+# Callbacks run after set_command_phrases changes COMMANDS
+_PHRASE_LISTENERS = []
+
+# Per-tier counters for live matching: "prefix", "fuzzy" (second tier, either engine) and "miss"
+ROUTER_STATS = Counter()
+
+
+def get_ngram_classifier() -> NgramIntentClassifier:
+    """Return the n-gram classifier trained on COMMANDS plus the labelled history."""
+    global _NGRAM_CLASSIFIER
+    if _NGRAM_CLASSIFIER is None:
+        training_file = get_intent_training_file()
+        extra = load_labelled_pairs(training_file) if training_file else None
+        _NGRAM_CLASSIFIER = NgramIntentClassifier(tie_break=TIE_BREAK).fit_commands(COMMANDS, extra)
+    return _NGRAM_CLASSIFIER
+
+
+def set_intent_engine(engine: str):
+    """Switch the second-tier matcher between "fuzzy" and "ngram" at runtime."""
+    global INTENT_ENGINE
+    if engine not in INTENT_ENGINES:
+        raise ValueError(f"Unknown intent engine: {engine}")
+    INTENT_ENGINE = engine
+    _match_normalized.cache_clear()
+
+
+@lru_cache(maxsize=256)
+def _match_normalized(user_input: str) -> IntentMatch:
+    """Cached index lookup; spoken commands repeat a lot ("open spotify", "volume up")"""
+    if INTENT_ENGINE == "ngram":
+        return IntentMatch(*get_ngram_classifier().predict(user_input))
+    return INTENT_INDEX.match(user_input)
+
+
+def set_command_phrases(action, phrases):
+    """Add, replace or (with no phrases) remove the phrases for ``action``.
+
+    Rebuilds the intent index so plugin actions become matchable immediately.
+    """
+    global INTENT_INDEX, _NGRAM_CLASSIFIER
+    if phrases:
+        COMMANDS[action] = list(phrases)
+    else:
+        COMMANDS.pop(action, None)
+    INTENT_INDEX = IntentIndex(COMMANDS, tie_break=TIE_BREAK)
+    _NGRAM_CLASSIFIER = None
+    _match_normalized.cache_clear()
+    for callback in list(_PHRASE_LISTENERS):
+        callback()
+
+
+def add_phrase_listener(callback):
+    """Call ``callback`` whenever set_command_phrases changes the phrase table."""
+    _PHRASE_LISTENERS.append(callback)
+
+
+def match_intent_scored(user_input) -> IntentMatch:
+    """Match user input against all known phrases and return the scored result."""
+    user_input = user_input.lower().strip()
+
+    # Tier 1: unambiguous prefixes ("open X", "play X", "set timer N", ...)
+    routed = PREFIX_ROUTER.route(user_input)
+    if routed:
+        ROUTER_STATS["prefix"] += 1
+        return IntentMatch(routed[0], 100.0, None, 0.0)
+
+    # Tier 2: fuzzy (or n-gram, see INTENT_ENGINE) match over every phrase
+    result = _match_normalized(user_input)
+    ROUTER_STATS["fuzzy" if result.action else "miss"] += 1
+    return result
+
+
+def router_hit_rates() -> dict:
+    """Return the share of live utterances resolved by each routing tier."""
+    total = sum(ROUTER_STATS.values())
+    if not total:
+        return {"prefix": 0.0, "fuzzy": 0.0, "miss": 0.0, "total": 0}
+    rates = {tier: ROUTER_STATS[tier] / total for tier in ("prefix", "fuzzy", "miss")}
+    rates["total"] = total
+    return rates
+
+
 def match_intent(user_input):
     """Fuzzy match user input to a known action."""
-    user_input = user_input.lower().strip()
-    
-    # specific override for dynamic "play ..." commands
-    if user_input.startswith("play ") and len(user_input) > 5:
-        # Avoid matching "play" (media_play_pause) if there's more text
-        return "play_youtube"
-        
-    for action, phrases in COMMANDS.items():
-        match, score, _ = process.extractOne(user_input, phrases)
-        if score >= 75:
-            return action
-    return None
+    return match_intent_scored(user_input).action
+
+
+def match_intents(texts, workers: int = -1):
+    """Classify a batch of transcripts in one cdist call spread across all cores.
+
+    Returns ``(actions, scores, margins)`` NumPy arrays aligned with ``texts``;
+    see ``IntentIndex.match_batch``. Texts resolved by the prefix router skip
+    the second tier, exactly as in ``match_intent``.
+    """
+    normalized = [text.lower().strip() for text in texts]
+    actions = np.empty(len(normalized), dtype=object)
+    scores = np.full(len(normalized), 100.0, dtype=np.float32)
+    margins = np.full(len(normalized), 100.0, dtype=np.float32)
+    fuzzy_rows = []
+    for i, text in enumerate(normalized):
+        routed = PREFIX_ROUTER.route(text)
+        if routed:
+            actions[i] = routed[0]
+        else:
+            fuzzy_rows.append(i)
+    if fuzzy_rows:
+        engine = get_ngram_classifier() if INTENT_ENGINE == "ngram" else INTENT_INDEX
+        fuzzy_actions, fuzzy_scores, fuzzy_margins = engine.match_batch(
+            [normalized[i] for i in fuzzy_rows], workers=workers)
+        actions[fuzzy_rows] = fuzzy_actions
+        scores[fuzzy_rows] = fuzzy_scores
+        margins[fuzzy_rows] = fuzzy_margins
+    return actions, scores, margins
+
 
 @lru_cache(maxsize=32)
 def cached_web_search(query):
@@ -110,4 +380,27 @@ def log_command(command, action):
     """Log the command and action with a timestamp to a file."""
     with open("jarvo_command_log.txt", "a", encoding="utf-8") as f:
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        f.write(f"{timestamp} | Command: {command} | Action: {action}\n")
\ No newline at end of file
+        f.write(f"{timestamp} | Command: {command} | Action: {action}\n")
+
+def parse_log_line(line):
+    """Parse one log_command line into (command, action), or None if it isn't one."""
+    parts = line.rstrip("\n").split(" | ", 2)
+    if len(parts) < 3 or not parts[1].startswith("Command: "):
+        return None
+    command = parts[1][len("Command: "):].strip()
+    action = parts[2][len("Action: "):].strip() if parts[2].startswith("Action: ") else parts[2]
+    return command, action
+
+
+def read_command_log(path="jarvo_command_log.txt"):
+    """Return (command, action) pairs written by log_command, skipping empty commands."""
+    entries = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                entry = parse_log_line(line)
+                if entry and entry[0] and entry[0] != "None":
+                    entries.append(entry)
+    except FileNotFoundError:
+        pass
+    return entries
@@ -0,0 +1,147 @@
+from typing import Optional
+
+import numpy as np
+
+FRAME_MS = 30
+# Frames quieter than this (dBFS) are never speech, whatever the noise floor says
+MIN_SPEECH_DB = -55.0
+
+# Per-environment tuning; pick one with VAD_PROFILE
+VAD_PRESETS = {
+    "quiet": {"margin_db": 8.0, "flatness_max": 0.5, "min_hangover": 0.3, "max_hangover": 0.6},
+    "office": {"margin_db": 6.0, "flatness_max": 0.45, "min_hangover": 0.4, "max_hangover": 0.7},
+    "noisy": {"margin_db": 5.0, "flatness_max": 0.4, "min_hangover": 0.4, "max_hangover": 0.8},
+}
+
+
+class VoiceActivityDetector:
+    """Frame-level speech/non-speech decisions from energy, ZCR and spectral flatness.
+
+    All features are computed for a whole block of frames at once. A frame is
+    speech when it is ``margin_db`` above the tracked noise floor and either
+    tonal (low spectral flatness, i.e. voiced) or, for fricatives like "s",
+    noisy with a high zero-crossing rate and an extra 6 dB of energy.
+    """
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = FRAME_MS, margin_db: float = 6.0,
+                 flatness_max: float = 0.45, zcr_fricative: float = 0.3, noise_adapt: float = 0.05,
+                 min_speech: float = 0.09, min_hangover: float = 0.4, max_hangover: float = 0.7):
+        self.sample_rate = sample_rate
+        self.frame_samples = int(sample_rate * frame_ms / 1000)
+        self.margin_db = margin_db
+        self.flatness_max = flatness_max
+        self.zcr_fricative = zcr_fricative
+        self.noise_adapt = noise_adapt
+        self.min_speech_frames = max(1, round(min_speech * 1000 / frame_ms))
+        self.min_hangover_frames = max(1, round(min_hangover * 1000 / frame_ms))
+        self.max_hangover_frames = max(self.min_hangover_frames, round(max_hangover * 1000 / frame_ms))
+        self._window = np.hanning(self.frame_samples).astype(np.float32)
+
+    @classmethod
+    def from_profile(cls, profile: str = "office", sample_rate: int = 16000, **overrides):
+        """Build a detector from a ``VAD_PRESETS`` entry, with keyword overrides"""
+        settings = dict(VAD_PRESETS.get(profile, VAD_PRESETS["office"]))
+        settings.update(overrides)
+        return cls(sample_rate=sample_rate, **settings)
+
+    def frames(self, samples: np.ndarray) -> np.ndarray:
+        """Reshape int16 samples into (n_frames, frame_samples) floats in [-1, 1]; drops the tail"""
+        n = len(samples) // self.frame_samples
+        return samples[:n * self.frame_samples].reshape(n, self.frame_samples).astype(np.float32) / 32768.0
+
+    def features(self, frames: np.ndarray):
+        """Return per-frame (energy in dBFS, zero-crossing rate, spectral flatness)"""
+        energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+        zcr = np.count_nonzero(np.diff(np.signbit(frames), axis=1), axis=1) / frames.shape[1]
+        power = np.abs(np.fft.rfft(frames * self._window, axis=1)) ** 2 + 1e-12
+        flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+        return energy_db, zcr, flatness
+
+    def noise_floor(self, samples: np.ndarray) -> Optional[float]:
+        """Noise floor (dBFS) estimated from ambient audio, or None if too short"""
+        frames = self.frames(samples)
+        if len(frames) == 0:
+            return None
+        return float(np.median(self.features(frames)[0]))
+
+    def classify(self, frames: np.ndarray, noise_db: float):
+        """Return (speech decision, energy in dBFS) per frame against a fixed noise floor"""
+        energy_db, zcr, flatness = self.features(frames)
+        loud = (energy_db > noise_db + self.margin_db) & (energy_db > MIN_SPEECH_DB)
+        voiced = flatness < self.flatness_max
+        fricative = (zcr > self.zcr_fricative) & (energy_db > noise_db + self.margin_db + 6.0)
+        return loud & (voiced | fricative), energy_db
+
+
+class Endpointer:
+    """Streaming utterance boundaries on top of a ``VoiceActivityDetector``.
+
+    Feed audio as it arrives; ``feed`` returns True once the utterance has
+    ended. Speech starts after ``min_speech`` of consecutive speech frames.
+    It ends after a run of silence longer than the hangover, which starts
+    short (snappy for "volume up") and stretches to cover the longest pause
+    seen inside the utterance so far, up to ``max_hangover``. The noise floor
+    keeps adapting on non-speech frames.
+
+    Positions are in samples from the first sample fed. A known ``noise_db``
+    (the device's tracked noise floor) takes precedence over ``ambient``,
+    which may already contain the start of the command.
+    """
+
+    def __init__(self, vad: VoiceActivityDetector, ambient: Optional[np.ndarray] = None,
+                 noise_db: Optional[float] = None):
+        self.vad = vad
+        self.noise_db = noise_db
+        if self.noise_db is None and ambient is not None and len(ambient):
+            self.noise_db = vad.noise_floor(ambient)
+        self.position = 0
+        self.speech_start = None
+        self.speech_end = None
+        self._pending = np.empty(0, dtype=np.int16)
+        self._frame_index = 0
+        self._speech_run = 0
+        self._silence_run = 0
+        self._longest_pause = 0
+
+    @property
+    def hangover_frames(self) -> int:
+        adaptive = int(self._longest_pause * 1.25)
+        return min(self.vad.max_hangover_frames, max(self.vad.min_hangover_frames, adaptive))
+
+    @property
+    def done(self) -> bool:
+        return self.speech_end is not None
+
+    def feed(self, samples: np.ndarray) -> bool:
+        if self.done:
+            return True
+        self.position += len(samples)
+        if len(self._pending):
+            samples = np.concatenate((self._pending, samples))
+        frames = self.vad.frames(samples)
+        self._pending = samples[len(frames) * self.vad.frame_samples:]
+        if len(frames) == 0:
+            return False
+        if self.noise_db is None:
+            # No ambient sample: assume the first frames are background
+            self.noise_db = float(np.median(self.vad.features(frames)[0]))
+        speech, energy_db = self.vad.classify(frames, self.noise_db)
+        frame = self.vad.frame_samples
+        for i, is_speech in enumerate(speech):
+            index = self._frame_index + i
+            if is_speech:
+                if self._silence_run and self.speech_start is not None:
+                    self._longest_pause = max(self._longest_pause, self._silence_run)
+                self._speech_run += 1
+                self._silence_run = 0
+                if self.speech_start is None and self._speech_run >= self.vad.min_speech_frames:
+                    self.speech_start = (index - self._speech_run + 1) * frame
+            else:
+                self._speech_run = 0
+                self._silence_run += 1
+                self.noise_db += self.vad.noise_adapt * (float(energy_db[i]) - self.noise_db)
+                if self.speech_start is not None and self._silence_run >= self.hangover_frames:
+                    self.speech_end = (index - self._silence_run + 1) * frame
+                    break
+        self._frame_index += len(frames)
+        return self.done
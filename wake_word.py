@@ -1,13 +1,56 @@
+from ctypes import POINTER, byref, c_int, c_short
+
+import numpy as np
+
+from audio_source import MicrophoneSource
+
 try:
     import pvporcupine
-    import pyaudio
-    import struct
     PORCUPINE_AVAILABLE = True
 except ImportError:
     PORCUPINE_AVAILABLE = False
 
+
+def frame_pointer(frame: np.ndarray):
+    """A ``short *`` to an int16 frame's own memory, for passing it to C without a copy"""
+    if frame.dtype != np.int16 or not frame.flags.c_contiguous:
+        frame = np.ascontiguousarray(frame, dtype=np.int16)
+    return frame.ctypes.data_as(POINTER(c_short))
+
+
+def native_process(porcupine):
+    """``porcupine.process`` fed a pointer to the frame instead of a tuple of Python ints.
+
+    ``Porcupine.process`` builds a ctypes array from one Python int per
+    sample, so it wants ``struct.unpack``-ed tuples: two allocations per
+    sample, 31 frames a second, for as long as the assistant runs. This
+    calls the same C function on the frame's memory directly. Returns None
+    if this pvporcupine version doesn't expose it; any error status goes
+    through the public method so the library raises its own exception.
+    """
+    process = getattr(porcupine, "_process_func", None) or getattr(porcupine, "process_func", None)
+    handle = getattr(porcupine, "_handle", None)
+    success = getattr(getattr(porcupine, "PicovoiceStatuses", None), "SUCCESS", None)
+    if process is None or handle is None or success is None:
+        return None
+    result = c_int()
+
+    def run(frame: np.ndarray) -> int:
+        if process(handle, frame_pointer(frame), byref(result)) is not success:
+            return porcupine.process(frame.tolist())
+        return result.value
+
+    return run
+
+
 class WakeWordDetector:
-    def __init__(self, keyword="jarvis", sensitivity=0.7, callback=None):
+    def __init__(self, keyword="jarvis", sensitivity=0.7, callback=None, source=None, device_index=None):
+        """``source`` is any audio_source.AudioSource at Porcupine's sample rate.
+
+        Without one, the detector opens microphone ``device_index`` itself;
+        speech.create_wake_word_detector hands it the shared capture stream
+        instead, so the command after the keyword is read from the same audio.
+        """
         if not PORCUPINE_AVAILABLE:
             raise ImportError("pvporcupine is not installed. Install it with: pip install pvporcupine")
         
@@ -15,33 +58,47 @@ class WakeWordDetector:
         self.sensitivity = sensitivity
         self.callback = callback
         self.porcupine = pvporcupine.create(keywords=[self.keyword], sensitivities=[self.sensitivity])
-        self.pa = pyaudio.PyAudio()
-        self.stream = self.pa.open(
-            rate=self.porcupine.sample_rate,
-            channels=1,
-            format=pyaudio.paInt16,
-            input=True,
-            frames_per_buffer=self.porcupine.frame_length
-        )
+        if source is None:
+            source = MicrophoneSource(
+                device_index=device_index,
+                sample_rate=self.porcupine.sample_rate,
+                frames_per_buffer=self.porcupine.frame_length
+            )
+        elif source.sample_rate != self.porcupine.sample_rate:
+            raise ValueError(f"Wake word source must be {self.porcupine.sample_rate} Hz, got {source.sample_rate}")
+        self.source = source.start()
         self.running = False
 
     def listen(self):
+        """Run until stopped, calling ``callback`` on every detection.
+
+        A callback that returns something (a recognized command) ends the
+        loop, and ``listen`` returns that value.
+        """
         self.running = True
         print(f"[WakeWord] Listening for '{self.keyword}'...")
+        frame_length = self.porcupine.frame_length
+        process = native_process(self.porcupine) or (lambda frame: self.porcupine.process(frame.tolist()))
+        result = None
         while self.running:
-            pcm = self.stream.read(self.porcupine.frame_length, exception_on_overflow=False)
-            pcm = struct.unpack_from("h" * self.porcupine.frame_length, pcm)
-            result = self.porcupine.process(pcm)
-            if result >= 0:
+            pcm = self.source.read(frame_length)
+            if len(pcm) < frame_length:
+                # A file or synthetic source ran out
+                break
+            if process(pcm) >= 0:
                 print(f"[WakeWord] Detected '{self.keyword}'!")
                 if self.callback:
-                    self.callback()
+                    result = self.callback()
+                    # The command was read from the same stream; don't scan it for the keyword again
+                    self.source.catch_up()
+                    if result:
+                        break
+        self.running = False
+        return result
 
     def stop(self):
         self.running = False
-        self.stream.stop_stream()
-        self.stream.close()
-        self.pa.terminate()
+        self.source.stop()
         self.porcupine.delete()
 
 if __name__ == "__main__":
@@ -52,4 +109,4 @@ if __name__ == "__main__":
         detector.listen()
     except KeyboardInterrupt:
         detector.stop()
-        print("Stopped.")
\ No newline at end of file
+        print("Stopped.")